@@ -1,8 +1,32 @@
+import argparse
+import time
 from game import TowerDefenseGame
+from game.sim import InputLog, ReplayPlayer
 
 def main():
-    game = TowerDefenseGame()
-    game.run()
+    parser = argparse.ArgumentParser(description="Tower Defense Game")
+    parser.add_argument("--replay", metavar="PATH", help="watch a recorded session, e.g. replays/last_session.json")
+    parser.add_argument("--headless", action="store_true", help="with --replay, simulate the whole session at full speed without a window")
+    args = parser.parse_args()
+    if args.headless and not args.replay:
+        parser.error("--headless needs --replay")
+
+    if not args.replay:
+        game = TowerDefenseGame()
+        game.run()
+        return
+
+    replay = ReplayPlayer(InputLog.load(args.replay))
+    if args.headless:
+        start = time.perf_counter()
+        ticks = replay.play()
+        elapsed = time.perf_counter() - start
+        sim = replay.sim
+        print(f"Replayed {ticks} ticks in {elapsed:.2f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+        print(f"Wave {sim.wave_number}, money {sim.money}, lives {sim.lives}")
+    else:
+        game = TowerDefenseGame(replay=replay)
+        game.run()
 
 if __name__ == "__main__":
     main()
@@ -7,6 +7,24 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 FPS = 60
 
+# Simulation timing - the simulation always advances in fixed ticks, whatever the frame rate
+SIM_TICK_RATE = 60 # Simulation ticks per second
+SIM_TICK_MS = 1000 / SIM_TICK_RATE # Simulated milliseconds per tick
+MAX_FRAME_MS = 250 # Longest frame the simulation will catch up on (avoids a spiral of death)
+
+# Fast-forward - simulated time per real time, cycled with F. None runs as many ticks as fit in the frame budget
+GAME_SPEEDS = (1, 2, 4, 8, None)
+UNCAPPED_FRAME_BUDGET_MS = 12 # Real time spent simulating per frame at uncapped speed
+
+# Replays - every session's inputs are saved on exit so it can be played back with game.py --replay
+LAST_SESSION_REPLAY = "replays/last_session.json"
+REPLAY_SEEK_TICKS = 600 # Ticks skipped per LEFT/RIGHT press while watching a replay
+
+# Autosave - written in the background at the end of every wave and periodically in between
+AUTOSAVE_PATH = "saves/autosave.bin"
+AUTOSAVE_INTERVAL_TICKS = 30 * SIM_TICK_RATE # 30 seconds of simulated time
+AUTOSAVE_EXIT_TIMEOUT = 5 # Seconds to wait for the last save to finish when the game closes
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -14,10 +32,12 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
+PINK = (255, 105, 180)
 BROWN = (139, 69, 19)
 GRAY = (128, 128, 128)
 
 # Game balance
 STARTING_MONEY = 650 # Enough for 3 dart monkeys or other combinations
 STARTING_LIVES = 20
+SLOW_SPEED_MULTIPLIER = 0.5 # Slowed bloons move at half speed
 TOWER_COST = 10
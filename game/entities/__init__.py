@@ -2,8 +2,10 @@
 Game entities package
 """
 from .bloon import Bloon
+from .bloon_store import BloonStore
 from .tower import Tower
 from .projectile import Projectile
+from .projectile_pool import ProjectilePool
 from .bloon_types import BloonType, BloonProperties, BLOON_PROPERTIES
 
-__all__ = ['Bloon', 'Tower', 'Projectile', 'BloonType', 'BloonProperties', 'BLOON_PROPERTIES']
+__all__ = ['Bloon', 'BloonStore', 'Tower', 'Projectile', 'ProjectilePool', 'BloonType', 'BloonProperties', 'BLOON_PROPERTIES']
@@ -1,14 +1,23 @@
 """
 Bloon entity class
 """
-import pygame
-import math
+import itertools
 from typing import List, Tuple
-from .bloon_types import BloonType, BLOON_PROPERTIES
-from ..constants import BLACK, GREEN
+from .bloon_types import BloonType, BloonProperties, BLOON_PROPERTIES
+from .bloon_store import BloonStore, BLOON_TYPES, INNER_RBE_TABLE, ALIVE, REACHED_END, CAMO, LEAD, FROZEN
 
 
 class Bloon:
+    """Lightweight view of one bloon stored in a BloonStore.
+
+    Creating a Bloon directly gives it a private single-bloon store; bloons
+    spawned by the simulation are views onto the shared store instead.
+    """
+    __slots__ = ('_store', '_slot')
+
+    # Standalone bloons take ids from their own negative range so they never clash with store ids
+    _standalone_uids = itertools.count(-1, -1)
+
     def __init__(self, bloon_type: BloonType, path: List[Tuple[int, int]]):
         """Initialize the bloon with the given type and path.
 
@@ -16,77 +25,166 @@ class Bloon:
             bloon_type (BloonType): The type of the bloon.
             path (List[Tuple[int, int]]): The path the bloon will follow.
         """
-        self.type = bloon_type
-        self.properties = BLOON_PROPERTIES[bloon_type]
-        self.health = self.properties.health
-        self.max_health = self.properties.health
-        self.speed = self.properties.speed
-        self.reward = self.properties.reward
-        self.color = self.properties.color
-        self.size = self.properties.size
-        
-        self.path = path
-        self.path_index = 0
-        self.position = [float(path[0][0]), float(path[0][1])]
-        self.alive = True
-        self.reached_end = False
-        
-        # BTD6-style properties for targeting
-        self.is_camo = False  # Can be detected by camo-detection towers only
-        self.is_lead = False  # Requires lead-popping power
-        self.path_position = 0.0  # Progress along path (0.0 to 1.0)
-        
-    def update(self):
-        if not self.alive or self.reached_end:
-            return
-            
-        if self.path_index >= len(self.path) - 1:
-            self.reached_end = True
-            self.path_position = 1.0  # Reached end of path
-            return
-            
-        # Move towards next waypoint - optimized
-        target = self.path[self.path_index + 1]
-        dx = target[0] - self.position[0]
-        dy = target[1] - self.position[1]
-        distance_squared = dx * dx + dy * dy
-        
-        if distance_squared < 25: # Close enough to waypoint (5^2 = 25)
-            self.path_index += 1
+        self._store = BloonStore(path, capacity=1)
+        self._slot = self._store.spawn(bloon_type)
+        self._store.uid[self._slot] = next(Bloon._standalone_uids)
+        self._store.handles[self._slot] = self
+
+    @classmethod
+    def view(cls, store: BloonStore, slot: int) -> 'Bloon':
+        """Create a view onto an existing row of a store"""
+        bloon = cls.__new__(cls)
+        bloon._store = store
+        bloon._slot = slot
+        return bloon
+
+    def detach(self, store: BloonStore):
+        """Point this view at a standalone copy once the bloon leaves its shared store"""
+        self._store = store
+        self._slot = 0
+
+    @property
+    def slot(self) -> int:
+        return self._slot
+
+    @property
+    def uid(self) -> int:
+        """Stable id of this bloon (its row can change as the store compacts)"""
+        return int(self._store.uid[self._slot])
+
+    @property
+    def type(self) -> BloonType:
+        return BLOON_TYPES[self._store.type[self._slot]]
+
+    @property
+    def properties(self) -> BloonProperties:
+        return BLOON_PROPERTIES[self.type]
+
+    @property
+    def health(self) -> int:
+        return int(self._store.health[self._slot])
+
+    @health.setter
+    def health(self, value: int):
+        self._store.health[self._slot] = value
+
+    @property
+    def max_health(self) -> int:
+        return int(self._store.max_health[self._slot])
+
+    @property
+    def rbe(self) -> int:
+        """Damage still needed to pop this bloon and every layer under it"""
+        return self.health + int(INNER_RBE_TABLE[self._store.type[self._slot]])
+
+    @property
+    def speed(self) -> float:
+        return float(self._store.speed[self._slot])
+
+    @speed.setter
+    def speed(self, value: float):
+        self._store.speed[self._slot] = value
+
+    @property
+    def reward(self) -> int:
+        return self.properties.reward
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        return self.properties.color
+
+    @property
+    def size(self) -> int:
+        return self.properties.size
+
+    @property
+    def path(self) -> List[Tuple[int, int]]:
+        return self._store.path
+
+    @property
+    def path_index(self) -> int:
+        return int(self._store.path_index[self._slot])
+
+    @property
+    def distance_travelled(self) -> float:
+        """Exact distance along the path from its start"""
+        return float(self._store.distance[self._slot])
+
+    @property
+    def position(self) -> List[float]:
+        return self._store.position[self._slot].tolist()
+
+    @position.setter
+    def position(self, value: Tuple[float, float]):
+        self._store.position[self._slot] = value
+
+    @property
+    def previous_position(self) -> List[float]:
+        """Position at the previous tick, for render interpolation"""
+        return self._store.previous_position[self._slot].tolist()
+
+    def _has_flag(self, flag: int) -> bool:
+        return bool(self._store.flags[self._slot] & flag)
+
+    def _set_flag(self, flag: int, value: bool):
+        if value:
+            self._store.flags[self._slot] |= flag
         else:
-            # Move towards target - avoid sqrt when possible
-            if distance_squared > 0:
-                distance = math.sqrt(distance_squared)
-                self.position[0] += (dx / distance) * self.speed
-                self.position[1] += (dy / distance) * self.speed
-        
-        # Update path position for targeting priority
-        self.path_position = self.path_index / max(1, len(self.path) - 1)
-    
-    def take_damage(self, damage: int):
-        self.health -= damage
-        if self.health <= 0:
-            self.alive = False
-            return True # Bloon popped
-        return False
-    
-    def draw(self, screen):
-        if not self.alive:
-            return
-            
-        # Draw bloon
-        pygame.draw.circle(screen, self.color, 
-                         (int(self.position[0]), int(self.position[1])), self.size)
-        
-        # Draw health indicator if damaged
-        if self.health < self.max_health:
-            health_ratio = self.health / self.max_health
-            bar_width = self.size * 2
-            bar_height = 4
-            bar_x = int(self.position[0] - bar_width // 2)
-            bar_y = int(self.position[1] - self.size - 8)
-            
-            # Background
-            pygame.draw.rect(screen, BLACK, (bar_x, bar_y, bar_width, bar_height))
-            # Health
-            pygame.draw.rect(screen, GREEN, (bar_x, bar_y, int(bar_width * health_ratio), bar_height))
+            self._store.flags[self._slot] &= ~flag & 0xFF
+
+    @property
+    def alive(self) -> bool:
+        """Whether the bloon is still in play (not popped and not leaked)"""
+        return bool((self._store.flags[self._slot] & (ALIVE | REACHED_END)) == ALIVE)
+
+    @alive.setter
+    def alive(self, value: bool):
+        self._store.set_alive(self._slot, value)
+
+    @property
+    def reached_end(self) -> bool:
+        return self._has_flag(REACHED_END)
+
+    # BTD6-style properties for targeting
+    @property
+    def is_camo(self) -> bool:
+        """Can be detected by camo-detection towers only"""
+        return self._has_flag(CAMO)
+
+    @is_camo.setter
+    def is_camo(self, value: bool):
+        self._set_flag(CAMO, value)
+
+    @property
+    def is_lead(self) -> bool:
+        """Requires lead-popping power"""
+        return self._has_flag(LEAD)
+
+    @is_lead.setter
+    def is_lead(self, value: bool):
+        self._set_flag(LEAD, value)
+
+    @property
+    def is_frozen(self) -> bool:
+        """Frozen in place - only towers that pop frozen bloons can damage it"""
+        return self._has_flag(FROZEN)
+
+    @property
+    def path_position(self) -> float:
+        """Progress along path (0.0 to 1.0)"""
+        length = self._store.path_table.length
+        if self.reached_end or length <= 0:
+            return 1.0
+        return min(1.0, self.distance_travelled / length)
+
+    def update(self):
+        """Advance the bloon by one simulation tick"""
+        self._store.update(self._slot, self._slot + 1)
+
+    def take_damage(self, damage: int) -> bool:
+        """Deal damage, popping layers. Returns True if this popped the last one."""
+        return self._store.damage(self._slot, damage)
+
+    def draw(self, screen, alpha: float = 1.0):
+        """Draw the bloon, interpolated alpha of the way from its previous to its current position"""
+        self._store.draw(screen, alpha, self._slot, self._slot + 1)
@@ -0,0 +1,417 @@
+"""
+Structure-of-arrays storage for bloons
+
+Every bloon's state lives in one row of a set of contiguous NumPy arrays, so
+movement for all live bloons is a single vectorized step per tick instead of
+a Python loop over objects. Bloon objects are lightweight views onto a row.
+
+Popping a layered bloon turns its row into its first child in place, with
+any leftover damage carried down. Further children (a black bloon holds two
+pinks) are queued and written into free rows in one vectorized batch by
+spawn_children(), so a burst of hundreds of pops in one tick costs a few
+array operations rather than a spawn call per child.
+
+Status effects (slow, freeze, stun) are columns too: an expiry time per
+effect and a slow multiplier. Applying one is a vectorized write and the
+movement step folds them all into each bloon's speed with one multiply, so
+there are no effect objects or timers to tick.
+"""
+import pygame
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+from .bloon_types import BloonType, BLOON_PROPERTIES, red_bloon_equivalent
+from ..constants import BLACK, GREEN
+from ..systems.path import PathTable
+
+if TYPE_CHECKING:
+    from .bloon import Bloon
+
+
+# Bloon types in a fixed order - the store keeps an index into this list
+BLOON_TYPES = list(BloonType)
+TYPE_INDEX = {bloon_type: i for i, bloon_type in enumerate(BLOON_TYPES)}
+
+# Per-type lookup tables, indexed by the store's type column
+HEALTH_TABLE = np.array([BLOON_PROPERTIES[t].health for t in BLOON_TYPES], dtype=np.int32)
+SPEED_TABLE = np.array([BLOON_PROPERTIES[t].speed for t in BLOON_TYPES], dtype=np.float64)
+REWARD_TABLE = np.array([BLOON_PROPERTIES[t].reward for t in BLOON_TYPES], dtype=np.int64)
+SIZE_TABLE = np.array([BLOON_PROPERTIES[t].size for t in BLOON_TYPES], dtype=np.float64)
+RBE_TABLE = np.array([red_bloon_equivalent(t) for t in BLOON_TYPES], dtype=np.int64)
+# Layers under the outer one: RBE left once a bloon's current layer is gone
+INNER_RBE_TABLE = RBE_TABLE - HEALTH_TABLE
+CHILDREN_TABLE = [tuple(TYPE_INDEX[child] for child in BLOON_PROPERTIES[t].children) for t in BLOON_TYPES]
+
+# Flag bits
+ALIVE = 1 # Cleared when the bloon is popped
+REACHED_END = 2 # Set when the bloon leaks out of the end of the path
+CAMO = 4
+LEAD = 8
+FROZEN = 16 # Set while a freeze lasts - frozen bloons can only be damaged by towers that pop frozen
+INHERITED_FLAGS = CAMO | LEAD | FROZEN # Carried from a popped layer to every one of its children
+
+# (name, per-row shape, dtype) for every array in the store
+COLUMNS = (
+    ('uid', (), np.int64), # Unique per bloon for the lifetime of the store, unlike the row
+    ('position', (2,), np.float64),
+    ('previous_position', (2,), np.float64), # Position at the previous tick, for render interpolation
+    ('path_index', (), np.int32), # Index of the last waypoint passed
+    ('distance', (), np.float64), # Distance travelled along the path - the bloon's progress
+    ('health', (), np.int32),
+    ('max_health', (), np.int32),
+    ('speed', (), np.float64), # pixels per simulation tick
+    ('type', (), np.int8), # Index into BLOON_TYPES
+    ('flags', (), np.uint8),
+    # Status effects, each active until its simulation time (ms)
+    ('slow_until', (), np.float64),
+    ('slow_factor', (), np.float64), # Speed multiplier while slowed
+    ('freeze_until', (), np.float64),
+    ('stun_until', (), np.float64),
+)
+STATUS_EXPIRY_COLUMNS = ('slow_until', 'freeze_until', 'stun_until')
+STATUS_COLUMNS = STATUS_EXPIRY_COLUMNS + ('slow_factor',)
+
+
+class BloonStore:
+    def __init__(self, path: Union[PathTable, List[Tuple[int, int]]], capacity: int = 64):
+        """Initialize an empty store for bloons following the given path.
+
+        Args:
+            path (PathTable | List[Tuple[int, int]]): The path every bloon in this store follows.
+            capacity (int, optional): Number of rows to preallocate. Grows on demand. Defaults to 64.
+        """
+        self.path_table = path if isinstance(path, PathTable) else PathTable(path)
+        self.count = 0 # Rows [0, count) hold bloons, in spawn order
+        self.live = 0 # Bloons alive and still on the path, kept up to date without scanning
+        self.capacity = 0
+        self.next_uid = 0
+        self.high_water = 0 # Most bloons ever held at once
+        self.time = 0.0 # Simulation time (ms) of the last update, when status effects are applied from
+        self.handles: List[Optional['Bloon']] = [] # Bloon views, created on demand
+        self.layer_reward = 0 # Reward for layers popped since the last compact()
+        # Children waiting for spawn_children(): the parent's row, the child's type index and leftover damage
+        self.pending_parents: List[int] = []
+        self.pending_types: List[int] = []
+        self.pending_damage: List[int] = []
+        self._grow(max(1, capacity))
+
+    def _grow(self, capacity: int):
+        """Reallocate every column with room for capacity rows"""
+        for name, shape, dtype in COLUMNS:
+            column = np.zeros((capacity,) + shape, dtype=dtype)
+            if self.count:
+                column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+        self.handles.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    @property
+    def path(self) -> List[Tuple[int, int]]:
+        return self.path_table.path
+
+    def spawn(self, bloon_type: BloonType, distance: float = 0.0) -> int:
+        """Add a bloon and return its row.
+
+        Args:
+            bloon_type (BloonType): The type of the bloon.
+            distance (float, optional): How far along the path to spawn. Defaults to 0.0 (the start of the path).
+        """
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+
+        slot = self.count
+        self.count += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        self.live += 1
+
+        type_index = TYPE_INDEX[bloon_type]
+        self.uid[slot] = self.next_uid
+        self.next_uid += 1
+        position = self.path_table.position_at(distance)
+        self.position[slot] = position
+        self.previous_position[slot] = position
+        self.path_index[slot] = self.path_table.segments_at(distance)
+        self.distance[slot] = distance
+        self.health[slot] = HEALTH_TABLE[type_index]
+        self.max_health[slot] = HEALTH_TABLE[type_index]
+        self.speed[slot] = SPEED_TABLE[type_index]
+        self.type[slot] = type_index
+        self.flags[slot] = ALIVE
+        self.slow_until[slot] = 0.0
+        self.slow_factor[slot] = 1.0
+        self.freeze_until[slot] = 0.0
+        self.stun_until[slot] = 0.0
+        self.handles[slot] = None
+        return slot
+
+    def stats(self) -> Dict[str, int]:
+        """Occupancy of the store - rows freed by compact() are reused by later spawns"""
+        return {
+            'in_use': self.count,
+            'free': self.capacity - self.count,
+            'allocated': self.capacity,
+            'high_water': self.high_water,
+        }
+
+    def handle(self, slot: int) -> 'Bloon':
+        """Get the Bloon view for a row, creating it on first use"""
+        handle = self.handles[slot]
+        if handle is None:
+            from .bloon import Bloon
+            handle = Bloon.view(self, slot)
+            self.handles[slot] = handle
+        return handle
+
+    def live_handles(self) -> List['Bloon']:
+        """Bloon views for every bloon still in the store"""
+        return [self.handle(slot) for slot in range(self.count)]
+
+    def active_mask(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Boolean mask of rows in [start, stop) that are alive and still on the path"""
+        stop = self.count if stop is None else stop
+        return (self.flags[start:stop] & (ALIVE | REACHED_END)) == ALIVE
+
+    def update(self, start: int = 0, stop: Optional[int] = None, current_time: Optional[float] = None) -> int:
+        """Move every active bloon in rows [start, stop) one tick along the path.
+
+        Args:
+            start (int, optional): First row to move. Defaults to 0.
+            stop (int, optional): Row after the last to move. Defaults to the end of the store.
+            current_time (float, optional): Simulation time (ms). Status effects only apply when it is given.
+
+        Returns:
+            int: The number of bloons that reached the end of the path this tick.
+        """
+        if current_time is not None:
+            self.time = current_time
+        active = np.nonzero(self.active_mask(start, stop))[0] + start
+        if len(active) == 0:
+            return 0
+
+        self.previous_position[active] = self.position[active]
+
+        speed = self.speed[active]
+        if current_time is not None:
+            # Frozen or stunned bloons stand still; otherwise a running slow scales their speed
+            held = np.maximum(self.freeze_until[active], self.stun_until[active]) > current_time
+            slowed = self.slow_until[active] > current_time
+            speed = speed * np.minimum(np.where(slowed, self.slow_factor[active], 1.0), np.where(held, 0.0, 1.0))
+            frozen = self.freeze_until[active] > current_time
+            self.flags[active] = np.where(frozen, self.flags[active] | FROZEN, self.flags[active] & ~np.uint8(FROZEN))
+
+        # Progress is a single distance along the path; positions come from the segment table
+        path_table = self.path_table
+        distance = self.distance[active] + speed
+        self.distance[active] = distance
+        self.position[active] = path_table.positions_at(distance)
+        self.path_index[active] = path_table.segments_at(distance)
+
+        # Bloons past the end of the path leak out
+        finished = distance >= path_table.length
+        leaked = int(np.count_nonzero(finished))
+        if leaked:
+            self.flags[active[finished]] |= REACHED_END
+            self.live -= leaked
+
+        return leaked
+
+    def damage(self, slot: int, amount: int) -> bool:
+        """Deal damage to one bloon, popping layers while it lasts.
+
+        Each popped layer becomes its first child in the same row, keeping the
+        bloon's uid, and takes the damage left over. Any other children are
+        queued for spawn_children() with the same leftover damage. Every child
+        keeps the parent's INHERITED_FLAGS and status effects.
+
+        Returns:
+            bool: True if this popped the bloon's last layer.
+        """
+        health = int(self.health[slot]) - amount
+        while health <= 0 and self.flags[slot] & ALIVE:
+            children = CHILDREN_TABLE[self.type[slot]]
+            if not children:
+                self.health[slot] = health
+                self.set_alive(slot, False)
+                return True # Bloon popped
+
+            self.layer_reward += int(REWARD_TABLE[self.type[slot]])
+            leftover = -health
+            for child in children[1:]:
+                self.pending_parents.append(slot)
+                self.pending_types.append(child)
+                self.pending_damage.append(leftover)
+            child = children[0]
+            self.type[slot] = child
+            self.max_health[slot] = HEALTH_TABLE[child]
+            self.speed[slot] = SPEED_TABLE[child]
+            self.flags[slot] = ALIVE | (self.flags[slot] & INHERITED_FLAGS)
+            health = int(HEALTH_TABLE[child]) - leftover
+        self.health[slot] = health
+        return False
+
+    def spawn_children(self) -> int:
+        """Add every queued child in one batch, at its parent's point on the path.
+
+        Children inherit their parent's INHERITED_FLAGS and status effects. Children killed outright by their
+        leftover damage pop at once, queueing their own children, until none
+        are left. Returns the number of rows added.
+        """
+        added = 0
+        while self.pending_parents:
+            parents = np.array(self.pending_parents, dtype=np.intp)
+            types = np.array(self.pending_types, dtype=np.int8)
+            leftover = np.array(self.pending_damage, dtype=np.int32)
+            self.pending_parents, self.pending_types, self.pending_damage = [], [], []
+
+            n = len(parents)
+            start = self.count
+            stop = start + n
+            if stop > self.capacity:
+                capacity = self.capacity
+                while capacity < stop:
+                    capacity *= 2
+                self._grow(capacity)
+            self.count = stop
+            self.high_water = max(self.high_water, stop)
+            self.live += n
+            added += n
+
+            rows = slice(start, stop)
+            self.uid[rows] = np.arange(self.next_uid, self.next_uid + n)
+            self.next_uid += n
+            self.position[rows] = self.position[parents]
+            self.previous_position[rows] = self.previous_position[parents]
+            self.path_index[rows] = self.path_index[parents]
+            self.distance[rows] = self.distance[parents]
+            self.health[rows] = HEALTH_TABLE[types] - leftover
+            self.max_health[rows] = HEALTH_TABLE[types]
+            self.speed[rows] = SPEED_TABLE[types]
+            self.type[rows] = types
+            self.flags[rows] = ALIVE | (self.flags[parents] & INHERITED_FLAGS)
+            # Like the child that takes over the parent's row, the others keep its status effects
+            for name in STATUS_COLUMNS:
+                column = getattr(self, name)
+                column[rows] = column[parents]
+            self.handles[start:stop] = [None] * n
+
+            # Leftover damage that already finishes a child pops it straight away
+            for slot in (np.nonzero(self.health[rows] <= 0)[0] + start).tolist():
+                self.damage(slot, 0)
+        return added
+
+    def slow(self, slots: Union[int, np.ndarray], duration: float, factor: float):
+        """Slow bloons to factor of their speed for duration ms. The strongest running slow and the latest expiry win."""
+        slots = np.atleast_1d(slots)
+        running = self.slow_until[slots] > self.time
+        self.slow_factor[slots] = np.where(running, np.minimum(self.slow_factor[slots], factor), factor)
+        np.maximum.at(self.slow_until, slots, self.time + duration)
+
+    def freeze(self, slots: Union[int, np.ndarray], duration: float):
+        """Freeze bloons in place for duration ms"""
+        slots = np.atleast_1d(slots)
+        np.maximum.at(self.freeze_until, slots, self.time + duration)
+        self.flags[slots] |= FROZEN
+
+    def stun(self, slots: Union[int, np.ndarray], duration: float):
+        """Stop bloons for duration ms without freezing them"""
+        np.maximum.at(self.stun_until, np.atleast_1d(slots), self.time + duration)
+
+    def set_alive(self, slot: int, alive: bool):
+        """Set or clear a bloon's ALIVE flag, keeping the live counter in step"""
+        flags = self.flags[slot]
+        was_active = (flags & (ALIVE | REACHED_END)) == ALIVE
+        if alive:
+            self.flags[slot] = flags | ALIVE
+        else:
+            self.flags[slot] = flags & ~np.uint8(ALIVE)
+        self.live += int((self.flags[slot] & (ALIVE | REACHED_END)) == ALIVE) - int(was_active)
+
+    def compact(self) -> int:
+        """Remove popped and leaked bloons, keeping the rest in spawn order.
+
+        Children still waiting to spawn are added first.
+
+        Returns:
+            int: The total reward for the layers and bloons that were popped.
+        """
+        self.spawn_children()
+        reward, self.layer_reward = self.layer_reward, 0
+
+        count = self.count
+        flags = self.flags[:count]
+        keep = (flags & (ALIVE | REACHED_END)) == ALIVE
+        if keep.all():
+            return reward
+
+        popped = (flags & ALIVE) == 0
+        reward += int(REWARD_TABLE[self.type[:count][popped]].sum())
+
+        # Detach views of removed bloons so references held elsewhere stay valid
+        removed = np.nonzero(~keep)[0]
+        for slot in removed:
+            handle = self.handles[slot]
+            if handle is not None:
+                handle.detach(self._copy_row(slot))
+
+        kept = np.nonzero(keep)[0]
+        new_count = len(kept)
+        for name, _, _ in COLUMNS:
+            column = getattr(self, name)
+            column[:new_count] = column[kept]
+
+        handles = [self.handles[slot] for slot in kept]
+        for slot, handle in enumerate(handles):
+            if handle is not None:
+                handle._slot = slot
+        self.handles[:new_count] = handles
+        self.handles[new_count:count] = [None] * (count - new_count)
+        self.count = new_count
+
+        return reward
+
+    def _copy_row(self, slot: int) -> 'BloonStore':
+        """Copy one row into a standalone single-row store"""
+        copy = BloonStore.__new__(BloonStore)
+        copy.path_table = self.path_table
+        copy.count = 1
+        copy.live = int(self.active_mask(slot, slot + 1)[0])
+        copy.capacity = 1
+        copy.next_uid = self.next_uid
+        copy.high_water = 1
+        copy.time = self.time
+        copy.handles = [self.handles[slot]]
+        copy.layer_reward = 0
+        copy.pending_parents, copy.pending_types, copy.pending_damage = [], [], []
+        for name, _, _ in COLUMNS:
+            setattr(copy, name, getattr(self, name)[slot:slot + 1].copy())
+        return copy
+
+    def draw(self, screen, alpha: float = 1.0, start: int = 0, stop: Optional[int] = None):
+        """Draw rows [start, stop), interpolated alpha of the way from their previous to their current position"""
+        rows = np.nonzero(self.active_mask(start, stop))[0] + start
+        if len(rows) == 0:
+            return
+
+        previous = self.previous_position[rows]
+        positions = previous + (self.position[rows] - previous) * alpha
+        for slot, (x, y) in zip(rows.tolist(), positions.tolist()):
+            properties = BLOON_PROPERTIES[BLOON_TYPES[self.type[slot]]]
+            size = properties.size
+
+            # Draw bloon
+            pygame.draw.circle(screen, properties.color, (int(x), int(y)), size)
+
+            # Draw health indicator if damaged
+            health = self.health[slot]
+            max_health = self.max_health[slot]
+            if health < max_health:
+                health_ratio = health / max_health
+                bar_width = size * 2
+                bar_height = 4
+                bar_x = int(x - bar_width // 2)
+                bar_y = int(y - size - 8)
+
+                # Background
+                pygame.draw.rect(screen, BLACK, (bar_x, bar_y, bar_width, bar_height))
+                # Health
+                pygame.draw.rect(screen, GREEN, (bar_x, bar_y, int(bar_width * health_ratio), bar_height))
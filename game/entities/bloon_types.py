@@ -1,10 +1,14 @@
 """
 Bloon types and properties
+
+Bloons are layered: each type's health is the health of its outer layer,
+and popping that layer releases its children in its place.
 """
 from enum import Enum
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Tuple
-from ..constants import RED, BLUE, GREEN, YELLOW
+from ..constants import RED, BLUE, GREEN, YELLOW, PINK, BLACK, WHITE
 
 
 class BloonType(Enum):
@@ -12,21 +16,35 @@ class BloonType(Enum):
     BLUE = "blue"
     GREEN = "green"
     YELLOW = "yellow"
+    PINK = "pink"
+    BLACK = "black"
+    WHITE = "white"
 
 
 @dataclass
 class BloonProperties:
-    health: int
-    speed: float
-    reward: int
+    health: int # Health of the outer layer only
+    speed: float # pixels per simulation tick
+    reward: int # Paid for popping the outer layer
     color: Tuple[int, int, int]
     size: int
+    children: Tuple[BloonType, ...] = () # Released at the same point on the path when the layer pops
 
 
 # Bloon type properties
 BLOON_PROPERTIES = {
     BloonType.RED: BloonProperties(1, 1.0, 1, RED, 15),
-    BloonType.BLUE: BloonProperties(2, 1.2, 2, BLUE, 15),
-    BloonType.GREEN: BloonProperties(3, 1.5, 3, GREEN, 15),
-    BloonType.YELLOW: BloonProperties(4, 2.0, 4, YELLOW, 15),
+    BloonType.BLUE: BloonProperties(1, 1.2, 1, BLUE, 15, (BloonType.RED,)),
+    BloonType.GREEN: BloonProperties(1, 1.5, 1, GREEN, 15, (BloonType.BLUE,)),
+    BloonType.YELLOW: BloonProperties(1, 2.0, 1, YELLOW, 15, (BloonType.GREEN,)),
+    BloonType.PINK: BloonProperties(1, 2.2, 1, PINK, 15, (BloonType.YELLOW,)),
+    BloonType.BLACK: BloonProperties(1, 1.5, 1, BLACK, 11, (BloonType.PINK, BloonType.PINK)),
+    BloonType.WHITE: BloonProperties(1, 1.7, 1, WHITE, 11, (BloonType.PINK, BloonType.PINK)),
 }
+
+
+@lru_cache(maxsize=None)
+def red_bloon_equivalent(bloon_type: BloonType) -> int:
+    """Damage needed to pop a bloon and every layer under it (its RBE)"""
+    properties = BLOON_PROPERTIES[bloon_type]
+    return properties.health + sum(red_bloon_equivalent(child) for child in properties.children)
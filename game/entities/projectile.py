@@ -3,16 +3,42 @@ Projectile entity class with BTD6-style mechanics
 """
 import pygame
 import math
-from typing import Tuple, TYPE_CHECKING, List, Optional
-from ..constants import BLACK
+from functools import lru_cache
+from typing import Tuple, TYPE_CHECKING, List, Optional, Union
+from .bloon_types import BLOON_PROPERTIES
+from ..constants import BLACK, SIM_TICK_RATE, SLOW_SPEED_MULTIPLIER
 
 if TYPE_CHECKING:
+    import numpy as np
     from .bloon import Bloon
+    from .bloon_store import BloonStore
+    from ..sim.spatial_grid import BloonGrid
+
+
+@lru_cache(maxsize=None)
+def ring_directions(count: int) -> Tuple[Tuple[float, float], ...]:
+    """Unit vectors of count directions evenly spread around a circle, the first pointing along +x"""
+    return tuple((math.cos(2 * math.pi * i / count), math.sin(2 * math.pi * i / count)) for i in range(count))
+
+
+def in_bounds(x: float, y: float) -> bool:
+    """Whether a point is on screen, or close enough to it that projectiles there are kept"""
+    return -50 <= x <= 850 and -50 <= y <= 650
 
 
 class Projectile:
+    SEEK_RANGE = 100 # How far seeking projectiles look for targets
+    RETARGET_INTERVAL = 6 # Ticks between target searches while a seeking projectile has no target
+    CHAIN_TARGETS = 20 # Extra bloons one chain lightning strike can jump to
+    CHAIN_RANGE = 60 # Longest single jump of chain lightning
+    RICOCHET_RANGE = 120 # How far a ricocheting projectile looks for its next bloon
+    HIT_BUFFER = 3 # Projectile radius added to the bloon's size for collisions
+    # Widest possible collision radius, for spatial queries
+    MAX_HIT_RADIUS = max(properties.size for properties in BLOON_PROPERTIES.values()) + HIT_BUFFER
+
     def __init__(self, start_pos: Tuple[float, float], target_pos: Tuple[float, float] = None, 
-                 damage: int = 1, speed: float = 5.0, pierce: int = 1, has_seeking: bool = False):
+                 damage: int = 1, speed: float = 5.0, pierce: int = 1, has_seeking: bool = False,
+                 explosion_radius: float = 0.0, burst_directions: int = 0):
         """Initialize the projectile with BTD6-style parameters.
 
         Args:
@@ -20,73 +46,146 @@ class Projectile:
             target_pos (Tuple[float, float]): The target position (for non-seeking projectiles).
             damage (int): The damage dealt by the projectile.
             speed (float): The speed of the projectile.
-            pierce (int): How many bloons this projectile can hit before expiring.
+            pierce (int): How many bloons this projectile can hit before expiring. For explosive
+                projectiles, how many bloons the explosion can hit.
             has_seeking (bool): Whether the projectile seeks targets automatically.
+            explosion_radius (float): Blast radius of the explosion on first contact, or 0 for none.
+            burst_directions (int): For a radial burst, the number of directions it fires in, or 0 for
+                an ordinary projectile. A burst is one ring expanding at speed from start_pos, with a
+                tack in each direction that has pierce of its own.
         """
-        self.position = [float(start_pos[0]), float(start_pos[1])]
+        self.position = [0.0, 0.0]
+        self.previous_position = [0.0, 0.0] # Position at the previous tick, for render interpolation
+        self.velocity = [0.0, 0.0]
+        self.hit_bloons = set()  # Track the uids of bloons we've already hit
+        self.direction_pierce = [] # Pierce left in each direction of a radial burst
+        self.max_lifetime = 5 * SIM_TICK_RATE  # Projectiles expire after 5 seconds of simulation time
+        self.reset(start_pos, target_pos, damage, speed, pierce, has_seeking, explosion_radius, burst_directions)
+
+    def reset(self, start_pos: Tuple[float, float], target_pos: Tuple[float, float] = None,
+              damage: int = 1, speed: float = 5.0, pierce: int = 1, has_seeking: bool = False,
+              explosion_radius: float = 0.0, burst_directions: int = 0):
+        """Reinitialize the projectile in place, reusing its lists and hit set. Takes the same arguments as __init__."""
+        self.position[0] = self.previous_position[0] = float(start_pos[0])
+        self.position[1] = self.previous_position[1] = float(start_pos[1])
         self.target_pos = target_pos if target_pos else start_pos
         self.damage = damage
         self.speed = speed
         self.pierce = pierce
-        self.pierce_remaining = pierce
         self.has_seeking = has_seeking
+        self.explosion_radius = explosion_radius
+        self.burst_directions = burst_directions
+        self.ring_radius = 0.0 # Distance of a burst's tacks from its center
+        self.direction_pierce[:] = [pierce] * burst_directions
+        self.pierce_remaining = pierce * burst_directions if burst_directions else pierce
+        # Status effects applied to each bloon hit, set by the tower that fires it
+        self.slow_duration = 0.0 # ms
+        self.freeze_duration = 0.0 # ms
+        self.stun_duration = 0.0 # ms
+        self.can_pop_frozen = True
+        # Special effects, set by the tower that fires it
+        self.chain_lightning = False # Each hit also strikes a chain of nearby bloons
+        self.ricochet = False # Bounces towards the nearest bloon it hasn't hit after each hit
+        # Seeking projectiles keep one target until it pops, is hit or leaves SEEK_RANGE
+        self.target: Optional['Bloon'] = None
+        self.next_retarget = 0 # Lifetime tick of the next target search
         self.alive = True
-        self.hit_bloons = set()  # Track which bloons we've already hit
+        self.hit_bloons.clear()
         
         # Calculate initial direction
+        self.velocity[0] = self.velocity[1] = 0.0
         if target_pos:
             dx = target_pos[0] - start_pos[0]
             dy = target_pos[1] - start_pos[1]
             distance = math.sqrt(dx * dx + dy * dy)
             if distance > 0:
-                self.velocity = [dx / distance * speed, dy / distance * speed]
-            else:
-                self.velocity = [0, 0]
-        else:
-            self.velocity = [0, 0]
+                self.velocity[0] = dx / distance * speed
+                self.velocity[1] = dy / distance * speed
         
-        self.lifetime = 0
-        self.max_lifetime = 300  # Projectiles expire after 5 seconds at 60fps
+        self.lifetime = 0 # Simulation ticks alive
 
-    def find_nearest_target(self, bloons: List['Bloon']) -> Optional['Bloon']:
-        """Find the nearest bloon that hasn't been hit yet"""
+    def find_nearest_target(self, bloons: List['Bloon'], grid: Optional['BloonGrid'] = None) -> Optional['Bloon']:
+        """Find the nearest bloon within SEEK_RANGE that hasn't been hit yet"""
         if not self.has_seeking:
             return None
-            
+
+        x, y = self.position
+        if grid is not None:
+            slot = self.nearest_unhit(grid, x, y, self.SEEK_RANGE)
+            return grid.store.handle(slot) if slot is not None else None
+
         nearest_bloon = None
-        nearest_distance = float('inf')
-        
+        nearest_distance_squared = self.SEEK_RANGE * self.SEEK_RANGE
         for bloon in bloons:
-            if not bloon.alive or bloon in self.hit_bloons:
+            if not bloon.alive or bloon.uid in self.hit_bloons:
                 continue
-                
-            distance = math.sqrt(
-                (bloon.position[0] - self.position[0]) ** 2 + 
-                (bloon.position[1] - self.position[1]) ** 2
-            )
-            
-            if distance < nearest_distance and distance < 100:  # Seeking range
-                nearest_distance = distance
+            bloon_x, bloon_y = bloon.position
+            distance_squared = (bloon_x - x) ** 2 + (bloon_y - y) ** 2
+            if distance_squared < nearest_distance_squared:
+                nearest_distance_squared = distance_squared
                 nearest_bloon = bloon
-                
         return nearest_bloon
 
-    def update(self, bloons: List['Bloon'] = None):
-        """Update projectile position and handle collisions"""
+    def nearest_unhit(self, grid: 'BloonGrid', x: float, y: float, radius: float) -> Optional[int]:
+        """Slot of the nearest live bloon within radius of (x, y) that this projectile hasn't hit yet"""
+        hit_bloons = self.hit_bloons
+        uids = grid.store.uid
+        for slot in grid.nearest(x, y, radius).tolist():
+            if int(uids[slot]) not in hit_bloons:
+                return slot
+        return None
+
+    def _keeps_target(self) -> bool:
+        """Whether the current target is still worth chasing: alive and within SEEK_RANGE"""
+        target = self.target
+        if not target.alive:
+            return False
+        target_x, target_y = target.position
+        dx = target_x - self.position[0]
+        dy = target_y - self.position[1]
+        return dx * dx + dy * dy <= self.SEEK_RANGE * self.SEEK_RANGE
+
+    def update(self, bloons: List['Bloon'] = None, grid: Optional['BloonGrid'] = None):
+        """Advance the projectile by one simulation tick and handle collisions
+
+        If a spatial grid is given, it is used to find nearby bloons and `bloons` is ignored.
+        """
+        self.advance(bloons, grid)
+        self.collide(bloons, grid)
+        self.check_bounds()
+
+    def advance(self, bloons: List['Bloon'] = None, grid: Optional['BloonGrid'] = None):
+        """Age the projectile, steer it if it is seeking and move it one tick"""
         if not self.alive:
             return
+        
+        self.previous_position[0] = self.position[0]
+        self.previous_position[1] = self.position[1]
             
         self.lifetime += 1
         if self.lifetime > self.max_lifetime:
             self.alive = False
             return
+
+        if self.burst_directions:
+            self.ring_radius += self.speed # The ring expands around its fixed center
+            return
         
-        # Seeking behavior - optimized distance calculation
-        if self.has_seeking and bloons:
-            target = self.find_nearest_target(bloons)
+        # Seeking behavior - keep chasing the current target. Losing it means searching straight away,
+        # but while searches come up empty they are only repeated every RETARGET_INTERVAL ticks.
+        if self.has_seeking:
+            if self.target is not None and not self._keeps_target():
+                self.target = None
+                self.next_retarget = self.lifetime
+            if self.target is None:
+                if self.lifetime >= self.next_retarget and (bloons or grid is not None):
+                    self.next_retarget = self.lifetime + self.RETARGET_INTERVAL
+                    self.target = self.find_nearest_target(bloons, grid)
+            target = self.target
             if target:
-                dx = target.position[0] - self.position[0]
-                dy = target.position[1] - self.position[1]
+                target_x, target_y = target.position
+                dx = target_x - self.position[0]
+                dy = target_y - self.position[1]
                 distance_squared = dx * dx + dy * dy
                 if distance_squared > 0:
                     # Only calculate sqrt when we need the actual distance
@@ -97,42 +196,181 @@ class Projectile:
         # Update position
         self.position[0] += self.velocity[0]
         self.position[1] += self.velocity[1]
+
+    def collide(self, bloons: List['Bloon'] = None, grid: Optional['BloonGrid'] = None):
+        """Damage the bloons this projectile overlaps, in order, until its pierce runs out
+
+        The simulation resolves all projectiles at once with game.sim.collision instead.
+        """
+        if not self.alive:
+            return
+        if self.burst_directions:
+            self._collide_burst(bloons, grid)
+            return
         
         # Check for collisions with bloons - optimized
+        if grid is not None:
+            bloons = grid.bloons_within(self.position[0], self.position[1], self.MAX_HIT_RADIUS)
         if bloons:
             for bloon in bloons:
-                if not bloon.alive or bloon in self.hit_bloons:
+                if not bloon.alive or bloon.uid in self.hit_bloons:
                     continue
                 
                 # Use squared distance to avoid sqrt calculation
-                dx = bloon.position[0] - self.position[0]
-                dy = bloon.position[1] - self.position[1]
+                bloon_x, bloon_y = bloon.position
+                dx = bloon_x - self.position[0]
+                dy = bloon_y - self.position[1]
                 distance_squared = dx * dx + dy * dy
                 
                 # Enhanced collision detection - use bloon's actual size plus small projectile buffer
-                collision_radius = bloon.size + 3  # Bloon radius + small projectile radius
+                collision_radius = bloon.size + self.HIT_BUFFER  # Bloon radius + small projectile radius
                 collision_radius_squared = collision_radius * collision_radius
                 
                 if distance_squared <= collision_radius_squared:
-                    bloon.take_damage(self.damage)
-                    self.hit_bloons.add(bloon)
-                    self.pierce_remaining -= 1
-                    
-                    if self.pierce_remaining <= 0:
-                        self.alive = False
+                    if self.explosion_radius > 0:
+                        self.explode(bloons, grid)
                         break
-        
-        # Check if projectile is off-screen (basic bounds checking)
-        if (self.position[0] < -50 or self.position[0] > 850 or 
-            self.position[1] < -50 or self.position[1] > 650):
+                    self.hit(bloon.uid)
+                    was_frozen = bloon.is_frozen
+                    self.apply_status(bloon._store, bloon.slot)
+                    if self.can_pop_frozen or not was_frozen:
+                        bloon.take_damage(self.damage)
+                    if not self.alive:
+                        break
+
+    def _collide_burst(self, bloons: List['Bloon'] = None, grid: Optional['BloonGrid'] = None):
+        """Damage the bloons a radial burst's tacks overlap, in order, until each direction's pierce runs out"""
+        x, y = self.position
+        if grid is not None:
+            bloons = grid.bloons_within(x, y, self.ring_radius + self.MAX_HIT_RADIUS)
+        for bloon in bloons or ():
+            if not bloon.alive or bloon.uid in self.hit_bloons:
+                continue
+            bloon_x, bloon_y = bloon.position
+            direction = self.burst_direction(bloon_x, bloon_y, bloon.size + self.HIT_BUFFER)
+            if direction is None:
+                continue
+            self.hit_direction(bloon.uid, direction)
+            was_frozen = bloon.is_frozen
+            self.apply_status(bloon._store, bloon.slot)
+            if self.can_pop_frozen or not was_frozen:
+                bloon.take_damage(self.damage)
+            if not self.alive:
+                break
+
+    def burst_direction(self, x: float, y: float, reach: float) -> Optional[int]:
+        """The first direction of this radial burst whose tack is within reach of (x, y) and still has pierce"""
+        dx = x - self.position[0]
+        dy = y - self.position[1]
+        count = self.burst_directions
+        directions = ring_directions(count)
+        # Only the two tacks either side of the bloon's angle can be close enough
+        below = math.floor(math.atan2(dy, dx) / (2 * math.pi / count)) % count
+        for direction in sorted((below, (below + 1) % count)):
+            if self.direction_pierce[direction] <= 0:
+                continue
+            unit_x, unit_y = directions[direction]
+            offset_x = dx - unit_x * self.ring_radius
+            offset_y = dy - unit_y * self.ring_radius
+            if offset_x * offset_x + offset_y * offset_y <= reach * reach:
+                return direction
+        return None
+
+    def explode(self, bloons: List['Bloon'] = None, grid: Optional['BloonGrid'] = None):
+        """Detonate, damaging up to pierce bloons overlapping the blast, then expire
+
+        The simulation resolves every explosion in a tick at once with game.sim.collision instead.
+        """
+        self.alive = False
+        x, y = self.position
+        if grid is not None:
+            bloons = grid.bloons_within(x, y, self.explosion_radius + self.MAX_HIT_RADIUS)
+        caught = []
+        for bloon in bloons or ():
+            if not bloon.alive:
+                continue
+            bloon_x, bloon_y = bloon.position
+            reach = self.explosion_radius + bloon.size
+            if (bloon_x - x) ** 2 + (bloon_y - y) ** 2 <= reach * reach:
+                caught.append(bloon)
+                if len(caught) == self.pierce:
+                    break
+        for bloon in caught:
+            was_frozen = bloon.is_frozen
+            self.apply_status(bloon._store, bloon.slot)
+            if self.can_pop_frozen or not was_frozen:
+                bloon.take_damage(self.damage)
+
+    @property
+    def has_status(self) -> bool:
+        """Whether this projectile applies any status effect"""
+        return bool(self.slow_duration or self.freeze_duration or self.stun_duration)
+
+    def apply_status(self, store: 'BloonStore', slots: 'Union[int, np.ndarray]'):
+        """Apply this projectile's status effects to bloons it hit"""
+        if self.slow_duration:
+            store.slow(slots, self.slow_duration, SLOW_SPEED_MULTIPLIER)
+        if self.freeze_duration:
+            store.freeze(slots, self.freeze_duration)
+        if self.stun_duration:
+            store.stun(slots, self.stun_duration)
+
+    def hit(self, bloon_uid: int):
+        """Record a hit on a bloon and use up one pierce"""
+        self.hit_bloons.add(bloon_uid)
+        if self.target is not None and self.target.uid == bloon_uid:
+            self.target = None # Look for a fresh target on the next tick
+            self.next_retarget = self.lifetime
+        self.pierce_remaining -= 1
+        if self.pierce_remaining <= 0:
+            self.alive = False
+
+    def hit_direction(self, bloon_uid: int, direction: int):
+        """Record a hit on a bloon by one direction of a radial burst, using up that direction's pierce"""
+        self.hit_bloons.add(bloon_uid)
+        self.direction_pierce[direction] -= 1
+        self.pierce_remaining -= 1
+        if self.pierce_remaining <= 0:
+            self.alive = False
+
+    def check_bounds(self):
+        """Check if projectile is off-screen (basic bounds checking)
+
+        A radial burst drops each direction whose tack has left the screen, and expires once none are left.
+        """
+        x, y = self.position
+        if not self.burst_directions:
+            if not in_bounds(x, y):
+                self.alive = False
+            return
+
+        radius = self.ring_radius
+        if radius <= min(x + 50, 850 - x, y + 50, 650 - y):
+            return # The whole ring is on screen
+        direction_pierce = self.direction_pierce
+        for direction, (unit_x, unit_y) in enumerate(ring_directions(self.burst_directions)):
+            if direction_pierce[direction] > 0 and not in_bounds(x + unit_x * radius, y + unit_y * radius):
+                self.pierce_remaining -= direction_pierce[direction]
+                direction_pierce[direction] = 0
+        if self.pierce_remaining <= 0:
             self.alive = False
     
-    def draw(self, screen):
-        """Draw the projectile"""
-        if self.alive:
-            # Draw projectile as a small circle
-            pygame.draw.circle(screen, BLACK, (int(self.position[0]), int(self.position[1])), 3)
+    def draw(self, screen, alpha: float = 1.0):
+        """Draw the projectile, interpolated alpha of the way from its previous to its current position"""
+        if self.alive and self.burst_directions:
+            # A tack in each direction that still has pierce
+            center_x, center_y = self.position
+            radius = self.ring_radius - self.speed * (1 - alpha)
+            for direction, (unit_x, unit_y) in enumerate(ring_directions(self.burst_directions)):
+                if self.direction_pierce[direction] > 0:
+                    pygame.draw.circle(screen, BLACK, (int(center_x + unit_x * radius), int(center_y + unit_y * radius)), 3)
+        elif self.alive:
+            x = int(self.previous_position[0] + (self.position[0] - self.previous_position[0]) * alpha)
+            y = int(self.previous_position[1] + (self.position[1] - self.previous_position[1]) * alpha)
+            
+            # Draw projectile as a small circle, bombs a little bigger
+            pygame.draw.circle(screen, BLACK, (x, y), 5 if self.explosion_radius > 0 else 3)
             
             # Optional: Draw trail for seeking projectiles
             if self.has_seeking:
-                pygame.draw.circle(screen, (255, 255, 0), (int(self.position[0]), int(self.position[1])), 2)
+                pygame.draw.circle(screen, (255, 255, 0), (x, y), 2)
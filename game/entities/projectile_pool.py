@@ -0,0 +1,62 @@
+"""
+Free-list pool of Projectile objects
+
+Towers fire many short-lived projectiles. Instead of allocating a new
+Projectile, with its own lists and hit set, for every shot and leaving the
+old ones to the garbage collector, dead projectiles are released back to the
+pool and reset in place the next time one is needed.
+"""
+from typing import Dict, List, Tuple
+from .projectile import Projectile
+
+
+class ProjectilePool:
+    def __init__(self, preallocate: int = 0):
+        """Initialize the pool.
+
+        Args:
+            preallocate (int, optional): Number of projectiles to create up front. Defaults to 0.
+        """
+        self._free: List[Projectile] = [Projectile((0, 0)) for _ in range(preallocate)]
+        self.allocated = preallocate # Projectiles ever created by this pool
+        self.in_use = 0 # Projectiles acquired and not yet released
+        self.high_water = 0 # Most projectiles ever in use at once
+
+    @property
+    def free(self) -> int:
+        """Projectiles waiting in the free list"""
+        return len(self._free)
+
+    def acquire(self, start_pos: Tuple[float, float], target_pos: Tuple[float, float] = None,
+                damage: int = 1, speed: float = 5.0, pierce: int = 1, has_seeking: bool = False,
+                explosion_radius: float = 0.0, burst_directions: int = 0) -> Projectile:
+        """Get a projectile initialized with the given parameters, reusing a released one if possible.
+
+        Takes the same arguments as Projectile.
+        """
+        if self._free:
+            projectile = self._free.pop()
+            projectile.reset(start_pos, target_pos, damage, speed, pierce, has_seeking, explosion_radius, burst_directions)
+        else:
+            projectile = Projectile(start_pos, target_pos, damage, speed, pierce, has_seeking, explosion_radius, burst_directions)
+            self.allocated += 1
+
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return projectile
+
+    def release(self, projectile: Projectile):
+        """Return a projectile to the pool. It must not be used again until it is re-acquired."""
+        projectile.alive = False
+        self._free.append(projectile)
+        self.in_use -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Occupancy of the pool"""
+        return {
+            'in_use': self.in_use,
+            'free': self.free,
+            'allocated': self.allocated,
+            'high_water': self.high_water,
+        }
@@ -3,16 +3,26 @@ Tower entity class
 """
 import pygame
 import math
+import numpy as np
 from typing import List, Tuple, Optional, TYPE_CHECKING
 from ..constants import BROWN, GRAY
+from .bloon_store import INNER_RBE_TABLE, ALIVE, CAMO, LEAD
 
 if TYPE_CHECKING:
     from .bloon import Bloon
     from .projectile import Projectile
+    from .projectile_pool import ProjectilePool
+    from ..sim.spatial_grid import BloonGrid
+    from ..sim.scheduler import FireScheduler
+    from ..sim.progress_index import ProgressIndex
+    from ..systems.path import PathTable
 
 
 class Tower:
     TOWER_RADIUS = 20 # Class constant for tower collision radius
+    TARGETING_MODES = ("first", "last", "close", "strong")
+    TACK_SPAWN_DISTANCE = 30 # Distance from the tower center at which tacks appear
+    BLAST_RADIUS_SCALE = 3 # towers.json blast radii are scaled up like ranges for gameplay
     
     def __init__(self, position: Tuple[int, int], range_val: int = 100, damage: int = 1, 
                  fire_rate: float = 1.0, tower_type: str = "dart_monkey", 
@@ -32,8 +42,12 @@ class Tower:
         self.range = range_val
         self.damage = damage
         self.fire_rate = fire_rate # shots per second
-        self.last_shot_time = 0
+        self.last_shot_time = float('-inf') # Simulation time (ms) of the last shot; ready to fire when placed
         self.target: Optional['Bloon'] = None
+        self.uid: Optional[int] = None # Assigned by the simulation when the tower is placed
+        self.fire_scheduler: Optional['FireScheduler'] = None # Set while a simulation schedules this tower's shots
+        self._coverage_key = None # (path table, position, range) the cached coverage was computed for
+        self._coverage: List[Tuple[float, float]] = []
         self.tower_type = tower_type
         self.selected = False
         
@@ -48,8 +62,10 @@ class Tower:
         self.can_pop_lead = False
         self.can_pop_frozen = True
         self.has_seeking = False
-        self.explosion_radius = 0
+        self.explosion_radius = 0 # Blast radius of each projectile's explosion, 0 for none
         self.slow_effect = 0  # Seconds of slow applied
+        self.freeze_effect = 0 # Seconds bloons hit stay frozen
+        self.stun_effect = 0 # Seconds bloons hit are stunned
         self.special_effects = []  # List of special effects like "ricochet", "chain_lightning"
         
         # Upgrade tracking
@@ -96,14 +112,22 @@ class Tower:
             self.projectile_speed += stats['projectile_speed']
         if 'explosion_radius' in stats:
             self.explosion_radius = stats['explosion_radius']
+        if 'blast_radius' in stats:
+            self.explosion_radius = stats['blast_radius'] * self.BLAST_RADIUS_SCALE
         if 'slow_effect' in stats:
             self.slow_effect = stats['slow_effect']
+        if 'freeze_effect' in stats:
+            self.freeze_effect = stats['freeze_effect']
+        if 'stun_effect' in stats:
+            self.stun_effect = stats['stun_effect']
         
         # Special abilities
         if 'can_see_camo' in stats:
             self.can_see_camo = stats['can_see_camo']
         if 'can_pop_lead' in stats:
             self.can_pop_lead = stats['can_pop_lead']
+        if 'can_pop_frozen' in stats:
+            self.can_pop_frozen = stats['can_pop_frozen']
         if 'has_seeking' in stats:
             self.has_seeking = stats['has_seeking']
         if 'special_effects' in stats:
@@ -113,26 +137,69 @@ class Tower:
         path_num = path[-1] # Extract number from "path1", "path2", etc.
         self.upgrade_levels[path] += 1
         
+        # A fire rate upgrade can bring the next shot forward
+        if self.fire_scheduler is not None:
+            self.fire_scheduler.reschedule(self)
+
         print(f"Tower upgraded: {upgrade_data['name']} - New stats: DMG:{self.damage} RNG:{self.range} FR:{self.fire_rate:.2f} PIERCE:{self.pierce}")
         print(f"Total spent: ${self.total_spent}, Sell value: ${self.get_sell_price()}")
 
+    @property
+    def blocked_flags(self) -> int:
+        """Bloon flag bits (CAMO, LEAD) that make a bloon untargetable for this tower"""
+        blocked = 0
+        if not self.can_see_camo:
+            blocked |= CAMO
+        if not self.can_pop_lead:
+            blocked |= LEAD
+        return blocked
+
     def can_target_bloon(self, bloon: 'Bloon') -> bool:
         """Check if this tower can target a specific bloon type"""
         # Add camo detection logic
-        if hasattr(bloon, 'is_camo') and bloon.is_camo and not self.can_see_camo:
+        if bloon.is_camo and not self.can_see_camo:
             return False
         
         # Add lead popping logic
-        if hasattr(bloon, 'is_lead') and bloon.is_lead and not self.can_pop_lead:
+        if bloon.is_lead and not self.can_pop_lead:
             return False
             
         return True
 
+    @property
+    def next_fire_time(self) -> float:
+        """Simulation time (ms) at which the cooldown from the last shot runs out"""
+        return self.last_shot_time + 1000 / self.fire_rate # Convert to milliseconds
+
     def can_shoot(self, current_time: float) -> bool:
-        return current_time - self.last_shot_time >= (1000 / self.fire_rate) # Convert to milliseconds
+        """Check if the cooldown has elapsed at the given simulation time (ms)"""
+        return current_time >= self.next_fire_time
     
-    def find_target(self, bloons: List['Bloon']) -> Optional['Bloon']:
-        """Find a target bloon based on targeting mode - optimized"""
+    def path_coverage(self, path_table: 'PathTable') -> List[Tuple[float, float]]:
+        """Intervals of path distance inside this tower's range
+
+        Computed once and cached until the tower moves or its range changes.
+        """
+        key = (path_table, self.position[0], self.position[1], self.range)
+        if key != self._coverage_key:
+            self._coverage = path_table.coverage(self.position, self.range)
+            self._coverage_key = key
+        return self._coverage
+
+    def find_target(self, bloons: List['Bloon'], grid: Optional['BloonGrid'] = None,
+                    progress: Optional['ProgressIndex'] = None) -> Optional['Bloon']:
+        """Find a target bloon based on targeting mode - optimized
+
+        If a progress index is given, the bloons in range are looked up by
+        path distance within this tower's path coverage. Otherwise, if a
+        spatial grid is given, only the bloons it finds within range are
+        considered. In either case `bloons` is ignored.
+        """
+        if progress is not None:
+            return self._find_target_on_path(progress)
+        if grid is not None:
+            bloons = grid.bloons_within(self.position[0], self.position[1], self.range)
+        
         targets_in_range = []
         range_squared = self.range * self.range  # Cache squared range
         
@@ -141,37 +208,80 @@ class Tower:
                 continue
             
             # Use squared distance to avoid sqrt calculation    
-            dx = self.position[0] - bloon.position[0]
-            dy = self.position[1] - bloon.position[1]
+            bloon_x, bloon_y = bloon.position
+            dx = self.position[0] - bloon_x
+            dy = self.position[1] - bloon_y
             distance_squared = dx * dx + dy * dy
             
             if distance_squared <= range_squared and self.can_target_bloon(bloon):
                 # Only calculate actual distance when needed for sorting
                 distance = math.sqrt(distance_squared) if self.targeting_mode == "close" else 0
-                targets_in_range.append((bloon, distance))
+                targets_in_range.append((bloon, distance, len(targets_in_range)))
         
         if not targets_in_range:
             return None
         
-        # Sort based on targeting mode
+        # Sort based on targeting mode. Ties always go to the bloon listed first (the
+        # earliest spawned, as the simulation lists bloons in spawn order) so replays are deterministic
         if self.targeting_mode == "first":
             # Target bloon that has traveled furthest along the path
-            return max(targets_in_range, key=lambda x: x[0].path_index)[0]
+            return max(targets_in_range, key=lambda x: (x[0].distance_travelled, -x[2]))[0]
         elif self.targeting_mode == "last":
             # Target bloon that has traveled least along the path
-            return min(targets_in_range, key=lambda x: x[0].path_index)[0]
+            return min(targets_in_range, key=lambda x: (x[0].distance_travelled, x[2]))[0]
         elif self.targeting_mode == "close":
             # Target closest bloon
-            return min(targets_in_range, key=lambda x: x[1])[0]
+            return min(targets_in_range, key=lambda x: (x[1], x[2]))[0]
         elif self.targeting_mode == "strong":
-            # Target bloon with highest health
-            return max(targets_in_range, key=lambda x: x[0].health)[0]
+            # Target bloon with the most layers left
+            return max(targets_in_range, key=lambda x: (x[0].rbe, -x[2]))[0]
         else:
             # Default to first targeting
-            return max(targets_in_range, key=lambda x: x[0].path_index)[0]
+            return max(targets_in_range, key=lambda x: (x[0].distance_travelled, -x[2]))[0]
     
-    def fire_projectiles(self, target: 'Bloon', current_time: float) -> list:
-        """Fire projectiles at target and return list of projectile objects"""
+    def _find_target_on_path(self, progress: 'ProgressIndex') -> Optional['Bloon']:
+        """find_target for bloons indexed by path distance
+
+        Picks the same bloon as a full scan: ties go to the earliest spawned.
+        """
+        store = progress.store
+        blocked = self.blocked_flags
+
+        def targetable(slots: np.ndarray) -> np.ndarray:
+            return slots[(store.flags[slots] & (ALIVE | blocked)) == ALIVE]
+
+        def earliest_spawned(slots: np.ndarray, keys: np.ndarray, best) -> 'Bloon':
+            return store.handle(int(slots[keys == best].min()))
+
+        intervals = self.path_coverage(store.path_table)
+        mode = self.targeting_mode if self.targeting_mode in self.TARGETING_MODES else "first"
+
+        if mode in ("first", "last"):
+            # Intervals are disjoint, so the best bloon is in the furthest (or nearest) interval holding any target
+            for start, end in (reversed(intervals) if mode == "first" else intervals):
+                low, high = progress.span(start, end)
+                candidates = targetable(progress.slots[low:high])
+                if len(candidates):
+                    distances = store.distance[candidates]
+                    best = distances.max() if mode == "first" else distances.min()
+                    return earliest_spawned(candidates, distances, best)
+            return None
+
+        candidates = targetable(progress.slots_within(intervals))
+        if not len(candidates):
+            return None
+        if mode == "close":
+            offsets = store.position[candidates] - self.position
+            keys = np.einsum('ij,ij->i', offsets, offsets)
+            return earliest_spawned(candidates, keys, keys.min())
+        keys = store.health[candidates] + INNER_RBE_TABLE[store.type[candidates]]
+        return earliest_spawned(candidates, keys, keys.max())
+
+    def fire_projectiles(self, target: 'Bloon', current_time: float, pool: Optional['ProjectilePool'] = None) -> list:
+        """Fire projectiles at target and return list of projectile objects
+
+        If a projectile pool is given, projectiles are acquired from it instead of newly allocated.
+        """
         if not self.can_shoot(current_time):
             return []
             
@@ -179,31 +289,46 @@ class Tower:
         from .projectile import Projectile
         import math
         
+        make_projectile = pool.acquire if pool is not None else Projectile
         projectiles = []
         
-        if self.tower_type == "tack_shooter":
-            # Fire projectiles in all directions (8 directions for Tack Shooter)
-            directions = 8
+        if self.tower_type == "tack_shooter" and not (self.has_seeking or self.explosion_radius or
+                                                      "ricochet" in self.special_effects):
+            # One ring of tacks expanding in all directions - one per projectile - rather than a projectile per direction
+            projectile = make_projectile(
+                start_pos=self.position,
+                damage=self.damage,
+                speed=self.projectile_speed,
+                pierce=self.pierce,
+                burst_directions=self.projectiles
+            )
+            projectile.ring_radius = self.TACK_SPAWN_DISTANCE
+            projectiles.append(projectile)
+        elif self.tower_type == "tack_shooter":
+            # Tacks that seek, explode or ricochet each need their own projectile
+            directions = self.projectiles
             for i in range(directions):
                 angle = (2 * math.pi * i) / directions
-                proj_x = self.position[0] + math.cos(angle) * 30
-                proj_y = self.position[1] + math.sin(angle) * 30
+                proj_x = self.position[0] + math.cos(angle) * self.TACK_SPAWN_DISTANCE
+                proj_y = self.position[1] + math.sin(angle) * self.TACK_SPAWN_DISTANCE
                 
                 # Calculate target position in that direction
                 target_x = self.position[0] + math.cos(angle) * self.range
                 target_y = self.position[1] + math.sin(angle) * self.range
                 
-                projectile = Projectile(
+                projectile = make_projectile(
                     start_pos=(proj_x, proj_y),
                     target_pos=(target_x, target_y),
                     damage=self.damage,
                     speed=self.projectile_speed,
                     pierce=self.pierce,
-                    has_seeking=self.has_seeking
+                    has_seeking=self.has_seeking,
+                    explosion_radius=self.explosion_radius
                 )
                 projectiles.append(projectile)
         else:
             # Standard single or multi-projectile towers (like Dart Monkey)
+            target_x, target_y = target.position
             for i in range(self.projectiles):
                 # Add slight spread for multiple projectiles
                 spread_angle = 0
@@ -211,8 +336,8 @@ class Tower:
                     spread_angle = (i - (self.projectiles - 1) / 2) * 0.1  # Small spread
                 
                 # Calculate angle to target
-                dx = target.position[0] - self.position[0]
-                dy = target.position[1] - self.position[1]
+                dx = target_x - self.position[0]
+                dy = target_y - self.position[1]
                 base_angle = math.atan2(dy, dx)
                 final_angle = base_angle + spread_angle
                 
@@ -221,15 +346,29 @@ class Tower:
                 proj_x = self.position[0] + math.cos(final_angle) * spawn_distance
                 proj_y = self.position[1] + math.sin(final_angle) * spawn_distance
                 
-                projectile = Projectile(
+                projectile = make_projectile(
                     start_pos=(proj_x, proj_y),
-                    target_pos=target.position,
+                    target_pos=(target_x, target_y),
                     damage=self.damage,
                     speed=self.projectile_speed,
                     pierce=self.pierce,
-                    has_seeking=self.has_seeking
+                    has_seeking=self.has_seeking,
+                    explosion_radius=self.explosion_radius
                 )
                 projectiles.append(projectile)
+
+        if self.slow_effect or self.freeze_effect or self.stun_effect or not self.can_pop_frozen:
+            for projectile in projectiles:
+                projectile.slow_duration = self.slow_effect * 1000
+                projectile.freeze_duration = self.freeze_effect * 1000
+                projectile.stun_duration = self.stun_effect * 1000
+                projectile.can_pop_frozen = self.can_pop_frozen
+        if self.special_effects:
+            chain_lightning = "chain_lightning" in self.special_effects
+            ricochet = "ricochet" in self.special_effects
+            for projectile in projectiles:
+                projectile.chain_lightning = chain_lightning
+                projectile.ricochet = ricochet
         
         return projectiles
 
@@ -240,21 +379,22 @@ class Tower:
             return projectiles[0] if projectiles else None
         return None
     
-    def update(self, bloons: List['Bloon'], current_time: float) -> List['Projectile']:
+    def update(self, bloons: List['Bloon'], current_time: float, grid: Optional['BloonGrid'] = None,
+               pool: Optional['ProjectilePool'] = None, progress: Optional['ProgressIndex'] = None) -> List['Projectile']:
         """Update tower and return list of projectiles fired this frame"""
         # Find new target if current target is invalid
         if not self.target or not self.target.alive:
-            self.target = self.find_target(bloons)
+            self.target = self.find_target(bloons, grid, progress)
         
         # Fire projectiles at target
         if self.target and self.target.alive:
-            return self.fire_projectiles(self.target, current_time)
+            return self.fire_projectiles(self.target, current_time, pool)
         
         return []
     
     def cycle_targeting_mode(self):
         """Cycle through targeting modes: first -> last -> close -> strong -> first"""
-        modes = ["first", "last", "close", "strong"]
+        modes = self.TARGETING_MODES
         current_index = modes.index(self.targeting_mode)
         next_index = (current_index + 1) % len(modes)
         self.targeting_mode = modes[next_index]
@@ -0,0 +1,11 @@
+"""
+Headless game simulation package
+"""
+from .engine import GameSimulation
+from .clock import FixedTimestep
+from .scheduler import FireScheduler
+from .inputs import InputEvent, InputLog
+from .replay import ReplayPlayer
+from .autosave import Autosaver
+
+__all__ = ['GameSimulation', 'FixedTimestep', 'FireScheduler', 'InputEvent', 'InputLog', 'ReplayPlayer', 'Autosaver']
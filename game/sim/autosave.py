@@ -0,0 +1,133 @@
+"""
+Background autosave
+
+Saving is split in two. On the game thread the simulation's state is
+captured with snapshot(), an immutable byte string that costs well under a
+millisecond, so the game carries on mutating its own state while the copy
+is saved. A worker thread then compresses the snapshot, writes it to disk
+and optionally uploads it, so a slow disk or a backend request with a 10 s
+timeout never stalls the render loop.
+
+Only the newest capture matters: if a save is still in progress when the
+next one is requested, the waiting capture is replaced rather than queued.
+"""
+import base64
+import os
+import threading
+import zlib
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+from ..constants import AUTOSAVE_PATH, AUTOSAVE_INTERVAL_TICKS
+from .snapshot import SNAPSHOT_VERSION
+
+if TYPE_CHECKING:
+    from .engine import GameSimulation
+
+
+class Autosaver:
+    def __init__(self, path: Optional[str] = AUTOSAVE_PATH, upload: Optional[Callable[[Dict], object]] = None,
+                 interval_ticks: int = AUTOSAVE_INTERVAL_TICKS):
+        """Initialize the autosaver and start its worker thread.
+
+        Args:
+            path (str, optional): File the latest save is written to, or None to skip the disk. Defaults to AUTOSAVE_PATH.
+            upload (Callable[[Dict], object], optional): Called on the worker thread with a JSON-friendly save,
+                e.g. backend_client.save_game. Defaults to None (no upload).
+            interval_ticks (int, optional): Simulation ticks between periodic saves. Defaults to AUTOSAVE_INTERVAL_TICKS.
+        """
+        self.path = path
+        self.upload = upload
+        self.interval_ticks = interval_ticks
+        self.last_save_tick = 0
+        self.last_wave_number = None
+        self.saves_written = 0
+
+        self._condition = threading.Condition()
+        self._pending: Optional[Dict] = None # Newest capture not yet picked up by the worker
+        self._busy = False # The worker is writing a save
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def update(self, sim: 'GameSimulation') -> bool:
+        """Save if a wave has just ended or the interval has passed. Call once per frame. Returns True if it saved."""
+        if sim.game_over:
+            return False
+        wave_ended = self.last_wave_number is not None and sim.wave_number > self.last_wave_number
+        self.last_wave_number = sim.wave_number
+        if wave_ended or sim.tick - self.last_save_tick >= self.interval_ticks:
+            self.save(sim)
+            return True
+        return False
+
+    def save(self, sim: 'GameSimulation'):
+        """Capture the simulation now and hand it to the worker thread to be written"""
+        capture = {
+            'tick': sim.tick,
+            'wave': sim.wave_number,
+            'money': sim.money,
+            'lives': sim.lives,
+            'snapshot': sim.snapshot(),
+        }
+        self.last_save_tick = sim.tick
+        with self._condition:
+            self._pending = capture
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every requested save has been written. Returns False if the timeout ran out first."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Finish any pending save and stop the worker thread"""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                capture, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self._write(capture)
+            except Exception as e:
+                print(f"Error autosaving: {e}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write(self, capture: Dict):
+        """Compress a capture and write it out. Runs on the worker thread."""
+        data = zlib.compress(capture['snapshot'])
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = self.path + ".tmp"
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, self.path) # Never leave a half-written save behind
+        if self.upload is not None:
+            self.upload({
+                'format': 'snapshot',
+                'version': SNAPSHOT_VERSION,
+                'current_round': capture['wave'],
+                'tick': capture['tick'],
+                'money': capture['money'],
+                'lives': capture['lives'],
+                'snapshot': base64.b64encode(data).decode('ascii'),
+            })
+        self.saves_written += 1
+
+    @staticmethod
+    def load(path: str = AUTOSAVE_PATH) -> bytes:
+        """Read a save written to disk, ready for GameSimulation.restore()"""
+        with open(path, "rb") as f:
+            return zlib.decompress(f.read())
@@ -0,0 +1,35 @@
+"""
+Fixed-timestep accumulator for driving the simulation from a variable frame rate
+"""
+from ..constants import SIM_TICK_MS, MAX_FRAME_MS
+
+
+class FixedTimestep:
+    def __init__(self, tick_ms: float = SIM_TICK_MS, max_frame_ms: float = MAX_FRAME_MS, speed: float = 1):
+        """Initialize the accumulator.
+
+        Args:
+            tick_ms (float, optional): Length of one simulation tick in milliseconds. Defaults to SIM_TICK_MS.
+            max_frame_ms (float, optional): Longest frame that is caught up on; anything beyond is dropped. Defaults to MAX_FRAME_MS.
+            speed (float, optional): Simulated time per real time, e.g. 2 for double speed. Defaults to 1.
+        """
+        self.tick_ms = tick_ms
+        self.max_frame_ms = max_frame_ms
+        self.speed = speed
+        self.accumulator = 0.0
+
+    def advance(self, frame_ms: float) -> int:
+        """Add a rendered frame's real duration and return how many ticks are now due"""
+        self.accumulator += min(frame_ms, self.max_frame_ms) * self.speed
+        ticks = int(self.accumulator // self.tick_ms)
+        self.accumulator -= ticks * self.tick_ms
+        return ticks
+
+    @property
+    def alpha(self) -> float:
+        """How far between the last two ticks the current frame is (0.0 to 1.0), for render interpolation"""
+        return self.accumulator / self.tick_ms
+
+    def reset(self):
+        """Drop any partially accumulated time (e.g. after unpausing)"""
+        self.accumulator = 0.0
@@ -0,0 +1,343 @@
+"""
+Batched projectile-bloon collision pass
+
+Instead of every projectile looping over nearby bloons in Python, all live
+projectile positions and all live bloon positions/radii are gathered into
+arrays once per tick. Candidate pairs come from a sort-and-sweep along x,
+are confirmed with one vectorized distance test, and only the confirmed hits
+are resolved one by one.
+
+Explosive projectiles detonate on their first contact instead. Every
+detonation in the tick is resolved together by resolve_explosions(): one
+batched spatial grid query finds the bloons inside each blast, each blast's
+pierce cap keeps its first bloons in spawn order, and the damage is summed
+per bloon, so hundreds of blasts over a dense crowd cost a few array
+operations plus one damage call per bloon hit.
+
+A Tack Shooter's radial burst is one projectile: a ring of tacks expanding
+from the tower. resolve_bursts() tests each bloon near a ring once - is it in
+the annulus the tacks sweep, and if so, is a tack either side of it in angle
+touching it - instead of testing every tack as a separate projectile.
+
+Chain lightning and ricochet hop from bloon to bloon. Each hop asks the
+spatial grid for the nearest bloons around the last one hit, which only
+searches the cells within the hop's range rather than every bloon.
+"""
+import numpy as np
+from typing import List, Optional, TYPE_CHECKING
+from ..entities.bloon_store import ALIVE, FROZEN, SIZE_TABLE
+from ..entities.projectile import Projectile
+from .spatial_grid import BloonGrid
+
+if TYPE_CHECKING:
+    from ..entities.bloon_store import BloonStore
+
+
+def find_hits(projectile_positions: np.ndarray, bloon_positions: np.ndarray, bloon_radii: np.ndarray):
+    """Find every overlapping (projectile, bloon) pair.
+
+    Args:
+        projectile_positions (np.ndarray): (P, 2) projectile positions.
+        bloon_positions (np.ndarray): (B, 2) bloon positions.
+        bloon_radii (np.ndarray): (B,) collision radius of each bloon.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Projectile indices and bloon indices of each overlapping pair,
+        ordered by projectile, then bloon.
+    """
+    empty = np.zeros(0, dtype=np.intp)
+    if len(projectile_positions) == 0 or len(bloon_positions) == 0:
+        return empty, empty
+
+    # Sweep: bloons sorted by x, each projectile only pairs with bloons within the widest radius in x
+    order = np.argsort(bloon_positions[:, 0], kind='stable')
+    sorted_x = bloon_positions[order, 0]
+    reach = bloon_radii.max()
+    low = np.searchsorted(sorted_x, projectile_positions[:, 0] - reach, side='left')
+    high = np.searchsorted(sorted_x, projectile_positions[:, 0] + reach, side='right')
+    counts = high - low
+    total = int(counts.sum())
+    if total == 0:
+        return empty, empty
+
+    # Expand each projectile's [low, high) run into explicit candidate pairs
+    pair_projectiles = np.repeat(np.arange(len(projectile_positions)), counts)
+    run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_bloons = order[np.repeat(low, counts) + run_offsets]
+
+    # Exact circle test on the candidates
+    offsets = projectile_positions[pair_projectiles] - bloon_positions[pair_bloons]
+    radii = bloon_radii[pair_bloons]
+    hits = np.einsum('ij,ij->i', offsets, offsets) <= radii * radii
+    pair_projectiles = pair_projectiles[hits]
+    pair_bloons = pair_bloons[hits]
+
+    ordering = np.lexsort((pair_bloons, pair_projectiles))
+    return pair_projectiles[ordering], pair_bloons[ordering]
+
+
+def resolve_projectile_hits(projectiles: List[Projectile], store: 'BloonStore', grid: Optional[BloonGrid] = None):
+    """Apply damage for every projectile overlapping a live bloon this tick.
+
+    Hits are resolved in a fixed order - projectiles in list order, each one
+    hitting bloons in spawn order - so the outcome is deterministic and matches
+    resolving projectiles one at a time. A bloon popped earlier in the pass
+    can't be hit again, a projectile never hits the same bloon twice, and a
+    projectile stops once its pierce runs out. Explosive projectiles detonate
+    on their first hit and their blasts are resolved at the end of the pass.
+    Chain lightning and ricochet projectiles hop on from each bloon they hit.
+    Radial bursts are resolved after the other projectiles, by resolve_bursts().
+    Explosions, bursts and hops use grid if it is given (it must have been rebuilt
+    since bloons last moved).
+    """
+    live = [projectile for projectile in projectiles if projectile.alive]
+    bursts = [projectile for projectile in live if projectile.burst_directions]
+    if bursts:
+        live = [projectile for projectile in live if not projectile.burst_directions]
+    elif not live:
+        return
+
+    slots = np.nonzero(store.active_mask())[0]
+    if len(slots) == 0:
+        return
+
+    projectile_positions = np.array([projectile.position for projectile in live], dtype=np.float64).reshape(-1, 2)
+    radii = SIZE_TABLE[store.type[slots]] + Projectile.HIT_BUFFER
+    hit_projectiles, hit_bloons = find_hits(projectile_positions, store.position[slots], radii)
+
+    flags = store.flags
+    uids = store.uid
+    detonated = []
+    for projectile_index, slot in zip(hit_projectiles.tolist(), slots[hit_bloons].tolist()):
+        projectile = live[projectile_index]
+        if not projectile.alive or not flags[slot] & ALIVE:
+            continue
+        if projectile.explosion_radius > 0:
+            projectile.alive = False
+            detonated.append(projectile)
+            continue
+        uid = int(uids[slot])
+        if uid in projectile.hit_bloons:
+            continue
+        projectile.hit(uid)
+        was_frozen = flags[slot] & FROZEN # Before this hit's own freeze lands
+        if projectile.has_status:
+            projectile.apply_status(store, slot)
+        if was_frozen and not projectile.can_pop_frozen:
+            continue # Glances off the ice, still using up pierce
+        store.damage(slot, projectile.damage)
+        if projectile.chain_lightning or projectile.ricochet:
+            if grid is None:
+                grid = BloonGrid(store)
+                grid.rebuild()
+            if projectile.chain_lightning:
+                chain_lightning(projectile, store, grid, slot)
+            if projectile.ricochet and projectile.alive:
+                ricochet(projectile, store, grid, slot)
+
+    if bursts:
+        resolve_bursts(bursts, store, grid)
+
+    if detonated:
+        resolve_explosions(
+            np.array([projectile.position for projectile in detonated], dtype=np.float64),
+            np.array([projectile.explosion_radius for projectile in detonated], dtype=np.float64),
+            np.array([projectile.damage for projectile in detonated], dtype=np.int64),
+            np.array([projectile.pierce for projectile in detonated], dtype=np.int64),
+            store, grid, detonated
+        )
+
+
+def resolve_bursts(bursts: List[Projectile], store: 'BloonStore', grid: Optional[BloonGrid] = None) -> int:
+    """Apply damage for every radial burst whose tacks overlap a live bloon this tick.
+
+    The bloons near each ring come from one batched grid query. A bloon is hit
+    when it is within reach of the ring's annulus and a tack either side of it
+    in angle touches it, as if that tack were its own projectile. Hits are
+    resolved in burst order, then spawn order, each using up the pierce of the
+    tack's direction only. A burst hits each bloon at most once.
+
+    Returns:
+        int: The number of (burst, bloon) hits.
+    """
+    if store.live == 0:
+        return 0
+    if grid is None:
+        grid = BloonGrid(store)
+        grid.rebuild()
+
+    centers = np.array([burst.position for burst in bursts], dtype=np.float64)
+    rings = np.array([burst.ring_radius for burst in bursts], dtype=np.float64)
+    reach_table = SIZE_TABLE[store.type[:store.count]] + Projectile.HIT_BUFFER
+    burst_index, slots = grid.query_many(centers, rings, reach_table)
+
+    # Annulus test: the bloon overlaps the band of width 2 * reach the tacks sweep along
+    dx = store.position[slots, 0] - centers[burst_index, 0]
+    dy = store.position[slots, 1] - centers[burst_index, 1]
+    reach = reach_table[slots]
+    inner = np.maximum(rings[burst_index] - reach, 0)
+    in_band = (dx * dx + dy * dy >= inner * inner) & ((store.flags[slots] & ALIVE) != 0)
+    burst_index, slots, dx, dy, reach = burst_index[in_band], slots[in_band], dx[in_band], dy[in_band], reach[in_band]
+
+    # Only the two tacks either side of the bloon's angle can touch it; where both do, the lower
+    # direction gets the first chance, as if the tacks were separate projectiles fired in order
+    counts = np.array([burst.burst_directions for burst in bursts], dtype=np.intp)[burst_index]
+    step = 2 * np.pi / counts
+    below = np.floor(np.arctan2(dy, dx) / step).astype(np.intp) % counts
+    above = (below + 1) % counts
+    first, second = np.minimum(below, above), np.maximum(below, above)
+    ring = rings[burst_index]
+    touches = []
+    for directions in (first, second):
+        offset_x = dx - np.cos(directions * step) * ring
+        offset_y = dy - np.sin(directions * step) * ring
+        touches.append(offset_x * offset_x + offset_y * offset_y <= reach * reach)
+    first_touches, second_touches = touches
+    touching = first_touches | second_touches
+
+    flags = store.flags
+    uids = store.uid
+    hits = 0
+    for index, slot, first_direction, first_touch, second_direction, second_touch in zip(
+            burst_index[touching].tolist(), slots[touching].tolist(), first[touching].tolist(),
+            first_touches[touching].tolist(), second[touching].tolist(), second_touches[touching].tolist()):
+        burst = bursts[index]
+        direction_pierce = burst.direction_pierce
+        if first_touch and direction_pierce[first_direction] > 0:
+            direction = first_direction
+        elif second_touch and direction_pierce[second_direction] > 0:
+            direction = second_direction
+        else:
+            continue
+        if not flags[slot] & ALIVE:
+            continue
+        uid = int(uids[slot])
+        if uid in burst.hit_bloons:
+            continue
+        burst.hit_direction(uid, direction)
+        hits += 1
+        was_frozen = flags[slot] & FROZEN
+        if burst.has_status:
+            burst.apply_status(store, slot)
+        if was_frozen and not burst.can_pop_frozen:
+            continue
+        store.damage(slot, burst.damage)
+        if burst.chain_lightning:
+            chain_lightning(burst, store, grid, slot)
+    return hits
+
+
+def _nearest_unhit(projectile: Projectile, store: 'BloonStore', grid: BloonGrid, slot: int,
+                   radius: float) -> Optional[int]:
+    """The nearest live bloon within radius of a bloon that the projectile hasn't hit yet"""
+    x, y = store.position[slot].tolist()
+    return projectile.nearest_unhit(grid, x, y, radius)
+
+
+def chain_lightning(projectile: Projectile, store: 'BloonStore', grid: BloonGrid, slot: int) -> List[int]:
+    """Strike a chain of bloons from one the projectile just hit.
+
+    Each jump goes to the nearest bloon within Projectile.CHAIN_RANGE of the
+    last one struck that the projectile hasn't hit, for up to
+    Projectile.CHAIN_TARGETS jumps. Every bloon struck takes the projectile's
+    damage and status effects. Jumps don't use up pierce.
+
+    Returns:
+        List[int]: The slots struck after the first, in order.
+    """
+    struck = []
+    for _ in range(Projectile.CHAIN_TARGETS):
+        slot = _nearest_unhit(projectile, store, grid, slot, Projectile.CHAIN_RANGE)
+        if slot is None:
+            break
+        struck.append(slot)
+        projectile.hit_bloons.add(int(store.uid[slot]))
+        was_frozen = store.flags[slot] & FROZEN
+        if projectile.has_status:
+            projectile.apply_status(store, slot)
+        if was_frozen and not projectile.can_pop_frozen:
+            continue
+        store.damage(slot, projectile.damage)
+    return struck
+
+
+def ricochet(projectile: Projectile, store: 'BloonStore', grid: BloonGrid, slot: int) -> bool:
+    """Turn a projectile towards the nearest bloon it hasn't hit, within Projectile.RICOCHET_RANGE
+    of the one it just hit. Returns False if there is none and it carries straight on."""
+    target = _nearest_unhit(projectile, store, grid, slot, Projectile.RICOCHET_RANGE)
+    if target is None:
+        return False
+    target_x, target_y = store.position[target].tolist()
+    dx = target_x - projectile.position[0]
+    dy = target_y - projectile.position[1]
+    distance = (dx * dx + dy * dy) ** 0.5
+    if distance > 0:
+        projectile.velocity[0] = dx / distance * projectile.speed
+        projectile.velocity[1] = dy / distance * projectile.speed
+    projectile.target_pos = (target_x, target_y)
+    return True
+
+
+def resolve_explosions(centers: np.ndarray, radii: np.ndarray, damages: np.ndarray, pierce: np.ndarray,
+                       store: 'BloonStore', grid: Optional[BloonGrid] = None,
+                       sources: Optional[List[Projectile]] = None) -> int:
+    """Deal splash damage for a batch of simultaneous explosions.
+
+    Each explosion hits the live bloons overlapping its blast, at most its
+    pierce of them, earliest spawned first. A bloon caught in several blasts
+    takes their damage summed, so leftover damage carries into its children.
+
+    Args:
+        centers (np.ndarray): (E, 2) explosion positions.
+        radii (np.ndarray): (E,) blast radius of each explosion.
+        damages (np.ndarray): (E,) damage each explosion deals to every bloon it hits.
+        pierce (np.ndarray): (E,) most bloons each explosion can hit.
+        store (BloonStore): The bloons.
+        grid (BloonGrid, optional): Spatial grid over the store, rebuilt since bloons last moved.
+            Defaults to None (one is built).
+        sources (List[Projectile], optional): The projectile behind each explosion, for its status
+            effects and whether it pops frozen bloons. Defaults to None (plain blasts).
+
+    Returns:
+        int: The number of (explosion, bloon) hits.
+    """
+    if len(centers) == 0 or store.live == 0:
+        return 0
+    if grid is None:
+        grid = BloonGrid(store)
+        grid.rebuild()
+
+    # Bloons overlapping each blast, skipping any popped earlier this tick
+    blast, slots = grid.query_many(centers, radii, SIZE_TABLE[store.type[:store.count]])
+    alive = (store.flags[slots] & ALIVE) != 0
+    blast, slots = blast[alive], slots[alive]
+
+    # Pairs come grouped by explosion in spawn order, so each cap keeps the first pairs of its group
+    group_start = np.searchsorted(blast, np.arange(len(centers)))
+    rank = np.arange(len(blast)) - group_start[blast]
+    capped = rank < pierce[blast]
+    blast, slots = blast[capped], slots[capped]
+
+    hits = len(blast)
+    if sources is not None:
+        # Frozen as the blasts went off - a blast's own freeze doesn't shield bloons from its damage
+        was_frozen = (store.flags[slots] & FROZEN) != 0
+
+        # Every bloon caught gets the blast's status effects, frozen or not
+        bounds = np.searchsorted(blast, np.arange(len(sources) + 1)).tolist()
+        for index, source in enumerate(sources):
+            if source.has_status:
+                source.apply_status(store, slots[bounds[index]:bounds[index + 1]])
+
+        # Blasts that can't pop frozen bloons still spend pierce on them, without damaging them
+        blocked = np.array([not source.can_pop_frozen for source in sources])
+        if blocked.any():
+            unblocked = ~(blocked[blast] & was_frozen)
+            blast, slots = blast[unblocked], slots[unblocked]
+
+    total = np.bincount(slots, weights=damages[blast], minlength=store.count).astype(np.int64)
+    damaged = np.nonzero(total)[0]
+    damage = store.damage
+    for slot, amount in zip(damaged.tolist(), total[damaged].tolist()):
+        damage(slot, amount)
+    return hits
@@ -0,0 +1,406 @@
+"""
+Headless simulation engine for the tower defense game
+
+GameSimulation owns all gameplay state (money, lives, waves, bloons, towers
+and projectiles) and advances it one step at a time. It never touches
+pygame.display, pygame.time or the mouse, so waves can be run in bulk for
+balance checks and regression runs as fast as the CPU allows.
+TowerDefenseGame renders this state and feeds player input into it.
+"""
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..constants import SIM_TICK_MS, STARTING_MONEY, STARTING_LIVES
+from ..entities.bloon import Bloon
+from ..entities.bloon_store import BloonStore
+from ..entities.tower import Tower
+from ..entities.projectile import Projectile
+from ..entities.projectile_pool import ProjectilePool
+from ..entities.bloon_types import BloonType
+from ..systems.wave import Wave
+from ..systems.game_map import GameMap
+from ..systems.rounds import RoundSet, load_round_file, DEFAULT_DIFFICULTY
+from ..systems.endless import EndlessRounds
+from .spatial_grid import BloonGrid
+from .collision import resolve_projectile_hits
+from .scheduler import FireScheduler
+from .progress_index import ProgressIndex
+from .targeting import select_targets, BATCH_TARGETING_LIMIT
+from .inputs import InputEvent, InputLog
+from .snapshot import take_snapshot, restore_snapshot
+
+
+class GameSimulation:
+    def __init__(self, game_map: Optional[GameMap] = None, waves: Optional[Sequence[Wave]] = None,
+                 towers_data: Optional[Dict] = None, money: int = STARTING_MONEY,
+                 lives: int = STARTING_LIVES, seed: int = 0, difficulty: str = DEFAULT_DIFFICULTY,
+                 endless: bool = False):
+        """Initialize the simulation.
+
+        Args:
+            game_map (GameMap, optional): The map to play on. Loaded from maps/map1.json if omitted.
+            waves (Sequence[Wave], optional): The waves to play. Loaded from maps/map1_rounds.json if omitted.
+            towers_data (Dict, optional): Tower definitions keyed by tower id. Loaded from data/towers.json if omitted.
+            money (int, optional): Starting money. Defaults to STARTING_MONEY.
+            lives (int, optional): Starting lives. Defaults to STARTING_LIVES.
+            seed (int, optional): Seed for generated endless rounds, recorded in the input log. Defaults to 0.
+            difficulty (str, optional): E, M, H or I - which variant of the loaded rounds to play. Defaults to M.
+            endless (bool, optional): Generate endless rounds after the given or loaded ones. Defaults to False.
+        """
+        self.game_map = game_map if game_map is not None else self.load_map()
+        if waves is None:
+            waves = self.load_waves(difficulty=difficulty)
+        if endless and not getattr(waves, 'endless', False):
+            waves = EndlessRounds(waves, seed) # Freeplay past the last defined round
+        self.waves = waves
+        self.endless = getattr(waves, 'endless', False) # waves has no length when endless
+        self.towers_data = towers_data if towers_data is not None else self.load_tower_data()
+
+        # Simulation clock - counts fixed ticks, independent of the wall clock and frame rate
+        self.tick = 0
+
+        # Determinism - the simulation makes no random choices of its own (endless rounds derive theirs
+        # from the seed) and every player action is recorded
+        self.seed = seed
+        self.input_log = InputLog(seed)
+        self.next_tower_uid = 0
+
+        # Game state
+        self.money = money
+        self.lives = lives
+        self.wave_number = 1
+        self.game_over = False
+
+        # Auto start settings
+        self.auto_start_rounds = False
+        self.auto_start_delay = 3000 # 3 seconds delay before auto start
+        self.wave_completed_time = 0 # Track when wave was completed
+
+        # Game objects - bloons live in a structure-of-arrays store, see the bloons property for views
+        self.bloon_store = BloonStore(self.game_map.path_table)
+        self.bloon_grid = BloonGrid(self.bloon_store) # Rebuilt every tick for range queries
+        self.bloon_progress = ProgressIndex(self.bloon_store) # Rebuilt every tick for tower targeting
+        self.towers: List[Tower] = []
+        self.fire_scheduler = FireScheduler() # Only towers whose cooldown has run out are updated each tick
+        self.projectiles: List[Projectile] = []
+        self.projectile_pool = ProjectilePool() # Dead projectiles are recycled for later shots
+
+        # Wave management
+        self.current_wave: Optional[Wave] = None
+        self.wave_active = False
+
+    @staticmethod
+    def load_map(path: str = "maps/map1.json") -> GameMap:
+        """Load a map from JSON, falling back to the built-in default map"""
+        default_map = {
+            "path": [
+                (50, 360), (200, 360), (200, 200), (400, 200),
+                (400, 500), (600, 500), (600, 300), (800, 300),
+                (800, 600), (1000, 600), (1000, 200), (1230, 200)
+            ],
+            "spawn_point": (50, 360),
+            "end_point": (1230, 200)
+        }
+
+        try:
+            with open(path, "r") as f:
+                map_data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            map_data = default_map
+
+        return GameMap(map_data)
+
+    @staticmethod
+    def load_tower_data(path: str = "data/towers.json") -> Dict:
+        """Load tower definitions from JSON file"""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+                return data.get("towers", {})
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error loading tower data: {e}")
+            return {}
+
+    @staticmethod
+    def load_waves(path: str = "maps/map1_rounds.json", difficulty: str = DEFAULT_DIFFICULTY) -> Sequence[Wave]:
+        """Load a map's rounds for a difficulty. Each round becomes a Wave only when it is reached."""
+        try:
+            return RoundSet(load_round_file(path), difficulty)
+        except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
+            print(f"Error loading rounds: {e}")
+            return []
+
+    @property
+    def time(self) -> float:
+        """Simulated milliseconds elapsed since the start of the game"""
+        return self.tick * SIM_TICK_MS
+
+    @property
+    def bloons(self) -> List[Bloon]:
+        """Views of every bloon currently in play"""
+        return self.bloon_store.live_handles()
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Occupancy and high-water marks of the projectile pool and the bloon store"""
+        return {
+            'projectiles': self.projectile_pool.stats(),
+            'bloons': self.bloon_store.stats(),
+        }
+
+    def start_wave(self):
+        """Start the next wave (player action)"""
+        self.input_log.record(self.tick, "start_wave")
+        self._begin_wave()
+
+    def has_round(self, number: int) -> bool:
+        """Whether there is a round with this (1-based) number to play"""
+        return self.endless or number <= len(self.waves)
+
+    def _begin_wave(self):
+        if self.has_round(self.wave_number):
+            self.current_wave = self.waves[self.wave_number - 1]
+            self.current_wave.begin(self.time)
+            self.wave_active = True
+
+    def place_tower(self, position: Tuple[int, int], tower_id: str) -> Optional[Tower]:
+        """Buy and place a tower of the given type. Returns the tower, or None if it could not be placed."""
+        self.input_log.record(self.tick, "place_tower", [position[0], position[1]], tower_id)
+        tower_data = self.towers_data.get(tower_id)
+        if not tower_data:
+            return None
+
+        tower_cost = tower_data.get('base_cost', 0)
+        if self.money < tower_cost or not self.game_map.can_place_tower(position, self.towers):
+            return None
+
+        base_stats = tower_data.get('base_stats', {})
+        range_val = base_stats.get('range', 32) * 3 # Scale up range for gameplay
+        damage = base_stats.get('damage', 1)
+        fire_rate = base_stats.get('fire_rate', 0.95)
+        pierce = base_stats.get('pierce', 1)
+        projectiles = base_stats.get('projectiles', 1)
+        blast_radius = base_stats.get('blast_radius', 0) * Tower.BLAST_RADIUS_SCALE
+
+        # Create tower with proper stats
+        new_tower = Tower(
+            position,
+            range_val=range_val,
+            damage=damage,
+            fire_rate=fire_rate,
+            pierce=pierce,
+            projectiles=projectiles,
+            tower_type=tower_id
+        )
+        new_tower.explosion_radius = blast_radius
+        new_tower.set_base_cost(tower_cost)
+        new_tower.uid = self.next_tower_uid
+        self.next_tower_uid += 1
+        new_tower.path_coverage(self.game_map.path_table) # Precompute which stretches of path are in range
+        self.towers.append(new_tower)
+        self.fire_scheduler.add(new_tower)
+        self.money -= tower_cost
+        return new_tower
+
+    def sell_tower(self, tower: Tower) -> int:
+        """Sell a tower and return the money refunded"""
+        if tower in self.towers:
+            self.input_log.record(self.tick, "sell_tower", tower.uid)
+            sell_price = tower.get_sell_price()
+            self.money += sell_price
+            self.towers.remove(tower)
+            self.fire_scheduler.remove(tower)
+            return sell_price
+        return 0
+
+    def upgrade_tower(self, tower: Tower, path: str, cost: Optional[int] = None) -> bool:
+        """Buy the next upgrade on a path for a tower. Returns True if it was applied.
+
+        Args:
+            tower (Tower): The tower to upgrade.
+            path (str): The upgrade path, e.g. "path1".
+            cost (int, optional): The price to charge, e.g. after a difficulty multiplier. Defaults to the upgrade's listed cost.
+        """
+        if tower not in self.towers:
+            return False
+        self.input_log.record(self.tick, "upgrade_tower", tower.uid, path, cost)
+
+        upgrade_paths = self.towers_data.get(tower.tower_type, {}).get('upgrade_paths', {})
+        upgrades = upgrade_paths.get(path, {}).get('upgrades', [])
+        level = tower.upgrade_levels.get(path, 0)
+        if level >= len(upgrades):
+            return False
+
+        upgrade_data = upgrades[level]
+        if cost is None:
+            cost = upgrade_data.get('cost', 0)
+        if self.money < cost:
+            return False
+
+        tower.apply_upgrade(path, upgrade_data)
+        self.money -= cost
+        return True
+
+    def cycle_targeting_mode(self, tower: Tower):
+        """Switch a tower to its next targeting mode"""
+        if tower in self.towers:
+            self.input_log.record(self.tick, "cycle_targeting_mode", tower.uid)
+            tower.cycle_targeting_mode()
+
+    def set_auto_start_rounds(self, enabled: bool):
+        """Turn automatic wave starts on or off"""
+        self.input_log.record(self.tick, "set_auto_start_rounds", enabled)
+        self.auto_start_rounds = enabled
+
+    def set_resources(self, money: Optional[int] = None, lives: Optional[int] = None):
+        """Override money and/or lives, e.g. for sandbox mode"""
+        self.input_log.record(self.tick, "set_resources", money, lives)
+        if money is not None:
+            self.money = money
+        if lives is not None:
+            self.lives = lives
+
+    def spawn_bloon(self, position: Tuple[int, int], bloon_type: BloonType = BloonType.RED) -> Bloon:
+        """Spawn a bloon on the path at the point closest to the given position"""
+        self.input_log.record(self.tick, "spawn_bloon", [position[0], position[1]], bloon_type.value)
+        distance = self.game_map.path_table.project(position)
+        slot = self.bloon_store.spawn(bloon_type, distance)
+        return self.bloon_store.handle(slot)
+
+    def step(self):
+        """Advance the simulation by one fixed tick"""
+        if self.game_over:
+            return
+
+        self.tick += 1
+        current_time = self.time
+
+        # Auto start rounds logic
+        if (not self.wave_active and self.auto_start_rounds and
+            self.wave_completed_time > 0 and
+            current_time - self.wave_completed_time >= self.auto_start_delay and
+            self.has_round(self.wave_number)):
+            self._begin_wave()
+            self.wave_completed_time = 0
+
+        # Spawn every bloon that fell due during this tick
+        if self.wave_active and self.current_wave:
+            self.current_wave.spawn_due_bloons(current_time, self.bloon_store)
+
+            # Check if wave is complete
+            if self.current_wave.is_complete() and self.bloon_store.live == 0:
+                self.wave_active = False
+                self.wave_number += 1
+                self.wave_completed_time = current_time # Record when wave was completed
+
+        # Move every bloon in one vectorized step
+        leaked = self.bloon_store.update(current_time=current_time)
+        if leaked:
+            self.lives -= leaked
+            if self.lives <= 0:
+                self.game_over = True
+
+        # Towers and projectiles look up nearby bloons in the grid instead of scanning them all
+        grid = self.bloon_grid
+        grid.rebuild()
+
+        # Update towers that are ready to fire and create projectiles
+        scheduler = self.fire_scheduler
+        if len(scheduler) != len(self.towers):
+            scheduler.sync(self.towers) # Towers were added to or removed from the list directly
+        due_towers = scheduler.pop_due(current_time)
+        self._acquire_targets([tower for tower in due_towers if not tower.target or not tower.target.alive])
+        for tower in due_towers:
+            if tower.target is not None:
+                new_projectiles = tower.update((), current_time, grid, self.projectile_pool)
+                if new_projectiles:
+                    self.projectiles.extend(new_projectiles)
+            # After a shot this is the end of the cooldown; with nothing to shoot the tower looks again next tick
+            scheduler.reschedule(tower, max(tower.next_fire_time, current_time))
+
+        # Move projectiles, then resolve every projectile-bloon hit in one batched pass
+        for projectile in self.projectiles:
+            projectile.advance((), grid)
+        resolve_projectile_hits(self.projectiles, self.bloon_store, grid)
+
+        # Compact the projectile list in place once per tick, returning dead projectiles to the pool
+        pool = self.projectile_pool
+        projectiles = self.projectiles
+        kept = 0
+        for projectile in projectiles:
+            projectile.check_bounds()
+            if projectile.alive:
+                projectiles[kept] = projectile
+                kept += 1
+            else:
+                pool.release(projectile)
+        del projectiles[kept:]
+
+        # Remove popped and leaked bloons and award money
+        self.money += self.bloon_store.compact()
+
+    def _acquire_targets(self, towers: List[Tower]):
+        """Pick a new target for each of the given towers"""
+        if not towers:
+            return
+        store = self.bloon_store
+        if len(towers) > 1 and len(towers) * store.live <= BATCH_TARGETING_LIMIT:
+            # One distance matrix for all the towers
+            for tower, slot in zip(towers, select_targets(towers, store)):
+                tower.target = store.handle(slot) if slot is not None else None
+        else:
+            # Per-tower lookups by path distance within each tower's coverage
+            self.bloon_progress.rebuild()
+            for tower in towers:
+                tower.target = tower.find_target((), progress=self.bloon_progress)
+
+    def snapshot(self) -> bytes:
+        """Capture the complete simulation state in a compact binary snapshot, for restore()"""
+        return take_snapshot(self)
+
+    def restore(self, snapshot: bytes):
+        """Return the simulation to a state captured by snapshot(). The snapshot can be restored again later."""
+        restore_snapshot(self, snapshot)
+
+    def find_tower(self, uid: int) -> Optional[Tower]:
+        """The placed tower with the given uid, if it is still on the map"""
+        for tower in self.towers:
+            if tower.uid == uid:
+                return tower
+        return None
+
+    def apply_input(self, event: InputEvent):
+        """Apply a recorded player action. The action is recorded again in this simulation's log."""
+        args = event.args
+        if event.action == "start_wave":
+            self.start_wave()
+        elif event.action == "place_tower":
+            self.place_tower(tuple(args[0]), args[1])
+        elif event.action == "spawn_bloon":
+            self.spawn_bloon(tuple(args[0]), BloonType(args[1]))
+        elif event.action == "set_auto_start_rounds":
+            self.set_auto_start_rounds(args[0])
+        elif event.action == "set_resources":
+            self.set_resources(*args)
+        elif event.action in ("sell_tower", "upgrade_tower", "cycle_targeting_mode"):
+            tower = self.find_tower(args[0])
+            if tower is not None:
+                getattr(self, event.action)(tower, *args[1:])
+        else:
+            raise ValueError(f"Unknown input action: {event.action}")
+
+    def advance(self, ticks: int) -> int:
+        """Step the simulation up to ticks times, stopping early if the game ends. Returns the steps taken."""
+        steps = 0
+        while steps < ticks and not self.game_over:
+            self.step()
+            steps += 1
+        return steps
+
+    def play_wave(self, max_steps: int = 100000) -> int:
+        """Start the next wave and step until it is cleared or the game ends. Returns the steps taken."""
+        self.start_wave()
+        steps = 0
+        while self.wave_active and not self.game_over and steps < max_steps:
+            self.step()
+            steps += 1
+        return steps
@@ -0,0 +1,82 @@
+"""
+Player input recording for deterministic replays
+
+The simulation is deterministic: given the same seed and the same inputs
+applied at the same ticks, it always plays out identically. Every player
+action that changes the simulation is recorded as an InputEvent tagged with
+the tick it was applied at, so a whole game can be stored as a seed and a
+short list of events and reproduced exactly.
+"""
+import json
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+INPUT_LOG_VERSION = 1
+
+
+@dataclass(frozen=True)
+class InputEvent:
+    tick: int # Ticks completed when the action was applied
+    action: str # Name of the GameSimulation method, e.g. "place_tower"
+    args: Tuple = () # JSON-friendly arguments - towers are referenced by uid
+
+
+class InputLog:
+    def __init__(self, seed: int = 0, events: Optional[List[InputEvent]] = None, end_tick: Optional[int] = None):
+        """Initialize an input log.
+
+        Args:
+            seed (int, optional): The seed of the simulation the inputs were recorded from. Defaults to 0.
+            events (List[InputEvent], optional): Recorded events, in the order they were applied.
+            end_tick (int, optional): Tick the recorded session ended at. Defaults to the tick of the last event.
+        """
+        self.seed = seed
+        self.events: List[InputEvent] = list(events) if events else []
+        self._end_tick = end_tick
+
+    @property
+    def end_tick(self) -> int:
+        """Tick the recorded session ended at"""
+        if self._end_tick is not None:
+            return self._end_tick
+        return self.events[-1].tick if self.events else 0
+
+    @end_tick.setter
+    def end_tick(self, tick: int):
+        self._end_tick = tick
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[InputEvent]:
+        return iter(self.events)
+
+    def record(self, tick: int, action: str, *args):
+        """Append an action applied at the given tick"""
+        self.events.append(InputEvent(tick, action, args))
+
+    def to_dict(self) -> dict:
+        return {
+            "version": INPUT_LOG_VERSION,
+            "seed": self.seed,
+            "end_tick": self._end_tick,
+            "events": [[event.tick, event.action, list(event.args)] for event in self.events]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'InputLog':
+        if data.get("version") != INPUT_LOG_VERSION:
+            raise ValueError(f"Unsupported input log version: {data.get('version')}")
+        events = [InputEvent(tick, action, tuple(args)) for tick, action, args in data["events"]]
+        return cls(data.get("seed", 0), events, data.get("end_tick"))
+
+    def save(self, path: str):
+        """Write the log to a JSON file"""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> 'InputLog':
+        """Read a log written by save()"""
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,48 @@
+"""
+Live bloons ordered by progress along the path
+
+Rebuilt once per tick after bloons move. Together with a tower's path
+coverage (the intervals of path distance inside its range circle, see
+PathTable.coverage) it answers "which bloons are in range" with a bisect
+per interval instead of a distance check against every bloon, and "first"
+and "last" targeting become a look at the ends of those slices.
+"""
+import bisect
+import numpy as np
+from typing import List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..entities.bloon_store import BloonStore
+
+
+class ProgressIndex:
+    def __init__(self, store: 'BloonStore'):
+        """Initialize an empty index.
+
+        Args:
+            store (BloonStore): The store whose live bloons are indexed.
+        """
+        self.store = store
+        self.slots = np.zeros(0, dtype=np.intp) # Slots sorted by distance travelled, ties in spawn order
+        self.distances: List[float] = [] # Distance travelled of each entry in slots
+
+    def rebuild(self):
+        """Re-index every bloon that is alive and on the path"""
+        store = self.store
+        slots = np.nonzero(store.active_mask())[0]
+        distances = store.distance[slots]
+        order = np.argsort(distances, kind='stable')
+        self.slots = slots[order]
+        self.distances = distances[order].tolist()
+
+    def span(self, start: float, end: float) -> Tuple[int, int]:
+        """Index range into slots of the bloons whose distance lies in [start, end]"""
+        return bisect.bisect_left(self.distances, start), bisect.bisect_right(self.distances, end)
+
+    def slots_within(self, intervals: List[Tuple[float, float]]) -> np.ndarray:
+        """Slots of bloons whose distance lies in any of the intervals, ordered by distance"""
+        spans = [self.span(start, end) for start, end in intervals]
+        ranges = [self.slots[low:high] for low, high in spans if high > low]
+        if not ranges:
+            return self.slots[:0]
+        return ranges[0] if len(ranges) == 1 else np.concatenate(ranges)
@@ -0,0 +1,97 @@
+"""
+Replay player for recorded sessions
+
+Re-runs a recorded InputLog in a fresh simulation, either headlessly as fast
+as the CPU allows (for benchmarking regressions against real sessions) or a
+few ticks at a time behind the renderer. A snapshot of the simulation is kept
+every keyframe_interval ticks, so seeking only re-simulates forward from the
+nearest keyframe instead of from tick 0.
+"""
+import bisect
+from typing import Callable, Dict, List, Optional, Tuple
+from .engine import GameSimulation
+from .inputs import InputLog
+
+KEYFRAME_INTERVAL = 600 # Ticks between keyframes (10 seconds of simulated time)
+
+
+class ReplayPlayer:
+    def __init__(self, log: InputLog, simulation_factory: Optional[Callable[[int], GameSimulation]] = None,
+                 keyframe_interval: int = KEYFRAME_INTERVAL):
+        """Initialize the player at tick 0.
+
+        Args:
+            log (InputLog): The recorded session.
+            simulation_factory (Callable[[int], GameSimulation], optional): Builds a fresh simulation for a seed.
+                Must match how the recorded simulation was created. Defaults to
+                GameSimulation(seed=seed, endless=True), as the game creates it.
+            keyframe_interval (int, optional): Ticks between keyframe snapshots. Defaults to KEYFRAME_INTERVAL.
+        """
+        if simulation_factory is None:
+            simulation_factory = lambda seed: GameSimulation(seed=seed, endless=True)
+        self.log = log
+        self.events = log.events
+        self.sim = simulation_factory(log.seed)
+        self.keyframe_interval = keyframe_interval
+        self.next_event = 0 # Index of the first event not yet applied
+
+        # Tick -> (snapshot, next_event) for every keyframe visited so far
+        self.keyframes: Dict[int, Tuple[bytes, int]] = {}
+        self._keyframe_ticks: List[int] = []
+        self._save_keyframe()
+
+    @property
+    def tick(self) -> int:
+        return self.sim.tick
+
+    @property
+    def end_tick(self) -> int:
+        return self.log.end_tick
+
+    @property
+    def finished(self) -> bool:
+        return self.sim.tick >= self.end_tick or self.sim.game_over
+
+    def _save_keyframe(self):
+        tick = self.sim.tick
+        if tick not in self.keyframes:
+            self.keyframes[tick] = (self.sim.snapshot(), self.next_event)
+            bisect.insort(self._keyframe_ticks, tick)
+
+    def _apply_due_events(self):
+        """Apply every recorded event stamped with the current tick"""
+        events = self.events
+        while self.next_event < len(events) and events[self.next_event].tick <= self.sim.tick:
+            self.sim.apply_input(events[self.next_event])
+            self.next_event += 1
+
+    def step(self):
+        """Apply the inputs due at the current tick, then advance one tick"""
+        self._apply_due_events()
+        self.sim.step()
+        if self.sim.tick % self.keyframe_interval == 0:
+            self._save_keyframe()
+
+    def advance(self, ticks: int) -> int:
+        """Play up to ticks ticks, stopping at the end of the recording. Returns the ticks played."""
+        played = 0
+        while played < ticks and not self.finished:
+            self.step()
+            played += 1
+        if self.finished:
+            self._apply_due_events()
+        return played
+
+    def play(self) -> int:
+        """Play the rest of the recording headlessly at full speed. Returns the ticks played."""
+        return self.advance(self.end_tick - self.sim.tick)
+
+    def seek(self, tick: int):
+        """Jump to a tick, restoring the nearest earlier keyframe and re-simulating forward from it"""
+        tick = min(max(tick, 0), self.end_tick)
+        keyframe_tick = self._keyframe_ticks[bisect.bisect_right(self._keyframe_ticks, tick) - 1]
+        if tick < self.sim.tick or keyframe_tick > self.sim.tick:
+            snapshot, next_event = self.keyframes[keyframe_tick]
+            self.sim.restore(snapshot)
+            self.next_event = next_event
+        self.advance(tick - self.sim.tick)
@@ -0,0 +1,78 @@
+"""
+Event-driven tower firing scheduler
+
+Towers sit in a priority queue keyed by the simulation time at which they
+may next fire. Each tick only the towers at the front of the queue whose
+cooldown has expired run target acquisition; every other tower costs
+nothing until its cooldown is up.
+"""
+import heapq
+import itertools
+from typing import Dict, Iterable, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..entities.tower import Tower
+
+
+class FireScheduler:
+    def __init__(self):
+        # (ready time, sequence, tower) - entries whose sequence is no longer current are stale and skipped
+        self._queue: List[Tuple[float, int, 'Tower']] = []
+        self._sequence = itertools.count()
+        self._current: Dict['Tower', int] = {} # Tower -> sequence of its live queue entry
+        self._order: Dict['Tower', int] = {} # Tower -> order in which it was added
+        self._added = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def __contains__(self, tower: 'Tower') -> bool:
+        return tower in self._current
+
+    def add(self, tower: 'Tower'):
+        """Start scheduling a tower, ready at its next allowed fire time"""
+        if tower in self._current:
+            return
+        self._order[tower] = next(self._added)
+        tower.fire_scheduler = self
+        self._push(tower, tower.next_fire_time)
+
+    def remove(self, tower: 'Tower'):
+        """Stop scheduling a tower. Its queue entry is dropped lazily."""
+        if self._current.pop(tower, None) is not None:
+            del self._order[tower]
+            tower.fire_scheduler = None
+
+    def sync(self, towers: Iterable['Tower']):
+        """Make the scheduled set match towers, for towers added or removed without going through add/remove"""
+        towers = list(towers)
+        keep = set(towers)
+        for tower in [tower for tower in self._current if tower not in keep]:
+            self.remove(tower)
+        for tower in towers:
+            self.add(tower)
+
+    def reschedule(self, tower: 'Tower', ready_time: float = None):
+        """Move a scheduled tower to ready_time, or to its next allowed fire time if omitted"""
+        if tower in self._current:
+            self._push(tower, tower.next_fire_time if ready_time is None else ready_time)
+
+    def _push(self, tower: 'Tower', ready_time: float):
+        sequence = next(self._sequence)
+        self._current[tower] = sequence
+        heapq.heappush(self._queue, (ready_time, sequence, tower))
+
+    def pop_due(self, current_time: float) -> List['Tower']:
+        """Remove and return every tower ready to fire at current_time, in the order they were added
+
+        The caller must reschedule each returned tower once it has had its turn.
+        """
+        queue = self._queue
+        current = self._current
+        due = []
+        while queue and queue[0][0] <= current_time:
+            _, sequence, tower = heapq.heappop(queue)
+            if current.get(tower) == sequence:
+                due.append(tower)
+        due.sort(key=self._order.__getitem__)
+        return due
@@ -0,0 +1,291 @@
+"""
+Compact binary snapshots of the complete simulation state
+
+A snapshot is a flat, versioned byte string: a fixed header of game-level
+fields, the progress of the wave being played, the bloon store's columns as
+raw array bytes, then one fixed-size record per tower and per projectile.
+Nothing is pickled or nested, so snapshots are small and cheap enough to
+take every few seconds for autosaves and replay keyframes.
+
+Only state is stored. The map, the wave definitions and the tower data are
+configuration: a snapshot is restored into a simulation created with the
+same configuration, e.g. by the same factory a replay uses.
+"""
+import struct
+import numpy as np
+from array import array
+from typing import TYPE_CHECKING
+from ..entities.bloon_store import BloonStore, COLUMNS, STATUS_COLUMNS, STATUS_EXPIRY_COLUMNS
+from ..entities.tower import Tower
+from .progress_index import ProgressIndex
+from .scheduler import FireScheduler
+from .spatial_grid import BloonGrid
+
+if TYPE_CHECKING:
+    from .engine import GameSimulation
+
+
+SNAPSHOT_MAGIC = b"TDSS"
+SNAPSHOT_VERSION = 8
+
+# magic, version, tick, next tower uid, money, lives, wave number, game over, wave active,
+# auto start rounds, auto start delay, wave completed time, input events recorded
+HEADER = struct.Struct("<4sHqqqqiBBBddq")
+# Progress of the wave being played, when one is: spawned, last spawn time, current type index, current type count
+WAVE = struct.Struct("<idii")
+# count, live, next uid, high water, time, any status effect running - followed by each column's rows
+# [0, count). The status effect columns are left out when no effect is running.
+STORE = struct.Struct("<iiqidB")
+# uid, x, y, range, damage, fire rate, pierce, projectiles, projectile speed, explosion radius, slow effect,
+# freeze effect, stun effect, total spent, base cost, last shot time, target slot (-1 for none), targeting mode,
+# ability bits, upgrade levels (path1, path2, path3), special effect count - followed by the tower type and
+# special effects
+TOWER = struct.Struct("<qdddidiidddddqqdiBBBBBB")
+# x, y, previous x, previous y, velocity x, velocity y, target x, target y, damage, speed, pierce,
+# pierce remaining, lifetime, max lifetime, explosion radius, slow duration, freeze duration, stun duration,
+# seeking target slot (-1 for none), next retarget tick, ring radius, burst directions, has seeking,
+# can pop frozen, chain lightning, ricochet, hit count. All the projectile records come first, then the uids
+# of the bloons each one has hit, in one array, then the pierce left in each direction of every radial burst
+PROJECTILE = struct.Struct("<ddddddddidiiiiddddiidBBBBBH")
+COUNT = struct.Struct("<i")
+STRING_LENGTH = struct.Struct("<B")
+
+# Tower ability bits
+SEES_CAMO = 1
+POPS_LEAD = 2
+POPS_FROZEN = 4
+SEEKING = 8
+
+UPGRADE_PATHS = ("path1", "path2", "path3")
+
+
+class _Reader:
+    """Sequential reads from a snapshot"""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def take(self, size: int) -> memoryview:
+        chunk = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return chunk
+
+    def string(self) -> str:
+        (length,) = self.unpack(STRING_LENGTH)
+        return str(self.take(length), "utf-8")
+
+
+def _string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return STRING_LENGTH.pack(len(encoded)) + encoded
+
+
+def take_snapshot(sim: 'GameSimulation') -> bytes:
+    """Serialize the simulation's state"""
+    store = sim.bloon_store
+    chunks = [HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sim.tick, sim.next_tower_uid, sim.money, sim.lives,
+        sim.wave_number, sim.game_over, sim.wave_active, sim.auto_start_rounds,
+        sim.auto_start_delay, sim.wave_completed_time, len(sim.input_log)
+    )]
+
+    # Only the wave being played has any progress worth keeping - it is always round wave_number
+    if sim.wave_active:
+        wave = sim.current_wave
+        chunks.append(WAVE.pack(wave.spawned, wave.last_spawn_time, wave.current_type_index, wave.current_type_count))
+
+    count = store.count
+    has_status = any((getattr(store, name)[:count] > store.time).any() for name in STATUS_EXPIRY_COLUMNS)
+    chunks.append(STORE.pack(count, store.live, store.next_uid, store.high_water, store.time, has_status))
+    for name, _, _ in COLUMNS:
+        if has_status or name not in STATUS_COLUMNS:
+            chunks.append(getattr(store, name)[:count].tobytes())
+
+    chunks.append(COUNT.pack(len(sim.towers)))
+    for tower in sim.towers:
+        target = tower.target
+        target_slot = target._slot if target is not None and target._store is store else -1
+        abilities = ((SEES_CAMO if tower.can_see_camo else 0) | (POPS_LEAD if tower.can_pop_lead else 0) |
+                     (POPS_FROZEN if tower.can_pop_frozen else 0) | (SEEKING if tower.has_seeking else 0))
+        levels = tower.upgrade_levels
+        chunks.append(TOWER.pack(
+            -1 if tower.uid is None else tower.uid, tower.position[0], tower.position[1], tower.range,
+            tower.damage, tower.fire_rate, tower.pierce, tower.projectiles, tower.projectile_speed,
+            tower.explosion_radius, tower.slow_effect, tower.freeze_effect, tower.stun_effect,
+            tower.total_spent, tower.base_cost, tower.last_shot_time,
+            target_slot, Tower.TARGETING_MODES.index(tower.targeting_mode), abilities,
+            levels["path1"], levels["path2"], levels["path3"], len(tower.special_effects)
+        ))
+        chunks.append(_string(tower.tower_type))
+        chunks.extend(_string(effect) for effect in tower.special_effects)
+
+    chunks.append(COUNT.pack(len(sim.projectiles)))
+    hits = array("q")
+    direction_pierce = array("i")
+    for projectile in sim.projectiles:
+        target = projectile.target
+        target_slot = target._slot if target is not None and target._store is store else -1
+        position = projectile.position
+        previous = projectile.previous_position
+        velocity = projectile.velocity
+        target_pos = projectile.target_pos
+        chunks.append(PROJECTILE.pack(
+            position[0], position[1], previous[0], previous[1], velocity[0], velocity[1],
+            target_pos[0], target_pos[1], projectile.damage, projectile.speed, projectile.pierce,
+            projectile.pierce_remaining, projectile.lifetime, projectile.max_lifetime, projectile.explosion_radius,
+            projectile.slow_duration, projectile.freeze_duration, projectile.stun_duration,
+            target_slot, projectile.next_retarget, projectile.ring_radius, projectile.burst_directions,
+            projectile.has_seeking, projectile.can_pop_frozen, projectile.chain_lightning, projectile.ricochet,
+            len(projectile.hit_bloons)
+        ))
+        hits.extend(projectile.hit_bloons)
+        direction_pierce.extend(projectile.direction_pierce)
+    chunks.append(COUNT.pack(len(hits)))
+    chunks.append(hits.tobytes())
+    chunks.append(COUNT.pack(len(direction_pierce)))
+    chunks.append(direction_pierce.tobytes())
+
+    return b"".join(chunks)
+
+
+def restore_snapshot(sim: 'GameSimulation', data: bytes):
+    """Return the simulation to the state in a snapshot taken by take_snapshot()
+
+    Towers, projectiles and the bloon store are replaced, so objects held from
+    before the restore keep showing the state they had then.
+
+    Raises:
+        ValueError: If the data is not a snapshot or was written by an unsupported version.
+    """
+    reader = _Reader(data)
+    if len(data) < HEADER.size:
+        raise ValueError("Not a simulation snapshot")
+    (magic, version, tick, next_tower_uid, money, lives, wave_number, game_over, wave_active,
+     auto_start_rounds, auto_start_delay, wave_completed_time, input_events) = reader.unpack(HEADER)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a simulation snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+
+    current_wave = None
+    if wave_active:
+        if not sim.has_round(wave_number):
+            raise ValueError(f"Snapshot is playing round {wave_number} but the simulation has {len(sim.waves)}")
+        current_wave = sim.waves[wave_number - 1]
+        (current_wave.spawned, current_wave.last_spawn_time,
+         current_wave.current_type_index, current_wave.current_type_count) = reader.unpack(WAVE)
+
+    count, live, next_uid, high_water, store_time, has_status = reader.unpack(STORE)
+    store = BloonStore(sim.game_map.path_table, capacity=max(count, 64))
+    store.slow_factor[:count] = 1.0 # Overwritten below if any effect is running
+    for name, shape, dtype in COLUMNS:
+        if not has_status and name in STATUS_COLUMNS:
+            continue
+        column = getattr(store, name)
+        size = count * column[0].nbytes
+        column[:count] = np.frombuffer(reader.take(size), dtype=dtype).reshape((count,) + shape)
+    store.count, store.live, store.next_uid, store.high_water = count, live, next_uid, high_water
+    store.time = store_time
+
+    (tower_count,) = reader.unpack(COUNT)
+    towers = []
+    scheduler = FireScheduler()
+    for _ in range(tower_count):
+        (uid, x, y, range_val, damage, fire_rate, pierce, projectiles, projectile_speed, explosion_radius,
+         slow_effect, freeze_effect, stun_effect, total_spent, base_cost, last_shot_time, target_slot, mode, abilities,
+         path1, path2, path3, effect_count) = reader.unpack(TOWER)
+        tower = Tower((x, y), range_val, damage, fire_rate, reader.string(), pierce, projectiles)
+        tower.uid = uid if uid >= 0 else None
+        tower.projectile_speed = projectile_speed
+        tower.explosion_radius = explosion_radius
+        tower.slow_effect = slow_effect
+        tower.freeze_effect = freeze_effect
+        tower.stun_effect = stun_effect
+        tower.total_spent = total_spent
+        tower.base_cost = base_cost
+        tower.last_shot_time = last_shot_time
+        tower.target = store.handle(target_slot) if target_slot >= 0 else None
+        tower.targeting_mode = Tower.TARGETING_MODES[mode]
+        tower.can_see_camo = bool(abilities & SEES_CAMO)
+        tower.can_pop_lead = bool(abilities & POPS_LEAD)
+        tower.can_pop_frozen = bool(abilities & POPS_FROZEN)
+        tower.has_seeking = bool(abilities & SEEKING)
+        tower.upgrade_levels = dict(zip(UPGRADE_PATHS, (path1, path2, path3)))
+        tower.special_effects = [reader.string() for _ in range(effect_count)]
+        towers.append(tower)
+        scheduler.add(tower) # In placement order, so same-tick ties still go to the earliest placed tower
+
+    (projectile_count,) = reader.unpack(COUNT)
+    records = PROJECTILE.iter_unpack(reader.take(projectile_count * PROJECTILE.size))
+    (hit_total,) = reader.unpack(COUNT)
+    hits = array("q")
+    hits.frombytes(reader.take(hit_total * hits.itemsize))
+    (direction_total,) = reader.unpack(COUNT)
+    direction_pierce = array("i")
+    direction_pierce.frombytes(reader.take(direction_total * direction_pierce.itemsize))
+    pool = sim.projectile_pool
+    for projectile in sim.projectiles:
+        pool.release(projectile)
+    projectiles = []
+    acquire = pool.acquire
+    hit_start = 0
+    direction_start = 0
+    for (x, y, previous_x, previous_y, velocity_x, velocity_y, target_x, target_y, damage, speed, pierce,
+         pierce_remaining, lifetime, max_lifetime, explosion_radius, slow_duration, freeze_duration, stun_duration,
+         target_slot, next_retarget, ring_radius, burst_directions, has_seeking, can_pop_frozen, chain_lightning,
+         ricochet, hit_count) in records:
+        projectile = acquire((x, y), None, damage, speed, pierce, bool(has_seeking), explosion_radius,
+                             burst_directions)
+        projectile.target_pos = (target_x, target_y)
+        projectile.previous_position[0] = previous_x
+        projectile.previous_position[1] = previous_y
+        projectile.velocity[0] = velocity_x
+        projectile.velocity[1] = velocity_y
+        projectile.pierce_remaining = pierce_remaining
+        projectile.lifetime = lifetime
+        projectile.max_lifetime = max_lifetime
+        projectile.slow_duration = slow_duration
+        projectile.freeze_duration = freeze_duration
+        projectile.stun_duration = stun_duration
+        projectile.can_pop_frozen = bool(can_pop_frozen)
+        projectile.chain_lightning = bool(chain_lightning)
+        projectile.ricochet = bool(ricochet)
+        projectile.target = store.handle(target_slot) if target_slot >= 0 else None
+        projectile.next_retarget = next_retarget
+        projectile.ring_radius = ring_radius
+        if burst_directions:
+            projectile.direction_pierce[:] = direction_pierce[direction_start:direction_start + burst_directions]
+            direction_start += burst_directions
+        if hit_count:
+            projectile.hit_bloons.update(hits[hit_start:hit_start + hit_count])
+            hit_start += hit_count
+        projectiles.append(projectile)
+
+    sim.tick = tick
+    sim.next_tower_uid = next_tower_uid
+    sim.money = money
+    sim.lives = lives
+    sim.wave_number = wave_number
+    sim.current_wave = current_wave
+    sim.game_over = bool(game_over)
+    sim.wave_active = bool(wave_active)
+    sim.auto_start_rounds = bool(auto_start_rounds)
+    sim.auto_start_delay = auto_start_delay
+    sim.wave_completed_time = wave_completed_time
+    sim.bloon_store = store
+    sim.bloon_grid = BloonGrid(store)
+    sim.bloon_progress = ProgressIndex(store)
+    sim.towers = towers
+    sim.fire_scheduler = scheduler
+    sim.projectiles = projectiles
+
+    # The input log is not part of the snapshot. Rewinding the simulation that recorded it cuts it back.
+    events = sim.input_log.events
+    if len(events) > input_events:
+        del events[input_events:]
@@ -0,0 +1,177 @@
+"""
+Uniform spatial hash grid over live bloons
+
+Rebuilt once per tick after bloons move. Towers and projectiles query it
+for "bloons within r of (x, y)" instead of scanning every bloon, which turns
+O(towers x bloons + projectiles x bloons) per tick into roughly
+O(towers + projectiles) small cell lookups.
+"""
+import numpy as np
+from typing import List, Optional, Tuple, TYPE_CHECKING
+from ..constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from ..entities.bloon_store import ALIVE
+
+if TYPE_CHECKING:
+    from ..entities.bloon import Bloon
+    from ..entities.bloon_store import BloonStore
+
+
+class BloonGrid:
+    def __init__(self, store: 'BloonStore', cell_size: int = 64,
+                 width: int = SCREEN_WIDTH, height: int = SCREEN_HEIGHT):
+        """Initialize an empty grid.
+
+        Args:
+            store (BloonStore): The store whose live bloons are indexed.
+            cell_size (int, optional): Width and height of a cell in pixels. Defaults to 64.
+            width (int, optional): Width of the indexed area. Positions outside are clamped to the edge cells. Defaults to SCREEN_WIDTH.
+            height (int, optional): Height of the indexed area. Defaults to SCREEN_HEIGHT.
+        """
+        self.store = store
+        self.cell_size = cell_size
+        self.columns = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+
+        # Slots and positions sorted by cell; cell c holds entries [cell_start[c], cell_start[c + 1])
+        self.slots = np.zeros(0, dtype=np.intp)
+        self.positions = np.zeros((0, 2), dtype=np.float64)
+        self._cell_start = [0] * (self.columns * self.rows + 1)
+        self._cell_start_array = np.zeros(self.columns * self.rows + 1, dtype=np.intp)
+
+    def _column(self, x: float) -> int:
+        return min(max(int(x // self.cell_size), 0), self.columns - 1)
+
+    def _row(self, y: float) -> int:
+        return min(max(int(y // self.cell_size), 0), self.rows - 1)
+
+    def rebuild(self):
+        """Re-index every bloon that is alive and on the path"""
+        store = self.store
+        slots = np.nonzero(store.active_mask())[0]
+        positions = store.position[slots]
+
+        cells = (np.clip((positions[:, 1] // self.cell_size).astype(np.intp), 0, self.rows - 1) * self.columns +
+                 np.clip((positions[:, 0] // self.cell_size).astype(np.intp), 0, self.columns - 1))
+        order = np.argsort(cells, kind='stable')
+
+        self.slots = slots[order]
+        self.positions = positions[order]
+        self._cell_start_array = np.searchsorted(cells[order], np.arange(self.columns * self.rows + 1))
+        self._cell_start = self._cell_start_array.tolist()
+
+    def query_radius(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Slots of bloons within radius of (x, y), in spawn order"""
+        column_start = self._column(x - radius)
+        column_end = self._column(x + radius)
+        cell_start = self._cell_start
+
+        # Cells in one grid row are contiguous, so each row of the query box is one slice
+        ranges = []
+        for row in range(self._row(y - radius), self._row(y + radius) + 1):
+            base = row * self.columns
+            start = cell_start[base + column_start]
+            end = cell_start[base + column_end + 1]
+            if end > start:
+                ranges.append(np.arange(start, end))
+        if not ranges:
+            return self.slots[:0]
+
+        candidates = ranges[0] if len(ranges) == 1 else np.concatenate(ranges)
+        offsets = self.positions[candidates] - (x, y)
+        within = np.einsum('ij,ij->i', offsets, offsets) <= radius * radius
+        return np.sort(self.slots[candidates[within]])
+
+    def nearest(self, x: float, y: float, radius: float, k: Optional[int] = None) -> np.ndarray:
+        """Slots of the k bloons nearest (x, y) within radius that are still alive, nearest first
+
+        Only the cells the radius covers are searched. Equally near bloons are listed in spawn order.
+
+        Args:
+            x (float): Query position.
+            y (float): Query position.
+            radius (float): Furthest distance to look.
+            k (int, optional): Most slots to return. Defaults to None (every bloon in range).
+        """
+        column_start = self._column(x - radius)
+        column_end = self._column(x + radius)
+        cell_start = self._cell_start
+
+        # Slices of the grid's own arrays, one per row of the query box - no index arrays to build
+        runs = []
+        for row in range(self._row(y - radius), self._row(y + radius) + 1):
+            base = row * self.columns
+            start = cell_start[base + column_start]
+            end = cell_start[base + column_end + 1]
+            if end > start:
+                runs.append((start, end))
+        if not runs:
+            return self.slots[:0]
+        if len(runs) == 1:
+            (start, end), = runs
+            slots = self.slots[start:end]
+            positions = self.positions[start:end]
+        else:
+            slots = np.concatenate([self.slots[start:end] for start, end in runs])
+            positions = np.concatenate([self.positions[start:end] for start, end in runs])
+
+        offsets = positions - (x, y)
+        distances = np.einsum('ij,ij->i', offsets, offsets)
+        # Bloons can pop after the grid is rebuilt
+        keep = (distances <= radius * radius) & ((self.store.flags[slots] & ALIVE) != 0)
+        slots = slots[keep]
+        order = np.lexsort((slots, distances[keep]))
+        return slots[order[:k]]
+
+    def query_many(self, centers: np.ndarray, radii: np.ndarray,
+                   bloon_radii: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Every (query, bloon) pair with the bloon within the query's radius, for many queries at once
+
+        Args:
+            centers (np.ndarray): (Q, 2) query positions.
+            radii (np.ndarray): (Q,) query radii.
+            bloon_radii (np.ndarray, optional): Radius of each bloon, indexed by slot, added to the query's
+                so that bloons overlapping the query circle count. Defaults to None (bloon centers only).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Query indices and bloon slots of each pair, ordered by query, then spawn order.
+        """
+        empty = np.zeros(0, dtype=np.intp)
+        if len(centers) == 0 or len(self.slots) == 0:
+            return empty, empty
+
+        cell_size = self.cell_size
+        reach = radii if bloon_radii is None else radii + bloon_radii[self.slots].max()
+        column_start = np.clip((centers[:, 0] - reach) // cell_size, 0, self.columns - 1).astype(np.intp)
+        column_end = np.clip((centers[:, 0] + reach) // cell_size, 0, self.columns - 1).astype(np.intp)
+        row_start = np.clip((centers[:, 1] - reach) // cell_size, 0, self.rows - 1).astype(np.intp)
+        row_end = np.clip((centers[:, 1] + reach) // cell_size, 0, self.rows - 1).astype(np.intp)
+
+        # One (query, grid row) pair per row of each query's box, then every entry in that row's run of cells
+        row_counts = row_end - row_start + 1
+        row_queries = np.repeat(np.arange(len(centers)), row_counts)
+        rows = row_start[row_queries] + np.arange(len(row_queries)) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+        cell_start = self._cell_start_array
+        starts = cell_start[rows * self.columns + column_start[row_queries]]
+        counts = cell_start[rows * self.columns + column_end[row_queries] + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return empty, empty
+        queries = np.repeat(row_queries, counts)
+        entries = np.repeat(starts, counts) + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        # Gathering x and y from contiguous copies is much faster than rows of the (N, 2) array
+        dx = np.ascontiguousarray(self.positions[:, 0])[entries] - centers[queries, 0]
+        dy = np.ascontiguousarray(self.positions[:, 1])[entries] - centers[queries, 1]
+        slots = self.slots[entries]
+        limit = radii[queries] if bloon_radii is None else radii[queries] + bloon_radii[slots]
+        within = dx * dx + dy * dy <= limit * limit
+
+        # Sort by one combined key: query first, then slot (spawn order)
+        span = int(self.slots.max()) + 1
+        keys = np.sort(queries[within] * span + slots[within])
+        return keys // span, keys % span
+
+    def bloons_within(self, x: float, y: float, radius: float) -> List['Bloon']:
+        """Bloon views for every bloon within radius of (x, y), in spawn order"""
+        handle = self.store.handle
+        return [handle(slot) for slot in self.query_radius(x, y, radius).tolist()]
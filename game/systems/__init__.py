@@ -3,5 +3,8 @@ Game systems package
 """
 from .wave import Wave
 from .game_map import GameMap
+from .path import PathTable
+from .rounds import RoundSet, load_round_file
+from .endless import EndlessRounds
 
-__all__ = ['Wave', 'GameMap']
+__all__ = ['Wave', 'GameMap', 'PathTable', 'RoundSet', 'load_round_file', 'EndlessRounds']
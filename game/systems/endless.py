@@ -0,0 +1,114 @@
+"""
+Procedural endless rounds
+
+Once the defined rounds run out, rounds keep coming, generated from a
+difficulty budget in red bloon equivalents (RBE): the total health of the
+bloons in a round, counting every layer. The budget grows every round and is spent on a few
+groups of bloon types drawn from BLOON_PROPERTIES.
+
+Generation is a pure function of the seed and the round number, so endless
+games stay deterministic and replayable. When a generated round is started,
+the one after it is generated and kept, so the next round's definition is
+ready before it is reached. Generation is cheap enough to do on the game
+thread, so no background worker is needed.
+
+EndlessRounds has no length - check `endless` before treating a set of rounds
+as a sized sequence.
+"""
+import random
+from typing import Dict, List, Sequence
+from ..entities.bloon_types import BloonType, BLOON_PROPERTIES, red_bloon_equivalent
+from .rounds import RoundDefinition
+from .wave import Wave
+
+# Red bloon equivalent of each bloon type - popping it fully takes this many hits of 1 damage
+RBE = {bloon_type: red_bloon_equivalent(bloon_type) for bloon_type in BLOON_PROPERTIES}
+
+DEFAULT_BASE_BUDGET = 50 # RBE of the first endless round when there are no defined rounds to follow on from
+BUDGET_GROWTH = 1.1 # Each endless round is worth 10% more RBE than the one before
+MAX_GROUPS = 3
+ROUND_DURATION_MS = 20000 # Time to spawn a whole round, growing by ROUND_DURATION_GROWTH_MS per round
+ROUND_DURATION_GROWTH_MS = 250
+MAX_ROUND_DURATION_MS = 40000
+MIN_SPAWN_DELAY = 5 # milliseconds - several bloons can spawn per tick, spaced by their sub-tick offsets
+MAX_SPAWN_DELAY = 800
+
+
+def wave_rbe(wave: Wave) -> int:
+    """Total red bloon equivalent of a wave"""
+    return sum(RBE[bloon_type] * count for bloon_type, count in zip(wave.bloon_types, wave.counts))
+
+
+def generate_round(seed: int, number: int, budget: float, rounds_past_end: int) -> RoundDefinition:
+    """Generate one endless round worth about budget RBE
+
+    Args:
+        seed (int): The game's seed. The same seed and round number always give the same round.
+        number (int): The round number, for seeding.
+        budget (float): Red bloon equivalents to spend.
+        rounds_past_end (int): How many rounds past the last defined one this is, starting at 1.
+    """
+    rng = random.Random(f"endless:{seed}:{number}")
+
+    # Types cheap enough to appear a few times; the strongest is always among them
+    affordable = [bloon_type for bloon_type in BloonType if RBE[bloon_type] * 4 <= budget] or [BloonType.RED]
+    group_count = rng.randint(1, min(MAX_GROUPS, len(affordable)))
+    strongest = max(affordable, key=RBE.__getitem__)
+    types = [strongest] + rng.sample([t for t in affordable if t is not strongest], group_count - 1)
+    types.sort(key=RBE.__getitem__) # Weakest first
+
+    weights = [rng.uniform(0.5, 1.5) for _ in types]
+    total_weight = sum(weights)
+    groups = tuple((bloon_type, max(1, int(budget * weight / total_weight / RBE[bloon_type])))
+                   for bloon_type, weight in zip(types, weights))
+
+    duration = min(ROUND_DURATION_MS + ROUND_DURATION_GROWTH_MS * rounds_past_end, MAX_ROUND_DURATION_MS)
+    bloon_count = sum(count for _, count in groups)
+    spawn_delay = min(max(duration / bloon_count, MIN_SPAWN_DELAY), MAX_SPAWN_DELAY)
+    return RoundDefinition(groups, spawn_delay)
+
+
+class EndlessRounds:
+    endless = True # Every round number can be played
+
+    def __init__(self, rounds: Sequence[Wave], seed: int = 0, growth: float = BUDGET_GROWTH):
+        """Initialize endless rounds following on from a set of defined rounds.
+
+        Args:
+            rounds (Sequence[Wave]): The defined rounds, played first.
+            seed (int, optional): Seed for the generated rounds. Defaults to 0.
+            growth (float, optional): Budget multiplier from one generated round to the next. Defaults to BUDGET_GROWTH.
+        """
+        self.rounds = rounds
+        self.seed = seed
+        self.growth = growth
+        self.base_budget = wave_rbe(rounds[len(rounds) - 1]) if len(rounds) else DEFAULT_BASE_BUDGET
+        self._upcoming: Dict[int, RoundDefinition] = {} # Generated ahead, by round index
+
+    def budget(self, index: int) -> float:
+        """RBE budget of the round at index (0-based), which must be past the defined rounds"""
+        return self.base_budget * self.growth ** (index - len(self.rounds) + 1)
+
+    def _generate(self, index: int) -> RoundDefinition:
+        return generate_round(self.seed, index + 1, self.budget(index), index - len(self.rounds) + 1)
+
+    def __getitem__(self, index: int) -> Wave:
+        """The Wave for a round (0-based), generating it if it is past the defined rounds"""
+        if index < 0:
+            raise IndexError(f"Round index out of range: {index}")
+        if index < len(self.rounds):
+            if index == len(self.rounds) - 1:
+                self._prepare(index + 1)
+            return self.rounds[index]
+        definition = self._upcoming.get(index) or self._generate(index)
+        self._prepare(index + 1)
+        return definition.build_wave()
+
+    def _prepare(self, index: int):
+        """Generate the round at index ahead of time, keeping only the next one"""
+        if index not in self._upcoming:
+            self._upcoming = {index: self._generate(index)}
+
+    def generated(self, start: int, stop: int) -> List[RoundDefinition]:
+        """Definitions of generated rounds [start, stop), for balance checks"""
+        return [self._generate(index) for index in range(max(start, len(self.rounds)), stop)]
@@ -5,6 +5,7 @@ import pygame
 import math
 from typing import Tuple, List
 from ..constants import BROWN, GREEN, RED
+from .path import PathTable
 
 
 class GameMap:
@@ -19,6 +20,9 @@ class GameMap:
         self.end_point = map_data.get("end_point", (1230, 360))
         self.placeable_areas = map_data.get("placeable_areas", [])
         
+        # Arc-length table for converting path distances to positions
+        self.path_table = PathTable(self.path)
+        
     def can_place_tower(self, position: Tuple[int, int], towers: List = None, tower_radius: int = None) -> bool:
         """
         Check if a tower can be placed at the given position
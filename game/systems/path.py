@@ -0,0 +1,106 @@
+"""
+Arc-length parametrisation of a map path
+
+Precomputes cumulative segment lengths and unit direction vectors once, so a
+position on the path can be described by a single distance from the start
+and turned back into (x, y) with a segment lookup.
+"""
+import bisect
+import numpy as np
+from typing import List, Tuple, Union
+
+
+class PathTable:
+    def __init__(self, path: List[Tuple[int, int]]):
+        """Build the segment table for a path.
+
+        Args:
+            path (List[Tuple[int, int]]): The waypoints of the path, in order.
+        """
+        self.path = path
+        self.points = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+
+        deltas = np.diff(self.points, axis=0)
+        self.segment_lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+        # Distance from the start of the path to each waypoint
+        self.cumulative = np.concatenate(([0.0], np.cumsum(self.segment_lengths)))
+        self.length = float(self.cumulative[-1])
+
+        # Unit direction of each segment (zero for zero-length segments)
+        self.directions = np.zeros_like(deltas)
+        nonzero = self.segment_lengths > 0
+        self.directions[nonzero] = deltas[nonzero] / self.segment_lengths[nonzero, None]
+
+        self._cumulative_list = self.cumulative.tolist()
+
+    @property
+    def segment_count(self) -> int:
+        return len(self.segment_lengths)
+
+    def segments_at(self, distances: np.ndarray) -> np.ndarray:
+        """Index of the segment containing each distance (clamped to the path)"""
+        segments = np.searchsorted(self.cumulative, distances, side='right') - 1
+        return np.clip(segments, 0, max(0, self.segment_count - 1))
+
+    def positions_at(self, distances: np.ndarray) -> np.ndarray:
+        """Convert an array of path distances into an (n, 2) array of positions"""
+        if self.segment_count == 0:
+            return np.repeat(self.points[:1], len(distances), axis=0)
+        distances = np.clip(distances, 0.0, self.length)
+        segments = self.segments_at(distances)
+        offsets = distances - self.cumulative[segments]
+        return self.points[segments] + self.directions[segments] * offsets[:, None]
+
+    def position_at(self, distance: float) -> Tuple[float, float]:
+        """Convert a single path distance into a position"""
+        if self.segment_count == 0:
+            return float(self.points[0][0]), float(self.points[0][1])
+        distance = min(max(distance, 0.0), self.length)
+        segment = min(bisect.bisect_right(self._cumulative_list, distance) - 1, self.segment_count - 1)
+        offset = distance - self._cumulative_list[segment]
+        x, y = self.points[segment] + self.directions[segment] * offset
+        return float(x), float(y)
+
+    def project(self, point: Union[Tuple[float, float], List[float]]) -> float:
+        """Path distance of the point on the path closest to the given point"""
+        if self.segment_count == 0:
+            return 0.0
+        starts = self.points[:-1]
+        relative = np.asarray(point, dtype=np.float64) - starts
+        # Distance along each segment of the closest point, clamped to the segment
+        along = np.clip(np.einsum('ij,ij->i', relative, self.directions), 0.0, self.segment_lengths)
+        closest = starts + self.directions * along[:, None]
+        gap = np.asarray(point, dtype=np.float64) - closest
+        segment = int(np.argmin(np.einsum('ij,ij->i', gap, gap)))
+        return float(self.cumulative[segment] + along[segment])
+
+    def coverage(self, center: Tuple[float, float], radius: float) -> List[Tuple[float, float]]:
+        """Intervals of path distance whose positions lie within radius of center.
+
+        Returns:
+            List[Tuple[float, float]]: Disjoint (start, end) distance intervals, in path order.
+        """
+        if self.segment_count == 0:
+            gap = self.points[0] - np.asarray(center, dtype=np.float64)
+            return [(0.0, 0.0)] if float(gap @ gap) <= radius * radius else []
+
+        # Solve |start + t * direction - center| <= radius for t on every segment at once
+        relative = np.asarray(center, dtype=np.float64) - self.points[:-1]
+        along = np.einsum('ij,ij->i', relative, self.directions)
+        discriminant = along * along - (np.einsum('ij,ij->i', relative, relative) - radius * radius)
+        root = np.sqrt(np.maximum(discriminant, 0.0))
+        enter = np.maximum(along - root, 0.0)
+        leave = np.minimum(along + root, self.segment_lengths)
+        hit = (discriminant >= 0) & (enter <= leave)
+
+        starts = self.cumulative[:-1][hit] + enter[hit]
+        ends = self.cumulative[:-1][hit] + leave[hit]
+
+        # Merge intervals that continue across a waypoint
+        intervals: List[Tuple[float, float]] = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if intervals and start <= intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], max(intervals[-1][1], end))
+            else:
+                intervals.append((start, end))
+        return intervals
@@ -0,0 +1,147 @@
+"""
+Data-driven round definitions
+
+Each map's rounds live in a JSON file next to the map (maps/map1.json ->
+maps/map1_rounds.json). The file lists every round once, and each difficulty
+(E/M/H/I - Easy, Medium, Hard, Impossible) picks how many of them are played
+and how much denser they are.
+
+Round files are parsed and validated once and cached. A RoundSet expands
+rounds into Wave objects lazily, only when the game reaches them, so a
+100-round set costs no more memory than the round being played.
+"""
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, Tuple
+from ..entities.bloon_types import BloonType
+from .wave import Wave
+
+ROUNDS_FILE_VERSION = 1
+DIFFICULTIES = ("E", "M", "H", "I")
+DEFAULT_DIFFICULTY = "M"
+
+
+@dataclass(frozen=True)
+class RoundDefinition:
+    groups: Tuple[Tuple[BloonType, int], ...] # (bloon type, count) in spawn order
+    spawn_delay: float # milliseconds between spawns
+
+    def build_wave(self, count_multiplier: float = 1.0, spawn_delay_multiplier: float = 1.0) -> Wave:
+        """Create a new, unstarted Wave for this round"""
+        return Wave(
+            [bloon_type for bloon_type, _ in self.groups],
+            [max(1, round(count * count_multiplier)) for _, count in self.groups],
+            self.spawn_delay * spawn_delay_multiplier
+        )
+
+
+@dataclass(frozen=True)
+class DifficultyDefinition:
+    name: str
+    last_round: int # Rounds 1 to last_round are played
+    spawn_delay_multiplier: float = 1.0
+    count_multiplier: float = 1.0
+
+
+@dataclass(frozen=True)
+class RoundFile:
+    rounds: Tuple[RoundDefinition, ...]
+    difficulties: Dict[str, DifficultyDefinition]
+
+
+def rounds_path(map_path: str) -> str:
+    """Path of the round file that belongs to a map file"""
+    return os.path.splitext(map_path)[0] + "_rounds.json"
+
+
+def _positive(value, what: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"{what} must be a positive number, got {value!r}")
+    return value
+
+
+def parse_round_file(data: dict, source: str = "round file") -> RoundFile:
+    """Validate the contents of a round file and convert them to definitions
+
+    Raises:
+        ValueError: If anything in the file is missing or invalid. The message names the offending round.
+    """
+    if data.get("version") != ROUNDS_FILE_VERSION:
+        raise ValueError(f"{source}: unsupported round file version: {data.get('version')}")
+
+    rounds = []
+    for number, round_data in enumerate(data.get("rounds", []), start=1):
+        where = f"{source}: round {number}"
+        groups = []
+        for group in round_data.get("bloons", []):
+            try:
+                bloon_type = BloonType(group.get("type"))
+            except ValueError:
+                raise ValueError(f"{where}: unknown bloon type {group.get('type')!r}") from None
+            count = group.get("count")
+            if isinstance(count, bool) or not isinstance(count, int) or count <= 0:
+                raise ValueError(f"{where}: bloon count must be a positive integer, got {count!r}")
+            groups.append((bloon_type, count))
+        if not groups:
+            raise ValueError(f"{where}: has no bloons")
+        spawn_delay = _positive(round_data.get("spawn_delay"), f"{where}: spawn_delay")
+        rounds.append(RoundDefinition(tuple(groups), spawn_delay))
+    if not rounds:
+        raise ValueError(f"{source}: has no rounds")
+
+    difficulties = {}
+    for key, difficulty_data in data.get("difficulties", {}).items():
+        where = f"{source}: difficulty {key}"
+        if key not in DIFFICULTIES:
+            raise ValueError(f"{where}: unknown difficulty, expected one of {', '.join(DIFFICULTIES)}")
+        last_round = difficulty_data.get("last_round", len(rounds))
+        if isinstance(last_round, bool) or not isinstance(last_round, int) or not 1 <= last_round <= len(rounds):
+            raise ValueError(f"{where}: last_round must be between 1 and {len(rounds)}, got {last_round!r}")
+        difficulties[key] = DifficultyDefinition(
+            difficulty_data.get("name", key),
+            last_round,
+            _positive(difficulty_data.get("spawn_delay_multiplier", 1.0), f"{where}: spawn_delay_multiplier"),
+            _positive(difficulty_data.get("count_multiplier", 1.0), f"{where}: count_multiplier"),
+        )
+    if DEFAULT_DIFFICULTY not in difficulties:
+        difficulties[DEFAULT_DIFFICULTY] = DifficultyDefinition(DEFAULT_DIFFICULTY, len(rounds))
+
+    return RoundFile(tuple(rounds), difficulties)
+
+
+@lru_cache(maxsize=None)
+def load_round_file(path: str) -> RoundFile:
+    """Read, validate and cache a round file. Later calls for the same path reuse the parsed file."""
+    with open(path, "r") as f:
+        return parse_round_file(json.load(f), path)
+
+
+class RoundSet:
+    def __init__(self, round_file: RoundFile, difficulty: str = DEFAULT_DIFFICULTY):
+        """Initialize the rounds of one difficulty.
+
+        Args:
+            round_file (RoundFile): The parsed round file.
+            difficulty (str, optional): One of the file's difficulties. Defaults to DEFAULT_DIFFICULTY.
+        """
+        if difficulty not in round_file.difficulties:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        self.round_file = round_file
+        self.difficulty = round_file.difficulties[difficulty]
+
+    def __len__(self) -> int:
+        return self.difficulty.last_round
+
+    def __getitem__(self, index: int) -> Wave:
+        """Build the Wave for a round (0-based). Every call returns a new, unstarted Wave."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Round index out of range: {index}")
+        difficulty = self.difficulty
+        return self.round_file.rounds[index].build_wave(difficulty.count_multiplier, difficulty.spawn_delay_multiplier)
+
+    def __iter__(self) -> Iterator[Wave]:
+        """Yield the rounds in order, building each one only when it is asked for"""
+        for index in range(len(self)):
+            yield self[index]
@@ -2,10 +2,12 @@
 Wave system for managing bloon spawning
 """
 from typing import List, Optional, Tuple, TYPE_CHECKING
-from ..entities.bloon_types import BloonType
+from ..entities.bloon_types import BloonType, BLOON_PROPERTIES
+from ..constants import SIM_TICK_MS
 
 if TYPE_CHECKING:
     from ..entities.bloon import Bloon
+    from ..entities.bloon_store import BloonStore
 
 
 class Wave:
@@ -15,11 +17,23 @@ class Wave:
         self.spawn_delay = spawn_delay # milliseconds between spawns
         self.spawned = 0
         self.total_bloons = sum(counts)
-        self.last_spawn_time = 0
+        self.last_spawn_time = 0 # Time the last bloon was due - spawns are spaced from this, not from when they ran
         self.current_type_index = 0
         self.current_type_count = 0
         
-    def spawn_next_bloon(self, current_time: float, path: List[Tuple[int, int]]) -> Optional['Bloon']:
+    def begin(self, current_time: float):
+        """Start the wave from its first bloon at current_time. The first bloon is due one spawn delay later."""
+        self.spawned = 0
+        self.current_type_index = 0
+        self.current_type_count = 0
+        self.last_spawn_time = current_time
+
+    def next_bloon_type(self, current_time: float) -> Optional[BloonType]:
+        """Return the type of the next bloon due by current_time, or None if none is due
+
+        Each call hands out at most one bloon. If several are due, e.g. after a
+        long frame, call again until it returns None.
+        """
         if self.spawned >= self.total_bloons:
             return None
             
@@ -29,21 +43,51 @@ class Wave:
         # Spawn bloon of current type
         if self.current_type_index < len(self.bloon_types):
             bloon_type = self.bloon_types[self.current_type_index]
-            from ..entities.bloon import Bloon
-            bloon = Bloon(bloon_type, path)
             
             self.spawned += 1
             self.current_type_count += 1
-            self.last_spawn_time = current_time
+            self.last_spawn_time += self.spawn_delay
             
             # Move to next type if current type is exhausted
             if self.current_type_count >= self.counts[self.current_type_index]:
                 self.current_type_index += 1
                 self.current_type_count = 0
             
-            return bloon
+            return bloon_type
         
         return None
     
+    def spawn_next_bloon(self, current_time: float, path: List[Tuple[int, int]],
+                         store: Optional['BloonStore'] = None) -> Optional['Bloon']:
+        """Spawn the bloon due at current_time
+
+        If a store is given the bloon takes a row in it, reusing rows freed by
+        earlier pops; otherwise it is created as a standalone Bloon.
+        """
+        bloon_type = self.next_bloon_type(current_time)
+        if bloon_type is None:
+            return None
+        
+        if store is not None:
+            return store.handle(store.spawn(bloon_type))
+        
+        from ..entities.bloon import Bloon
+        return Bloon(bloon_type, path)
+    
+    def spawn_due_bloons(self, current_time: float, store: 'BloonStore', tick_ms: float = SIM_TICK_MS) -> List[int]:
+        """Spawn every bloon due by current_time into the store and return their rows
+
+        A bloon that fell due partway through the last tick has already been
+        moving for that long, so it starts that far along the path. Spacing
+        between bloons stays exact whatever the frame rate or game speed.
+        """
+        slots = []
+        bloon_type = self.next_bloon_type(current_time)
+        while bloon_type is not None:
+            late_ms = current_time - self.last_spawn_time
+            slots.append(store.spawn(bloon_type, BLOON_PROPERTIES[bloon_type].speed * late_ms / tick_ms))
+            bloon_type = self.next_bloon_type(current_time)
+        return slots
+
     def is_complete(self) -> bool:
         return self.spawned >= self.total_bloons
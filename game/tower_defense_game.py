@@ -1,27 +1,25 @@
 """
 Main Tower Defense Game class
 """
+import os
 import pygame
-import json
 import subprocess
-import math
-from typing import List, Tuple, Optional
+import time
+from typing import Tuple, Optional
 
 # Import game constants
-from .constants import (
-    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, WHITE, RED,
-    STARTING_MONEY, STARTING_LIVES, TOWER_COST
-)
+from .constants import (SCREEN_WIDTH, SCREEN_HEIGHT, FPS, WHITE, RED, GAME_SPEEDS, UNCAPPED_FRAME_BUDGET_MS,
+                        LAST_SESSION_REPLAY, REPLAY_SEEK_TICKS, AUTOSAVE_EXIT_TIMEOUT)
 
 # Import game entities
-from .entities.bloon import Bloon
 from .entities.tower import Tower
-from .entities.projectile import Projectile
 from .entities.bloon_types import BloonType
 
-# Import game systems
-from .systems.wave import Wave
-from .systems.game_map import GameMap
+# Import game simulation
+from .sim.engine import GameSimulation
+from .sim.clock import FixedTimestep
+from .sim.replay import ReplayPlayer
+from .sim.autosave import Autosaver
 from .ui.game_ui import GameUI
 from .ui.pause_menu import PauseMenu, SettingsIcon, SettingsMenu
 from .ui.ingame_upgrade_panel import InGameUpgradePanel
@@ -47,8 +45,37 @@ def get_window_title():
     return f"Tower Defense Game - git-{commit_hash}"
 
 
+def _sim_property(name: str) -> property:
+    """Expose a GameSimulation attribute directly on the game"""
+    return property(
+        lambda self: getattr(self.sim, name),
+        lambda self, value: setattr(self.sim, name, value)
+    )
+
+
 class TowerDefenseGame:
-    def __init__(self):
+    # Gameplay state lives in the headless simulation; the game only renders it and feeds it input
+    money = _sim_property('money')
+    lives = _sim_property('lives')
+    wave_number = _sim_property('wave_number')
+    game_over = _sim_property('game_over')
+    game_map = _sim_property('game_map')
+    bloons = _sim_property('bloons')
+    towers = _sim_property('towers')
+    projectiles = _sim_property('projectiles')
+    waves = _sim_property('waves')
+    current_wave = _sim_property('current_wave')
+    wave_active = _sim_property('wave_active')
+    auto_start_rounds = _sim_property('auto_start_rounds')
+    auto_start_delay = _sim_property('auto_start_delay')
+    wave_completed_time = _sim_property('wave_completed_time')
+
+    def __init__(self, replay: Optional[ReplayPlayer] = None):
+        """Initialize the game.
+        
+        Args:
+            replay (ReplayPlayer, optional): Watch a recorded session instead of playing. Gameplay input is disabled.
+        """
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption(get_window_title())
@@ -62,30 +89,17 @@ class TowerDefenseGame:
             'small': pygame.font.SysFont(None, 24)
         }
         
-        # Game state
-        self.money = STARTING_MONEY
-        self.lives = STARTING_LIVES
-        self.wave_number = 1
-        self.game_over = False
+        # Game state (map, waves, money, lives and all entities)
+        self.replay = replay
+        self.sim = replay.sim if replay else GameSimulation(endless=True)
+        self.autosaver = None if replay else Autosaver(upload=self.upload_save) # Saves on a background thread
+        self.timestep = FixedTimestep() # Converts real frame time into fixed simulation ticks
+        self.game_speed_index = 0 # Index into GAME_SPEEDS
         self.paused = False
         
         # Settings
-        self.auto_start_rounds = False
-        self.auto_start_delay = 3000 # 3 seconds delay before auto start
-        self.wave_completed_time = 0 # Track when wave was completed
         self.show_fps = False
         
-        # Game objects
-        self.load_map()
-        self.bloons: List[Bloon] = []
-        self.towers: List[Tower] = []
-        self.projectiles: List[Projectile] = []
-        
-        # Wave management
-        self.current_wave: Optional[Wave] = None
-        self.waves = self.create_waves()
-        self.wave_active = False
-        
         # UI
         self.ui = GameUI()
         self.pause_menu = PauseMenu()
@@ -95,6 +109,7 @@ class TowerDefenseGame:
         # Tower selection and upgrade system
         self.selected_tower: Optional[Tower] = None
         self.upgrade_panel = InGameUpgradePanel(SCREEN_WIDTH - 320, 100)
+        self.upgrade_panel.upgrade_handler = self.sim.upgrade_tower # Upgrades are paid for and recorded by the simulation
         self.tower_selection_panel = TowerSelectionPanel()
         self.settings_icon = SettingsIcon()
         self.current_menu = "none" # Track which menu is open: "none", "pause", "settings", "mode_selection"
@@ -108,48 +123,47 @@ class TowerDefenseGame:
         self.dragging_tower = False
         self.drag_start_pos = None
         
-    def load_map(self):
-        # Default map data
-        default_map = {
-            "path": [
-                (50, 360), (200, 360), (200, 200), (400, 200),
-                (400, 500), (600, 500), (600, 300), (800, 300),
-                (800, 600), (1000, 600), (1000, 200), (1230, 200)
-            ],
-            "spawn_point": (50, 360),
-            "end_point": (1230, 200)
-        }
-        
-        # Try to load from JSON file
-        try:
-            with open("maps/map1.json", "r") as f:
-                map_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            map_data = default_map
-            
-        self.game_map = GameMap(map_data)
+    def start_wave(self):
+        self.sim.start_wave()
     
-    def create_waves(self) -> List[Wave]: # TODO: create a system to load levels and their bloons from corresponding maps (including E/M/H Easy Medium Hard logic (/impossible))
-        waves = []
-        # Wave 1: 10 red bloons
-        waves.append(Wave([BloonType.RED], [10], 800))
-        # Wave 2: 15 red bloons
-        waves.append(Wave([BloonType.RED], [15], 600))
-        # Wave 3: 10 red, 5 blue
-        waves.append(Wave([BloonType.RED, BloonType.BLUE], [10, 5], 500))
-        # Wave 4: 5 red, 10 blue, 3 green
-        waves.append(Wave([BloonType.RED, BloonType.BLUE, BloonType.GREEN], [5, 10, 3], 400))
-        
-        return waves
+    @property
+    def game_speed(self) -> Optional[int]:
+        """Current fast-forward multiplier, or None when uncapped"""
+        return GAME_SPEEDS[self.game_speed_index]
     
-    def start_wave(self):
-        if self.wave_number <= len(self.waves):
-            self.current_wave = self.waves[self.wave_number - 1]
-            self.wave_active = True
+    def cycle_game_speed(self):
+        """Cycle fast-forward: 1x -> 2x -> 4x -> 8x -> uncapped -> 1x
+        
+        Only the number of simulation ticks per rendered frame changes, so the
+        outcome is exactly the same as playing at 1x.
+        """
+        self.game_speed_index = (self.game_speed_index + 1) % len(GAME_SPEEDS)
+        self.timestep.speed = self.game_speed or 1
+        self.timestep.reset()
+    
+    def handle_replay_event(self, event):
+        """Replay controls - pause, fast-forward and seeking. The recorded inputs drive everything else."""
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.running = False
+            elif event.key == pygame.K_SPACE:
+                self.paused = not self.paused
+            elif event.key == pygame.K_f:
+                self.cycle_game_speed()
+            elif event.key == pygame.K_LEFT:
+                self.replay.seek(self.replay.tick - REPLAY_SEEK_TICKS)
+                self.timestep.reset()
+            elif event.key == pygame.K_RIGHT:
+                self.replay.seek(self.replay.tick + REPLAY_SEEK_TICKS)
+                self.timestep.reset()
     
     def handle_events(self):
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            if self.replay:
+                self.handle_replay_event(event)
+            elif event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -167,18 +181,20 @@ class TowerDefenseGame:
                         self.paused = True
                 elif event.key == pygame.K_SPACE and not self.wave_active and not self.paused:
                     self.start_wave()
+                elif event.key == pygame.K_f and not self.paused:
+                    self.cycle_game_speed()
                 elif event.key == pygame.K_t and not self.paused:
                     # Toggle tower selection panel visibility
                     self.tower_selection_panel.visible = not self.tower_selection_panel.visible
                 elif event.key == pygame.K_b and self.sandbox_mode and not self.paused:
                     # Cycle through bloon types in sandbox mode
-                    bloon_types = [BloonType.RED, BloonType.BLUE, BloonType.GREEN, BloonType.YELLOW]
+                    bloon_types = list(BloonType)
                     current_index = bloon_types.index(self.sandbox_bloon_type)
                     self.sandbox_bloon_type = bloon_types[(current_index + 1) % len(bloon_types)]
                 elif event.key == pygame.K_TAB and not self.paused:
                     # Cycle targeting mode for selected tower
                     if self.selected_tower:
-                        self.selected_tower.cycle_targeting_mode()
+                        self.sim.cycle_targeting_mode(self.selected_tower)
                 elif event.key == pygame.K_DELETE and not self.paused:
                     # Sell selected tower (DELETE key)
                     if self.selected_tower:
@@ -201,7 +217,7 @@ class TowerDefenseGame:
                             self.pause_menu.show()
                             self.current_menu = "pause"
                         elif action == "toggle_auto_start":
-                            self.auto_start_rounds = self.settings_menu.auto_start_rounds
+                            self.sim.set_auto_start_rounds(self.settings_menu.auto_start_rounds)
                         elif action == "toggle_placement_mode":
                             # Placement mode changed, deselect any current tower selection
                             self.tower_selection_panel.deselect_tower()
@@ -221,8 +237,7 @@ class TowerDefenseGame:
                             self.game_mode = "sandbox"
                             self.sandbox_mode = True
                             # Set sandbox mode properties
-                            self.money = 999999 # Infinite money
-                            self.lives = 999999 # Infinite lives
+                            self.sim.set_resources(money=999999, lives=999999) # Infinite money and lives
                         elif action == "back":
                             self.mode_selection.hide()
                             self.current_menu = "none"
@@ -264,8 +279,7 @@ class TowerDefenseGame:
                             # For click mode, tower is selected and ready for placement on next click
                         # Check if clicking on upgrade panel
                         elif self.upgrade_panel.visible and self.upgrade_panel.rect.collidepoint(mouse_pos):
-                            money_spent = self.upgrade_panel.handle_click(mouse_pos, self.money)
-                            self.money -= money_spent
+                            self.upgrade_panel.handle_click(mouse_pos, self.money)
                         else:
                             # Check if clicking on existing tower for selection
                             clicked_tower = None
@@ -334,39 +348,12 @@ class TowerDefenseGame:
         if not selected_tower_id:
             return # No tower type selected
         
-        tower_cost = self.tower_selection_panel.get_tower_cost(selected_tower_id)
-        
-        if self.money >= tower_cost and self.game_map.can_place_tower(position, self.towers):
-            # Get tower stats from data
-            tower_data = self.tower_selection_panel.get_selected_tower_data()
-            if tower_data:
-                base_stats = tower_data.get('base_stats', {})
-                range_val = base_stats.get('range', 32) * 3 # Scale up range for gameplay
-                damage = base_stats.get('damage', 1)
-                fire_rate = base_stats.get('fire_rate', 0.95)
-                pierce = base_stats.get('pierce', 1)
-                projectiles = base_stats.get('projectiles', 1)
-                
-                # Create tower with proper stats
-                new_tower = Tower(
-                    position, 
-                    range_val=range_val, 
-                    damage=damage, 
-                    fire_rate=fire_rate,
-                    pierce=pierce,
-                    projectiles=projectiles,
-                    tower_type=selected_tower_id
-                )
-                new_tower.set_base_cost(tower_cost)
-                self.towers.append(new_tower)
-                self.money -= tower_cost
+        self.sim.place_tower(position, selected_tower_id)
     
     def sell_tower(self, tower: 'Tower'):
         """Sell a tower and get money back"""
         if tower in self.towers:
-            sell_price = tower.get_sell_price()
-            self.money += sell_price
-            self.towers.remove(tower)
+            sell_price = self.sim.sell_tower(tower)
             
             # Clear selection if this tower was selected
             if hasattr(self, 'upgrade_panel') and self.upgrade_panel.selected_tower == tower:
@@ -380,106 +367,36 @@ class TowerDefenseGame:
         """Spawn a bloon at the given position in sandbox mode"""
         if bloon_type is None:
             bloon_type = self.sandbox_bloon_type
-            
-        # Find the closest point on the path to the clicked position
-        closest_index = 0
-        min_distance = float('inf')
-        
-        for i, path_point in enumerate(self.game_map.path):
-            dx = path_point[0] - position[0]
-            dy = path_point[1] - position[1]
-            distance = math.sqrt(dx * dx + dy * dy)
-            if distance < min_distance:
-                min_distance = distance
-                closest_index = i
-        
-        # Create a custom path starting from the clicked position to the closest path point,
-        # then continue with the rest of the path
-        custom_path = [position] + self.game_map.path[closest_index:]
-        
-        # Create and add the bloon
-        new_bloon = Bloon(bloon_type, custom_path)
-        self.bloons.append(new_bloon)
+        
+        self.sim.spawn_bloon(position, bloon_type)
     
-    def update(self):
+    def update(self, frame_ms: float = None):
+        """Run every simulation tick that is due after a frame of frame_ms real milliseconds"""
         if self.game_over or self.paused:
+            # Don't carry time spent paused into the next frame
+            self.timestep.reset()
             return
-            
-        current_time = pygame.time.get_ticks()
-        
-        # Auto start rounds logic
-        if (not self.wave_active and self.auto_start_rounds and 
-            self.wave_completed_time > 0 and 
-            current_time - self.wave_completed_time >= self.auto_start_delay and
-            self.wave_number <= len(self.waves)):
-            self.start_wave()
-            self.wave_completed_time = 0
-        
-        # Spawn bloons
-        if self.wave_active and self.current_wave:
-            new_bloon = self.current_wave.spawn_next_bloon(current_time, self.game_map.path)
-            if new_bloon:
-                self.bloons.append(new_bloon)
-            
-            # Check if wave is complete
-            if self.current_wave.is_complete() and all(not bloon.alive or bloon.reached_end for bloon in self.bloons):
-                self.wave_active = False
-                self.wave_number += 1
-                self.wave_completed_time = current_time # Record when wave was completed
-                # Clear dead bloons
-                self.bloons = [bloon for bloon in self.bloons if bloon.alive and not bloon.reached_end]
-        
-        # Update bloons - use list comprehension for better performance
-        bloons_to_remove = []
-        for bloon in self.bloons:
-            bloon.update()
-            if bloon.reached_end:
-                self.lives -= 1
-                bloons_to_remove.append(bloon)
-                if self.lives <= 0:
-                    self.game_over = True
-        
-        # Remove bloons that reached the end
-        for bloon in bloons_to_remove:
-            self.bloons.remove(bloon)
-        
-        # Update towers and create projectiles
-        for tower in self.towers:
-            new_projectiles = tower.update(self.bloons, current_time)
-            if new_projectiles:
-                self.projectiles.extend(new_projectiles)
         
-        # Update projectiles - avoid copying list
-        projectiles_to_remove = []
-        for projectile in self.projectiles:
-            projectile.update(self.bloons)
-            if not projectile.alive:
-                projectiles_to_remove.append(projectile)
-        
-        # Remove dead projectiles
-        for projectile in projectiles_to_remove:
-            self.projectiles.remove(projectile)
+        if frame_ms is None:
+            frame_ms = self.timestep.tick_ms
         
-        # Remove dead bloons and award money - use list comprehension
-        dead_bloons = []
-        for bloon in self.bloons:
-            if not bloon.alive:
-                self.money += bloon.reward
-                dead_bloons.append(bloon)
+        # A replay feeds the recorded inputs in as it advances the simulation
+        advance = self.replay.advance if self.replay else self.sim.advance
+        if self.game_speed is None:
+            # Uncapped - simulate for a fixed slice of real time per frame
+            deadline = time.perf_counter() + UNCAPPED_FRAME_BUDGET_MS / 1000
+            while time.perf_counter() < deadline and advance(1):
+                pass
+        else:
+            advance(self.timestep.advance(frame_ms))
         
-        # Remove dead bloons
-        for bloon in dead_bloons:
-            self.bloons.remove(bloon)
+        if self.autosaver:
+            self.autosaver.update(self.sim)
         
         # Update tower selection panel hover state (only when needed)
-        if not self.paused and not self.game_over:
+        if not self.game_over:
             mouse_pos = pygame.mouse.get_pos()
             self.tower_selection_panel.handle_hover(mouse_pos)
-        
-        # Clean up dead objects less frequently to improve performance
-        if len(self.bloons) > 100 or len(self.projectiles) > 200:
-            self.bloons = [bloon for bloon in self.bloons if bloon.alive and not bloon.reached_end]
-            self.projectiles = [proj for proj in self.projectiles if proj.alive]
     
     def draw(self):
         # Draw map
@@ -502,19 +419,22 @@ class TowerDefenseGame:
                 text_pos = (mouse_pos[0] + 20, mouse_pos[1] - 30)
                 self.screen.blit(drag_text, text_pos)
         
-        # Draw bloons
-        for bloon in self.bloons:
-            bloon.draw(self.screen)
+        # Draw bloons and projectiles between the last two simulation ticks
+        alpha = self.timestep.alpha
+        self.sim.bloon_store.draw(self.screen, alpha)
         
-        # Draw projectiles
         for projectile in self.projectiles:
-            projectile.draw(self.screen)
+            projectile.draw(self.screen, alpha)
         
         # Draw UI
-        self.ui.draw(self.screen, self.money, self.lives, self.wave_number, self.paused)
+        self.ui.draw(self.screen, self.money, self.lives, self.wave_number, self.paused, self.game_speed)
         
         # Draw game mode indicator - use cached fonts
-        if self.sandbox_mode:
+        if self.replay:
+            mode_text = self.cached_fonts['small'].render(f"REPLAY - tick {self.replay.tick}/{self.replay.end_tick} (LEFT/RIGHT to seek, SPACE to pause)", True, WHITE)
+            mode_rect = mode_text.get_rect(topleft=(10, 10))
+            self.screen.blit(mode_text, mode_rect)
+        elif self.sandbox_mode:
             mode_text = self.cached_fonts['small'].render(f"SANDBOX MODE - Click to spawn {self.sandbox_bloon_type.value.upper()} bloons (Press B to cycle)", True, WHITE)
             mode_rect = mode_text.get_rect(topleft=(10, 10))
             self.screen.blit(mode_text, mode_rect)
@@ -548,8 +468,8 @@ class TowerDefenseGame:
             self.screen.blit(game_over_text, text_rect)
         
         # Draw wave start hint or auto start countdown
-        if not self.wave_active and self.wave_number <= len(self.waves) and not self.game_over and not self.paused:
-            current_time = pygame.time.get_ticks()
+        if not self.wave_active and self.sim.has_round(self.wave_number) and not self.game_over and not self.paused:
+            current_time = self.sim.time
             if self.auto_start_rounds and self.wave_completed_time > 0:
                 # Show countdown for auto start
                 time_remaining = self.auto_start_delay - (current_time - self.wave_completed_time)
@@ -584,14 +504,37 @@ class TowerDefenseGame:
         pygame.display.flip()
     
     def run(self):
+        self.clock.tick()
         while self.running:
             self.handle_events()
-            self.update()
+            # Feed the real duration of the last frame to the fixed-timestep simulation
+            self.update(self.clock.get_time())
             self.draw()
             self.clock.tick(FPS)
         
+        if not self.replay:
+            self.save_replay()
+        if self.autosaver:
+            self.autosaver.close(AUTOSAVE_EXIT_TIMEOUT)
+        
         # Don't quit pygame, just close the game window
         pygame.display.quit()
+    
+    @staticmethod
+    def upload_save(save: dict):
+        """Upload an autosave to the backend when signed in. Runs on the autosave thread."""
+        from .services.backend_client import backend_client
+        if backend_client.get_current_user():
+            backend_client.save_game(save)
+    
+    def save_replay(self, path: str = LAST_SESSION_REPLAY):
+        """Save this session's inputs so it can be watched again with game.py --replay"""
+        self.sim.input_log.end_tick = self.sim.tick
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.sim.input_log.save(path)
+        except OSError as e:
+            print(f"Error saving replay to {path}: {e}")
 
 
 def main():
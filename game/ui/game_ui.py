@@ -2,6 +2,7 @@
 Game UI system for displaying HUD elements
 """
 import pygame
+from typing import Optional
 from ..constants import WHITE, SCREEN_HEIGHT
 
 
@@ -11,7 +12,7 @@ class GameUI:
         self.font = pygame.font.SysFont(None, 44)
         self.small_font = pygame.font.SysFont(None, 28)
 
-    def draw(self, screen, money: int, lives: int, wave_number: int, paused: bool = False):
+    def draw(self, screen, money: int, lives: int, wave_number: int, paused: bool = False, game_speed: Optional[int] = 1):
         """Draw the game UI elements.
 
         Args:
@@ -20,6 +21,7 @@ class GameUI:
             lives (int): The current number of lives.
             wave_number (int): The current wave number.
             paused (bool, optional): Whether the game is paused. Defaults to False.
+            game_speed (int, optional): The fast-forward multiplier, or None when uncapped. Defaults to 1.
         """
         # Draw money
         money_text = self.font.render(f"Money: ${money}", True, WHITE)
@@ -37,7 +39,11 @@ class GameUI:
         if paused:
             pause_text = self.font.render("PAUSED", True, (255, 255, 0))
             screen.blit(pause_text, (10, 186))
+        elif game_speed != 1:
+            speed_label = "MAX" if game_speed is None else f"{game_speed}x"
+            speed_text = self.font.render(f">> {speed_label}", True, (255, 255, 0))
+            screen.blit(speed_text, (10, 186))
 
         # Draw controls hint (moved down to replace tower placement hint)
-        controls_text = self.small_font.render("ESC: Pause | T: Toggle Towers | Right Click: Deselect | Click gear icon: Settings", True, WHITE)
+        controls_text = self.small_font.render("ESC: Pause | F: Fast-forward | T: Toggle Towers | Right Click: Deselect | Click gear icon: Settings", True, WHITE)
         screen.blit(controls_text, (10, SCREEN_HEIGHT - 30))
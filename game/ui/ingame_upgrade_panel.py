@@ -4,7 +4,7 @@ In-game tower upgrade panel for selecting and upgrading towers during gameplay
 import pygame
 import json
 import math
-from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..entities.tower import Tower
@@ -18,6 +18,8 @@ class InGameUpgradePanel:
         self.towers_data: Dict = {}
         self.difficulty_multiplier = 1.0
         self.visible = False
+        # Called as upgrade_handler(tower, path, cost) to buy an upgrade; applied directly to the tower if unset
+        self.upgrade_handler: Optional[Callable[['Tower', str, int], bool]] = None
         
         # Cache fonts to avoid recreating them every frame (major performance improvement)
         self.font_title = pygame.font.SysFont(None, 24)
@@ -99,7 +101,10 @@ class InGameUpgradePanel:
         cost = self.get_upgrade_cost(path, current_level)
         
         # Apply the upgrade
-        self.selected_tower.apply_upgrade(path, upgrade_data)
+        if self.upgrade_handler is not None:
+            self.upgrade_handler(self.selected_tower, path, cost)
+        else:
+            self.selected_tower.apply_upgrade(path, upgrade_data)
         
         return cost
     
@@ -0,0 +1,25 @@
+"""
+Shared pytest configuration
+
+Timing tests are marked benchmark and only run with --benchmark, since
+wall-clock limits flake on busy machines. Helpers shared by several test
+modules are plain functions in helpers.py.
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="also run the timing tests marked benchmark")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock timing test, skipped unless --benchmark is given")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="timing test, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
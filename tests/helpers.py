@@ -0,0 +1,76 @@
+"""
+Test helpers shared by several test modules
+
+Plain functions, imported with `from helpers import ...`, so test modules
+never import from each other.
+"""
+import numpy as np
+from game.entities import BloonStore, BloonType
+from game.sim import GameSimulation
+from game.sim.spatial_grid import BloonGrid
+from game.systems import Wave, GameMap
+
+
+def make_simulation(waves=None, money=1000):
+    """Create a simulation on a straight test map"""
+    game_map = GameMap({
+        "path": [(0, 300), (600, 300)],
+        "spawn_point": (0, 300),
+        "end_point": (600, 300)
+    })
+    if waves is None:
+        waves = [Wave([BloonType.RED], [5], 500)]
+    return GameSimulation(game_map=game_map, waves=waves, money=money)
+
+
+def make_scripted_simulation():
+    """A fresh simulation with the waves and money of the scripted game"""
+    waves = [Wave([BloonType.RED, BloonType.BLUE], [10, 10], 300), Wave([BloonType.GREEN, BloonType.YELLOW], [10, 10], 250)]
+    return make_simulation(waves=waves, money=2000)
+
+
+def play_scripted_game():
+    """Play a game with a spread of player actions at different ticks"""
+    sim = make_scripted_simulation()
+    sim.place_tower((200, 340), "dart_monkey")
+    tack = sim.place_tower((400, 260), "tack_shooter")
+    sim.start_wave()
+    sim.advance(200)
+    sim.cycle_targeting_mode(tack)
+    sim.upgrade_tower(tack, "path1")
+    sim.spawn_bloon((120, 310), BloonType.YELLOW)
+    sim.advance(150)
+    sniper = sim.place_tower((500, 340), "dart_monkey")
+    sim.set_auto_start_rounds(True)
+    sim.advance(400)
+    sim.sell_tower(sniper)
+    sim.advance(1500)
+    return sim
+
+
+def game_state(sim):
+    """Everything a desync would show up in"""
+    return (sim.tick, sim.money, sim.lives, sim.wave_number,
+            [(tower.uid, tower.position, tower.targeting_mode, dict(tower.upgrade_levels)) for tower in sim.towers],
+            [(bloon.uid, bloon.position, bloon.health) for bloon in sim.bloons],
+            [tuple(projectile.position) for projectile in sim.projectiles])
+
+
+def make_crowd(seed, count=300, low=(0, 0), high=(400, 400), bloon_type=BloonType.RED):
+    """Bloons scattered over a rectangle, and the random generator that placed them"""
+    rng = np.random.default_rng(seed)
+    store = BloonStore([(0, 0), (800, 0)], capacity=count)
+    for _ in range(count):
+        store.spawn(bloon_type)
+    store.position[:count] = rng.uniform(low, high, size=(count, 2))
+    return store, rng
+
+
+def place_bloons(positions, bloon_type=BloonType.RED):
+    """Bloons at the given positions, with a rebuilt grid"""
+    store = BloonStore([(0, 0), (800, 0)])
+    for position in positions:
+        store.position[store.spawn(bloon_type)] = position
+    grid = BloonGrid(store)
+    grid.rebuild()
+    return store, grid
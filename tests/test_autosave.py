@@ -0,0 +1,75 @@
+"""
+Background autosave tests
+"""
+import threading
+from game.sim import Autosaver
+from helpers import make_simulation, game_state
+
+
+def test_save_returns_before_a_slow_upload(tmp_path):
+    uploads = []
+    backend_ready = threading.Event()
+    def slow_upload(save):
+        backend_ready.wait(5) # A slow backend request
+        uploads.append(save)
+
+    sim = make_simulation()
+    sim.place_tower((200, 340), "dart_monkey")
+    sim.start_wave()
+    sim.advance(100)
+    autosaver = Autosaver(str(tmp_path / "saves" / "autosave.bin"), upload=slow_upload)
+
+    autosaver.save(sim)
+    assert not uploads # The game thread didn't wait for the upload
+    sim.advance(50) # The game carries on while the save is written
+    backend_ready.set()
+
+    assert autosaver.flush(timeout=5)
+    assert uploads[0]['tick'] == 100 and uploads[0]['snapshot']
+    restored = make_simulation()
+    restored.restore(Autosaver.load(autosaver.path))
+    restored.advance(50)
+    assert game_state(restored) == game_state(sim)
+    autosaver.close()
+
+
+def test_only_the_newest_waiting_save_is_written(tmp_path):
+    uploading = threading.Event()
+    release = threading.Event()
+    uploads = []
+    def blocked_upload(save):
+        uploading.set()
+        release.wait(5)
+        uploads.append(save['tick'])
+
+    sim = make_simulation()
+    autosaver = Autosaver(None, upload=blocked_upload)
+    autosaver.save(sim)
+    assert uploading.wait(5) # The worker has picked up the first save
+    for _ in range(3):
+        sim.advance(10)
+        autosaver.save(sim)
+    release.set()
+    autosaver.close(timeout=5)
+    assert uploads == [0, 30]
+
+
+def test_saves_at_wave_end_and_on_the_interval(tmp_path):
+    sim = make_simulation()
+    autosaver = Autosaver(str(tmp_path / "autosave.bin"), interval_ticks=1000)
+    autosaver.update(sim)
+    sim.start_wave()
+    saved_at = []
+    while sim.wave_active:
+        sim.step()
+        if autosaver.update(sim):
+            saved_at.append(sim.tick)
+    for _ in range(1200):
+        sim.step()
+        if autosaver.update(sim):
+            saved_at.append(sim.tick)
+    autosaver.close(timeout=5)
+
+    wave_end = saved_at[0]
+    assert sim.wave_number == 2 and autosaver.saves_written == 2
+    assert saved_at == [wave_end, wave_end + 1000]
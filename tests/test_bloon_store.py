@@ -0,0 +1,82 @@
+"""
+Structure-of-arrays bloon store tests
+"""
+from game.entities import Bloon, BloonStore, BloonType
+
+
+PATH = [(0, 0), (100, 0), (100, 100)]
+
+
+def test_store_moves_all_bloons_like_single_bloons():
+    """One vectorized update moves every bloon exactly like updating each alone"""
+    store = BloonStore(PATH, capacity=2) # Forces the store to grow
+    types = [BloonType.RED, BloonType.BLUE, BloonType.GREEN, BloonType.YELLOW]
+    for bloon_type in types:
+        store.spawn(bloon_type)
+    singles = [Bloon(bloon_type, PATH) for bloon_type in types]
+
+    for _ in range(120):
+        store.update()
+        for bloon in singles:
+            bloon.update()
+
+    for slot, single in enumerate(singles):
+        view = store.handle(slot)
+        assert view.position == single.position
+        assert view.path_index == single.path_index
+        assert view.type == single.type
+
+
+def test_leaked_bloons_are_counted_once():
+    """Bloons at the end of the path are reported as leaked on the tick they finish"""
+    store = BloonStore([(0, 0), (10, 0)])
+    store.spawn(BloonType.YELLOW)
+
+    leaked = [store.update() for _ in range(20)]
+    assert sum(leaked) == 1
+    assert store.handle(0).reached_end
+    assert not store.handle(0).alive
+
+
+def test_compact_rewards_and_keeps_views_valid():
+    """Compaction removes popped bloons, pays their reward and re-points surviving views"""
+    store = BloonStore(PATH)
+    for bloon_type in (BloonType.RED, BloonType.GREEN, BloonType.BLUE):
+        store.spawn(bloon_type)
+    red, green, blue = store.live_handles()
+
+    assert red.take_damage(1)
+    assert not blue.take_damage(1) # Pops the blue layer, leaving a red
+    assert store.compact() == 2 # Red bloon and blue layer rewards
+
+    assert store.count == 2
+    assert store.live_handles() == [green, blue]
+    assert blue.type == BloonType.RED
+    assert blue.health == 1
+    assert blue.slot == 1
+
+    # The popped bloon's view keeps its final state
+    assert not red.alive
+    assert red.type == BloonType.RED
+
+
+def test_live_counter_tracks_pops_and_leaks():
+    """The live counter always matches a full scan of the store"""
+    store = BloonStore([(0, 0), (50, 0)])
+    for bloon_type in (BloonType.RED, BloonType.GREEN, BloonType.YELLOW, BloonType.BLUE):
+        store.spawn(bloon_type)
+    red, green, yellow, blue = store.live_handles()
+    assert store.live == 4
+
+    red.take_damage(1)
+    red.take_damage(1) # Already popped - not counted twice
+    blue.alive = False
+    assert store.live == 2
+
+    while not yellow.reached_end:
+        store.update()
+    assert store.live == int(store.active_mask().sum()) == 1
+
+    store.compact()
+    assert store.count == store.live == 1
+    assert store.live_handles() == [green]
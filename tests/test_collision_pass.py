@@ -0,0 +1,57 @@
+"""
+Batched projectile-bloon collision tests
+"""
+import numpy as np
+from game.entities import BloonStore, BloonType, Projectile
+from game.sim.collision import find_hits, resolve_projectile_hits
+
+
+def make_scene(seed):
+    """A crowded random scene of bloons and projectiles"""
+    rng = np.random.default_rng(seed)
+    store = BloonStore([(0, 0), (800, 0)])
+    for _ in range(300):
+        store.spawn(BloonType.YELLOW if rng.random() < 0.5 else BloonType.BLUE)
+    store.position[:store.count] = rng.uniform(0, 400, size=(store.count, 2))
+
+    projectiles = []
+    for x, y, pierce in zip(rng.uniform(0, 400, 200), rng.uniform(0, 400, 200), rng.integers(1, 6, 200)):
+        projectiles.append(Projectile((x, y), damage=1, pierce=int(pierce)))
+    return store, projectiles
+
+
+def test_find_hits_matches_broadcasting():
+    """Sort-and-sweep finds exactly the pairs a full distance matrix does"""
+    rng = np.random.default_rng(1)
+    projectile_positions = rng.uniform(0, 500, size=(100, 2))
+    bloon_positions = rng.uniform(0, 500, size=(400, 2))
+    radii = rng.uniform(5, 25, size=400)
+
+    offsets = projectile_positions[:, None, :] - bloon_positions[None, :, :]
+    expected = np.nonzero((offsets ** 2).sum(axis=2) <= radii ** 2)
+
+    hit_projectiles, hit_bloons = find_hits(projectile_positions, bloon_positions, radii)
+    assert hit_projectiles.tolist() == expected[0].tolist()
+    assert hit_bloons.tolist() == expected[1].tolist()
+
+
+def test_batched_pass_matches_sequential_collisions():
+    """Resolving all hits at once gives the same damage, pierce and hit tracking as one projectile at a time"""
+    batched_store, batched_projectiles = make_scene(seed=5)
+    sequential_store, sequential_projectiles = make_scene(seed=5)
+
+    resolve_projectile_hits(batched_projectiles, batched_store)
+    bloons = sequential_store.live_handles()
+    for projectile in sequential_projectiles:
+        projectile.collide(bloons)
+
+    assert batched_store.health[:300].tolist() == sequential_store.health[:300].tolist()
+    assert batched_store.flags[:300].tolist() == sequential_store.flags[:300].tolist()
+    for batched, sequential in zip(batched_projectiles, sequential_projectiles):
+        assert batched.pierce_remaining == sequential.pierce_remaining
+        assert batched.alive == sequential.alive
+        assert batched.hit_bloons == sequential.hit_bloons
+
+    # The scene is crowded enough that pierce and pops actually matter
+    assert any(not projectile.alive for projectile in batched_projectiles)
+    assert (batched_store.health[:300] <= 0).any()
@@ -0,0 +1,82 @@
+"""
+Procedural endless round tests
+"""
+import threading
+from game.entities import BloonType
+from game.sim import GameSimulation
+from game.systems import EndlessRounds, Wave
+from game.systems.endless import RBE, wave_rbe
+from helpers import make_simulation
+
+
+def defined_rounds():
+    return [Wave([BloonType.RED], [10], 500), Wave([BloonType.RED, BloonType.BLUE], [10, 10], 400)]
+
+
+def test_generated_rounds_spend_a_growing_budget():
+    waves = EndlessRounds(defined_rounds(), seed=1)
+    assert waves.base_budget == 30
+    assert waves[0] is waves.rounds[0] and waves[1] is waves.rounds[1]
+
+    previous = 30
+    for index in range(2, 40):
+        wave = waves[index]
+        budget = waves.budget(index)
+        assert budget > previous
+        # Whole bloons only, so each group can fall short of its share by less than one bloon
+        assert budget - sum(RBE[bloon_type] for bloon_type in wave.bloon_types) <= wave_rbe(wave) <= budget + 1
+        assert [RBE[bloon_type] for bloon_type in wave.bloon_types] == sorted(RBE[bloon_type] for bloon_type in wave.bloon_types)
+        previous = budget
+    assert BloonType.BLACK in waves[39].bloon_types # The strongest type is always among the groups
+
+
+def test_generation_is_deterministic_per_seed():
+    first, again, other = EndlessRounds(defined_rounds(), 7), EndlessRounds(defined_rounds(), 7), EndlessRounds(defined_rounds(), 8)
+    assert first.generated(2, 30) == again.generated(2, 30)
+    assert first.generated(2, 30) != other.generated(2, 30)
+
+
+def test_rounds_are_generated_when_reached():
+    """Generated rounds start no threads, and each visit builds a fresh, identical Wave"""
+    threads = threading.active_count()
+    waves = EndlessRounds(defined_rounds(), seed=3)
+    wave = waves[2]
+    assert threading.active_count() == threads
+    assert wave is not waves[2]
+    assert (wave.bloon_types, wave.counts) == (waves[2].bloon_types, waves[2].counts)
+
+
+def test_starting_a_round_prepares_the_next():
+    """Reaching a round generates the one after it, so it is ready before it starts"""
+    waves = EndlessRounds(defined_rounds(), seed=3)
+    generated = []
+    generate = waves._generate
+    waves._generate = lambda index: generated.append(index) or generate(index)
+    defined = len(waves.rounds)
+
+    waves[defined - 1]
+    assert generated == [defined]
+    first = waves[defined]
+    assert generated == [defined, defined + 1]
+    waves[defined + 1]
+    assert generated == [defined, defined + 1, defined + 2]
+    assert (first.bloon_types, first.counts) == (waves[defined].bloon_types, waves[defined].counts)
+
+
+def test_simulations_are_endless_only_when_asked():
+    """Endless mode is opt-in, and an endless simulation has a round for every number"""
+    assert not make_simulation().endless
+    sim = GameSimulation(endless=True)
+    assert sim.endless and sim.has_round(10 ** 6)
+    defined = GameSimulation()
+    assert defined.has_round(len(defined.waves)) and not defined.has_round(len(defined.waves) + 1)
+
+
+def test_simulation_plays_on_past_the_last_defined_round():
+    sim = make_simulation(waves=EndlessRounds(defined_rounds()), money=10 ** 6)
+    assert sim.endless
+    sim.set_resources(lives=10 ** 6)
+    for _ in range(5):
+        sim.play_wave()
+    assert sim.wave_number == 6
+    assert not sim.game_over
@@ -0,0 +1,113 @@
+"""
+Explosive projectile and splash damage tests
+"""
+import time
+import numpy as np
+import pytest
+from game.entities import BloonStore, BloonType, Projectile
+from game.entities.bloon_store import SIZE_TABLE
+from game.sim.collision import resolve_explosions, resolve_projectile_hits
+from game.sim.spatial_grid import BloonGrid
+from game.systems import Wave
+from helpers import make_simulation, game_state, make_crowd
+
+
+def test_explosions_match_brute_force():
+    """Every blast hits the first bloons it overlaps, up to its pierce, and damage from several blasts adds up"""
+    store, rng = make_crowd(seed=3)
+    store.health[:store.count] = 10
+    centers = rng.uniform(0, 400, size=(40, 2))
+    radii = rng.uniform(10, 60, size=40)
+    damages = rng.integers(1, 3, size=40)
+    pierce = rng.integers(1, 20, size=40)
+
+    expected = np.full(store.count, 10)
+    expected_hits = 0
+    reach = radii[:, None] + SIZE_TABLE[store.type[:store.count]][None, :]
+    offsets = centers[:, None, :] - store.position[None, :store.count, :]
+    overlapping = (offsets ** 2).sum(axis=2) <= reach ** 2
+    for blast in range(40):
+        caught = np.nonzero(overlapping[blast])[0][:pierce[blast]]
+        expected[caught] -= damages[blast]
+        expected_hits += len(caught)
+
+    assert resolve_explosions(centers, radii, damages, pierce, store) == expected_hits
+    assert store.health[:store.count].tolist() == expected.tolist()
+    assert (expected < 10).sum() > 100 # Crowded enough that the caps matter
+
+
+def test_explosive_projectile_detonates_on_contact():
+    """A bomb explodes on the first bloon it touches and its blast hits neighbours, capped by its pierce"""
+    store = BloonStore([(0, 0), (800, 0)])
+    for x in (100, 120, 140, 160, 300):
+        store.position[store.spawn(BloonType.BLUE)] = (x, 100)
+    bomb = Projectile((100, 100), damage=1, pierce=3, explosion_radius=40)
+
+    resolve_projectile_hits([bomb], store)
+    assert not bomb.alive
+    assert store.type[:5].tolist() == [0, 0, 0, 1, 1] # Three popped to red, the fourth was past the cap
+    assert store.live == 5
+
+
+def test_sequential_explosion_matches_batched():
+    """Projectile.collide detonates the same way as the batched pass"""
+    batched, _ = make_crowd(seed=8, count=100)
+    sequential, _ = make_crowd(seed=8, count=100)
+    start = tuple(batched.position[0])
+    batched_bomb = Projectile(start, damage=1, pierce=12, explosion_radius=150)
+    sequential_bomb = Projectile(start, damage=1, pierce=12, explosion_radius=150)
+
+    resolve_projectile_hits([batched_bomb], batched)
+    sequential_bomb.collide(sequential.live_handles())
+
+    assert batched.flags[:100].tolist() == sequential.flags[:100].tolist()
+    assert 100 - batched.live == 12
+
+
+@pytest.mark.benchmark
+def test_hundreds_of_explosions_per_tick():
+    """A tick with hundreds of blasts over thousands of bloons stays cheap"""
+    store, rng = make_crowd(seed=11, count=2000, high=(800, 600))
+    grid = BloonGrid(store)
+    grid.rebuild()
+    centers = store.position[rng.choice(store.count, 400, replace=False)] # Each bomb went off on a bloon
+    radii = np.full(400, 54.0)
+    damages = np.ones(400, dtype=np.int64)
+    pierce = np.full(400, 40)
+
+    start = time.perf_counter()
+    hits = resolve_explosions(centers, radii, damages, pierce, store, grid)
+    elapsed = time.perf_counter() - start
+
+    assert hits > 400 * 20
+    assert store.live < 1000
+    assert elapsed < 0.05
+
+
+def test_blast_radius_upgrades_grow_the_explosion():
+    """Upgrades set the blast radius on the same scale as the tower's base stats"""
+    sim = make_simulation(money=10000)
+    bomb = sim.place_tower((300, 250), "bomb_shooter")
+    sim.upgrade_tower(bomb, "path1")
+    assert bomb.explosion_radius == 26 * 3
+    sim.upgrade_tower(bomb, "path1")
+    sim.upgrade_tower(bomb, "path1")
+    assert bomb.explosion_radius == 36 * 3
+
+
+def test_bomb_shooter_game_snapshots_and_replays():
+    """Bomb shooters fire explosive projectiles, which survive a snapshot and restore"""
+    sim = make_simulation(waves=[Wave([BloonType.YELLOW], [60], 200)], money=2000)
+    bomb = sim.place_tower((300, 250), "bomb_shooter")
+    assert bomb.explosion_radius == 54
+    sim.start_wave()
+    while not any(projectile.explosion_radius for projectile in sim.projectiles):
+        sim.step()
+
+    saved = sim.snapshot()
+    sim.advance(300)
+    expected = game_state(sim)
+    sim.restore(saved)
+    sim.advance(300)
+    assert game_state(sim) == expected
+    assert sim.money > 2000 - 500
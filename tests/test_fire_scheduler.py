@@ -0,0 +1,62 @@
+"""
+Event-driven tower firing scheduler tests
+"""
+from game.entities import Tower, BloonType
+from game.sim import FireScheduler
+from game.systems import Wave
+from helpers import make_simulation
+
+
+def test_only_due_towers_are_popped_in_placement_order():
+    """Towers come off the queue once their cooldown expires, in the order they were added"""
+    scheduler = FireScheduler()
+    fast, slow, idle = Tower((0, 0), fire_rate=2.0), Tower((0, 0), fire_rate=0.5), Tower((0, 0))
+    for tower in (slow, fast, idle):
+        scheduler.add(tower)
+    fast.last_shot_time = slow.last_shot_time = 0
+    scheduler.reschedule(fast)
+    scheduler.reschedule(slow)
+
+    assert scheduler.pop_due(0) == [idle]
+    scheduler.reschedule(idle, 0)
+    assert scheduler.pop_due(499) == [idle]
+    assert scheduler.pop_due(500) == [fast]
+    assert scheduler.pop_due(2000) == [slow]
+
+
+def test_removed_and_upgraded_towers():
+    """Removed towers are never popped and fire rate upgrades bring the next shot forward"""
+    scheduler = FireScheduler()
+    sold, upgraded = Tower((0, 0)), Tower((0, 0), fire_rate=0.5)
+    scheduler.add(sold)
+    scheduler.add(upgraded)
+    upgraded.last_shot_time = 0
+    scheduler.reschedule(upgraded)
+    scheduler.remove(sold)
+
+    upgraded.apply_upgrade("path1", {"name": "Faster", "cost": 0, "stats": {"fire_rate": 1.5}})
+    assert scheduler.pop_due(499) == []
+    assert scheduler.pop_due(500) == [upgraded]
+    assert sold.fire_scheduler is None
+
+
+def test_towers_on_cooldown_do_no_work():
+    """A slow tower only looks for targets on the ticks it is allowed to fire"""
+    sim = make_simulation(waves=[Wave([BloonType.RED], [200], 100)], money=10000)
+    tower = sim.place_tower((300, 260), "dart_monkey")
+    tower.fire_rate = 0.5 # One shot every 2 seconds
+
+    calls = []
+    find_target = tower.find_target
+    def counting_find_target(*args, **kwargs):
+        if tower.last_shot_time >= 0: # Count from the first shot on, once bloons are streaming past
+            calls.append(sim.tick)
+        return find_target(*args, **kwargs)
+    tower.find_target = counting_find_target
+
+    sim.start_wave()
+    for _ in range(900):
+        sim.step()
+
+    assert 3 <= len(calls) <= 7
+    assert all(later - earlier >= 119 for earlier, later in zip(calls, calls[1:]))
@@ -0,0 +1,111 @@
+"""
+Layered bloon tests
+"""
+import time
+import pytest
+from game.entities import BloonStore, BloonType
+from game.entities.bloon_store import CAMO, LEAD
+from game.entities.bloon_types import red_bloon_equivalent
+
+
+PATH = [(0, 0), (1000, 0), (1000, 1000)]
+
+
+def test_popping_a_layer_leaves_its_child_in_place():
+    """A popped layer turns into its child, keeping the bloon's id and target-able view"""
+    store = BloonStore(PATH)
+    slot = store.spawn(BloonType.YELLOW, 300.0)
+    bloon = store.handle(slot)
+    uid = bloon.uid
+
+    assert not bloon.take_damage(1)
+    assert bloon.type == BloonType.GREEN
+    assert bloon.uid == uid
+    assert bloon.distance_travelled == 300.0
+    assert bloon.speed == 1.5
+    assert bloon.rbe == 3
+
+
+def test_leftover_damage_carries_down():
+    """Damage beyond a layer's health pops the layers under it too"""
+    store = BloonStore(PATH)
+    bloon = store.handle(store.spawn(BloonType.PINK))
+
+    assert not bloon.take_damage(3)
+    assert bloon.type == BloonType.BLUE
+    assert bloon.health == 1
+    assert store.compact() == 3 # One per layer popped
+
+    assert bloon.take_damage(5)
+    assert not bloon.alive
+    assert store.compact() == 2
+
+
+def test_extra_children_spawn_in_one_batch_at_the_parent():
+    """A black bloon's second pink is added by spawn_children, at the same point on the path"""
+    store = BloonStore(PATH)
+    slot = store.spawn(BloonType.BLACK, 500.0)
+    store.flags[slot] |= CAMO
+    store.damage(slot, 1)
+    assert store.count == 1 # Queued, not spawned yet
+
+    assert store.spawn_children() == 1
+    assert store.count == store.live == 2
+    first, second = store.live_handles()
+    assert first.type == second.type == BloonType.PINK
+    assert second.distance_travelled == first.distance_travelled == 500.0
+    assert second.position == first.position
+    assert second.is_camo
+    assert second.uid != first.uid
+
+
+def test_every_child_inherits_the_same_flags():
+    """The child taking over the parent's row and the queued ones keep the same camo and lead flags"""
+    store = BloonStore(PATH)
+    slot = store.spawn(BloonType.BLACK)
+    store.flags[slot] |= CAMO | LEAD
+    store.damage(slot, 1)
+    store.compact()
+
+    assert [(bloon.type, bloon.is_camo, bloon.is_lead) for bloon in store.live_handles()] == [
+        (BloonType.PINK, True, True), (BloonType.PINK, True, True)]
+
+
+def test_leftover_damage_reaches_every_child():
+    """Each child takes the leftover damage, even when it pops the child outright"""
+    store = BloonStore(PATH)
+    slot = store.spawn(BloonType.WHITE)
+    store.damage(slot, 5) # White, pink, yellow, green, blue
+    store.compact()
+
+    assert [bloon.type for bloon in store.live_handles()] == [BloonType.RED, BloonType.RED]
+    assert sum(bloon.rbe for bloon in store.live_handles()) == 2
+
+
+def test_full_pop_pays_every_layer():
+    """Popping everything in a black bloon pays the same as its RBE"""
+    store = BloonStore(PATH)
+    slot = store.spawn(BloonType.BLACK)
+    store.damage(slot, 100)
+    reward = store.compact()
+
+    assert store.count == store.live == 0
+    assert reward == red_bloon_equivalent(BloonType.BLACK) == 11
+
+
+@pytest.mark.benchmark
+def test_large_burst_of_children():
+    """Hundreds of pops in one tick are spawned in a single batch without a frame spike"""
+    store = BloonStore(PATH)
+    slots = [store.spawn(BloonType.BLACK, float(i)) for i in range(500)]
+
+    start = time.perf_counter()
+    for slot in slots:
+        store.damage(slot, 1)
+    store.compact()
+    elapsed = time.perf_counter() - start
+
+    assert store.count == store.live == 1000
+    assert all(bloon.type == BloonType.PINK for bloon in store.live_handles())
+    assert store.distance[500:1000].tolist() == [float(i) for i in range(500)]
+    assert elapsed < 0.05
@@ -0,0 +1,92 @@
+"""
+Arc-length path table tests
+"""
+import numpy as np
+from game.systems import PathTable
+from game.entities import Bloon, BloonStore, Tower, BloonType
+from game.sim.progress_index import ProgressIndex
+
+
+PATH = [(0, 0), (100, 0), (100, 50), (300, 50)]
+
+
+def test_segment_table():
+    """Cumulative lengths and unit directions are precomputed per segment"""
+    table = PathTable(PATH)
+
+    assert table.length == 350
+    assert table.cumulative.tolist() == [0, 100, 150, 350]
+    assert table.directions.tolist() == [[1, 0], [0, 1], [1, 0]]
+
+
+def test_positions_from_distance():
+    """Scalar and vectorized lookups agree and are clamped to the path"""
+    table = PathTable(PATH)
+    distances = np.array([0, 50, 100, 125, 349, 500, -10])
+
+    expected = [(0, 0), (50, 0), (100, 0), (100, 25), (299, 50), (300, 50), (0, 0)]
+    assert table.positions_at(distances).tolist() == [list(p) for p in expected]
+    for distance, position in zip(distances, expected):
+        assert table.position_at(float(distance)) == position
+
+
+def test_project_point_onto_path():
+    """Points off the path map to the distance of the closest point on it"""
+    table = PathTable(PATH)
+
+    assert table.project((40, 30)) == 40
+    assert table.project((130, 40)) == 180
+    assert table.project((-50, -50)) == 0
+
+
+def test_first_and_last_targeting_use_exact_distance():
+    """Bloons on the same segment are ranked by how far they have travelled"""
+    path = [(0, 0), (200, 0)]
+    leader = Bloon(BloonType.YELLOW, path) # Fastest bloon
+    trailer = Bloon(BloonType.RED, path)
+    for _ in range(10):
+        leader.update()
+        trailer.update()
+    assert leader.path_index == trailer.path_index
+
+    tower = Tower((20, 30), range_val=100)
+    assert tower.find_target([trailer, leader]) is leader
+    tower.targeting_mode = "last"
+    assert tower.find_target([leader, trailer]) is trailer
+
+
+def test_coverage_intervals():
+    """Coverage is the set of path distances inside the circle, merged across waypoints"""
+    table = PathTable(PATH)
+
+    assert table.coverage((100, 25), 10) == [(115, 135)]
+    assert table.coverage((100, 50), 10) == [(140, 160)] # Around a corner
+    assert table.coverage((100, 200), 50) == []
+
+    # A circle the path leaves and re-enters gives two intervals
+    table = PathTable([(0, 0), (100, 0), (100, 20), (0, 20)])
+    (first_start, first_end), (second_start, second_end) = table.coverage((10, 10), 12)
+    assert round(first_start, 6) == round(10 - np.sqrt(44), 6)
+    assert round(second_end, 6) == round(220 - 10 + np.sqrt(44), 6)
+
+
+def test_coverage_targeting_matches_full_scan():
+    """Targeting through path coverage picks the same bloon as checking every bloon"""
+    path = [(0, 100), (300, 100), (300, 300), (50, 300), (50, 500), (600, 500)]
+    store = BloonStore(path)
+    rng = np.random.default_rng(11)
+    types = [BloonType.RED, BloonType.BLUE, BloonType.GREEN, BloonType.YELLOW]
+    for distance in rng.uniform(0, PathTable(path).length, 400):
+        slot = store.spawn(types[rng.integers(len(types))], float(np.round(distance, -1))) # Rounding makes ties
+        store.handle(slot).is_camo = rng.random() < 0.2
+        store.handle(slot).is_lead = rng.random() < 0.2
+        store.handle(slot).health = int(rng.integers(1, 5))
+    progress = ProgressIndex(store)
+    progress.rebuild()
+
+    for x, y, range_val in zip(rng.uniform(0, 600, 30), rng.uniform(50, 550, 30), rng.uniform(30, 250, 30)):
+        for mode in ("first", "last", "close", "strong"):
+            tower = Tower((x, y), range_val=range_val)
+            tower.targeting_mode = mode
+            tower.can_see_camo = rng.random() < 0.5
+            assert tower.find_target((), progress=progress) is tower.find_target(store.live_handles())
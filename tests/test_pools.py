@@ -0,0 +1,65 @@
+"""
+Projectile pool and bloon store occupancy tests
+"""
+from game.entities import BloonStore, BloonType, ProjectilePool, Tower
+from game.systems import Wave
+from helpers import make_simulation
+
+
+def test_released_projectiles_are_reset_and_reused():
+    """A released projectile comes back from acquire with fresh state"""
+    pool = ProjectilePool()
+    first = pool.acquire((0, 0), (10, 0), damage=2, pierce=1)
+    first.hit(42)
+    first.lifetime = 100
+    assert not first.alive
+    pool.release(first)
+
+    second = pool.acquire((5, 5), (5, 15), damage=1, speed=2.0, pierce=3)
+    assert second is first
+    assert second.alive
+    assert second.position == [5.0, 5.0]
+    assert second.previous_position == [5.0, 5.0]
+    assert second.velocity == [0.0, 2.0]
+    assert second.pierce_remaining == 3
+    assert second.hit_bloons == set()
+    assert second.lifetime == 0
+    assert pool.stats() == {'in_use': 1, 'free': 0, 'allocated': 1, 'high_water': 1}
+
+
+def test_tower_fires_from_pool():
+    """Towers acquire their projectiles from a pool when given one"""
+    pool = ProjectilePool()
+    tower = Tower((100, 100), range_val=100, tower_type="tack_shooter", projectiles=8)
+    target = BloonStore([(0, 100), (200, 100)])
+    shots = tower.fire_projectiles(target.handle(target.spawn(BloonType.RED)), 0, pool)
+
+    assert len(shots) == 1 # One radial burst for all eight directions
+    assert pool.stats()['in_use'] == 1
+    assert pool.high_water == 1
+
+
+def test_store_reuses_rows_and_tracks_high_water():
+    """Rows freed by compaction are reused by later spawns"""
+    store = BloonStore([(0, 0), (100, 0)], capacity=4)
+    for _ in range(4):
+        store.spawn(BloonType.RED)
+    for slot in range(3):
+        store.damage(slot, 1)
+    store.compact()
+    store.spawn(BloonType.RED)
+
+    assert store.stats() == {'in_use': 2, 'free': 2, 'allocated': 4, 'high_water': 4}
+
+
+def test_simulation_recycles_projectiles():
+    """Over a wave the pool allocates only as many projectiles as are in flight at once"""
+    sim = make_simulation(waves=[Wave([BloonType.RED, BloonType.BLUE], [20, 20], 200)], money=10000)
+    sim.place_tower((300, 260), "dart_monkey")
+    sim.place_tower((300, 340), "tack_shooter")
+    sim.play_wave()
+
+    stats = sim.pool_stats()['projectiles']
+    assert stats['allocated'] == stats['high_water']
+    assert stats['in_use'] == len(sim.projectiles)
+    assert stats['in_use'] + stats['free'] == stats['allocated']
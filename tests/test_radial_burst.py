@@ -0,0 +1,172 @@
+"""
+Tack Shooter radial burst tests
+"""
+import math
+import time
+import pytest
+from game.entities import BloonStore, BloonType, Projectile, Tower
+from game.sim.collision import resolve_bursts, resolve_projectile_hits
+from game.sim.spatial_grid import BloonGrid
+from helpers import make_simulation, make_crowd
+
+CENTER = (400, 300)
+AROUND_CENTER = {"low": (250, 150), "high": (550, 450)} # make_crowd bounds for bloons scattered around CENTER
+
+
+def tack_tower(**stats):
+    """A Tack Shooter at CENTER, ready to fire"""
+    tower = Tower(CENTER, range_val=100, tower_type="tack_shooter", projectiles=8, **stats)
+    tower.projectile_speed = 4
+    return tower
+
+
+def separate_tacks(tower):
+    """The eight projectiles a Tack Shooter fired before bursts"""
+    tacks = []
+    for i in range(tower.projectiles):
+        angle = 2 * math.pi * i / tower.projectiles
+        start = (CENTER[0] + math.cos(angle) * Tower.TACK_SPAWN_DISTANCE,
+                 CENTER[1] + math.sin(angle) * Tower.TACK_SPAWN_DISTANCE)
+        target = (CENTER[0] + math.cos(angle) * tower.range, CENTER[1] + math.sin(angle) * tower.range)
+        tacks.append(Projectile(start, target, tower.damage, tower.projectile_speed, tower.pierce))
+    return tacks
+
+
+def play(projectiles, store, ticks=60):
+    for _ in range(ticks):
+        for projectile in projectiles:
+            projectile.advance()
+        resolve_projectile_hits(projectiles, store)
+        for projectile in projectiles:
+            projectile.check_bounds()
+
+
+def test_tack_shooter_fires_one_burst():
+    """All eight directions travel as one projectile with a pierce counter each"""
+    tower = tack_tower(pierce=3)
+    target = BloonStore([(0, 0), (800, 0)])
+    burst, = tower.fire_projectiles(target.handle(target.spawn(BloonType.RED)), 0)
+    assert burst.burst_directions == 8
+    assert burst.direction_pierce == [3] * 8
+    assert burst.ring_radius == Tower.TACK_SPAWN_DISTANCE
+    assert burst.position == list(CENTER)
+
+
+def test_more_tacks_upgrades_widen_the_burst():
+    """Tack Sprayer upgrades set the number of directions the burst fires in"""
+    sim = make_simulation(money=10 ** 5)
+    tower = sim.place_tower((300, 200), "tack_shooter")
+    sim.upgrade_tower(tower, "path3")
+    target = BloonStore([(0, 0), (800, 0)])
+    burst, = tower.fire_projectiles(target.handle(target.spawn(BloonType.RED)), 10 ** 6)
+    assert burst.burst_directions == 16
+    assert len(burst.direction_pierce) == 16
+
+
+def test_burst_hits_the_same_bloons_as_separate_tacks():
+    """A burst pops exactly what eight separate tacks would, each direction capped by its own pierce"""
+    tower = tack_tower(pierce=3)
+    target = BloonStore([(0, 0), (800, 0)])
+    target.spawn(BloonType.RED)
+    burst, = tower.fire_projectiles(target.handle(0), 0)
+
+    with_burst, _ = make_crowd(seed=5, **AROUND_CENTER)
+    with_tacks, _ = make_crowd(seed=5, **AROUND_CENTER)
+    play([burst], with_burst)
+    play(separate_tacks(tower), with_tacks)
+
+    assert with_burst.flags[:300].tolist() == with_tacks.flags[:300].tolist()
+    assert 0 < 300 - with_burst.live < 8 * 3 + 1
+
+
+def test_each_direction_spends_its_own_pierce():
+    """Bloons stacked along one direction stop that tack, not the others"""
+    store = BloonStore([(0, 0), (800, 0)])
+    for x in (450, 460, 470):
+        store.position[store.spawn(BloonType.RED)] = (x, 300)
+    store.position[store.spawn(BloonType.RED)] = (400, 360) # Straight down
+    burst = Projectile(CENTER, speed=5, pierce=2, burst_directions=8)
+    burst.ring_radius = 30
+
+    play([burst], store, ticks=20)
+    assert store.flags[:4].tolist() == [0, 0, 1, 0] # The third in the row outlasted the right tack's pierce
+    assert burst.direction_pierce[0] == 0 and burst.direction_pierce[2] == 1
+    assert burst.alive
+
+
+def test_burst_slows_frozen_bloons_it_cannot_pop():
+    """Tacks that can't pop frozen bloons still apply their status effects to them"""
+    store = BloonStore([(0, 0), (800, 0)])
+    store.position[store.spawn(BloonType.BLUE)] = (440, 300)
+    store.freeze(0, 100)
+    burst = Projectile(CENTER, burst_directions=8)
+    burst.ring_radius = 40
+    burst.slow_duration = 500
+    burst.can_pop_frozen = False
+
+    resolve_projectile_hits([burst], store)
+    assert store.type[0] == 1 and store.slow_until[0] == 500
+    assert burst.direction_pierce[0] == 0
+
+
+def test_freezing_burst_pops_bloons_before_freezing_them():
+    """A burst's own freeze doesn't stop its damage, batched or sequential, but earlier ice does"""
+    for resolve in (lambda burst, store: resolve_projectile_hits([burst], store),
+                    lambda burst, store: burst.collide(store.live_handles())):
+        store = BloonStore([(0, 0), (800, 0)])
+        store.position[store.spawn(BloonType.BLUE)] = (440, 300)
+        for _ in range(2):
+            burst = Projectile(CENTER, burst_directions=8)
+            burst.ring_radius = 40
+            burst.freeze_duration = 800
+            burst.can_pop_frozen = False
+            resolve(burst, store)
+        assert store.type[0] == 0 and store.live == 1 # Popped once, then the second burst glanced off
+        assert store.freeze_until[0] == 800
+
+
+def test_burst_drops_directions_that_leave_the_screen():
+    """Near an edge, tacks that go off screen stop while the rest fly on"""
+    burst = Projectile((20, 300), speed=5, burst_directions=8)
+    burst.ring_radius = 30
+    for _ in range(10):
+        burst.advance()
+        burst.check_bounds()
+    assert burst.direction_pierce[4] == 0 # Left, off screen
+    assert burst.direction_pierce[0] == 1
+    assert burst.alive and burst.pierce_remaining == 7
+
+
+def test_sequential_collide_matches_batched():
+    """Projectile.collide resolves a burst the same way as the batched pass"""
+    batched, _ = make_crowd(seed=9, **AROUND_CENTER)
+    sequential, _ = make_crowd(seed=9, **AROUND_CENTER)
+    batched_burst = Projectile(CENTER, pierce=4, burst_directions=8)
+    sequential_burst = Projectile(CENTER, pierce=4, burst_directions=8)
+    for burst in (batched_burst, sequential_burst):
+        burst.ring_radius = 60
+
+    resolve_projectile_hits([batched_burst], batched)
+    sequential_burst.collide(sequential.live_handles())
+    assert batched.flags[:300].tolist() == sequential.flags[:300].tolist()
+    assert batched_burst.direction_pierce == sequential_burst.direction_pierce
+
+
+@pytest.mark.benchmark
+def test_hundreds_of_bursts_per_tick():
+    """Resolving many bursts over thousands of bloons is one batched pass"""
+    store, rng = make_crowd(seed=12, count=3000, high=(800, 600), bloon_type=BloonType.YELLOW)
+    grid = BloonGrid(store)
+    grid.rebuild()
+    bursts = []
+    for center in rng.uniform((0, 0), (800, 600), size=(300, 2)):
+        burst = Projectile(tuple(center), burst_directions=8)
+        burst.ring_radius = rng.uniform(30, 80)
+        bursts.append(burst)
+
+    start = time.perf_counter()
+    hits = resolve_bursts(bursts, store, grid)
+    elapsed = time.perf_counter() - start
+
+    assert hits > 300
+    assert elapsed < 0.05
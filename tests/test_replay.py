@@ -0,0 +1,66 @@
+"""
+Replay player tests
+"""
+from game.sim import ReplayPlayer
+from helpers import make_scripted_simulation, play_scripted_game, game_state
+
+
+def make_player(log, keyframe_interval=600):
+    return ReplayPlayer(log, lambda seed: make_scripted_simulation(), keyframe_interval)
+
+
+def straight_run(log, tick):
+    """Play a recording from tick 0 without seeking"""
+    player = make_player(log)
+    player.advance(tick)
+    return game_state(player.sim)
+
+
+def count_steps(sim):
+    """Count the ticks the simulation is stepped from now on"""
+    steps = []
+    step = sim.step
+    def counted():
+        steps.append(1)
+        step()
+    sim.step = counted
+    return steps
+
+
+def test_headless_playback_reproduces_the_session():
+    original = play_scripted_game()
+    original.input_log.end_tick = original.tick
+    player = make_player(original.input_log)
+
+    assert player.play() == original.tick
+    assert player.finished
+    assert game_state(player.sim) == game_state(original)
+
+
+def test_seeking_matches_playing_straight_through():
+    log = play_scripted_game().input_log
+    log.end_tick = 2250
+    player = make_player(log)
+    player.play()
+
+    for tick in (1300, 400, 2000, 0, 750):
+        player.seek(tick)
+        assert player.tick == tick
+        assert game_state(player.sim) == straight_run(log, tick)
+
+
+def test_seeking_resumes_from_the_nearest_keyframe():
+    """Seeking never re-simulates from tick 0 once later keyframes exist"""
+    log = play_scripted_game().input_log
+    log.end_tick = 2250
+    player = make_player(log)
+    player.play()
+    assert sorted(player.keyframes) == [0, 600, 1200, 1800]
+
+    steps = count_steps(player.sim)
+    player.seek(1300) # Backwards, from the 1200 keyframe
+    assert len(steps) == 100
+    player.seek(1350) # Forwards, straight on from here
+    assert len(steps) == 150
+    player.seek(1900) # Forwards past a keyframe, jumps to it
+    assert len(steps) == 250
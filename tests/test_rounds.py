@@ -0,0 +1,68 @@
+"""
+Data-driven round definition tests
+"""
+import pytest
+from game.entities import BloonType
+from game.sim import GameSimulation
+from game.systems.rounds import RoundSet, load_round_file, parse_round_file, rounds_path
+
+MAP1_ROUNDS = rounds_path("maps/map1.json")
+
+
+def make_round_file(rounds=100, **difficulties):
+    return {
+        "version": 1,
+        "difficulties": difficulties,
+        "rounds": [{"bloons": [{"type": "red", "count": 5 + i}, {"type": "blue", "count": i + 1}], "spawn_delay": 500}
+                   for i in range(rounds)]
+    }
+
+
+def test_map1_rounds_start_with_the_original_waves():
+    waves = RoundSet(load_round_file(MAP1_ROUNDS), "M")
+    assert MAP1_ROUNDS == "maps/map1_rounds.json"
+    assert [(wave.bloon_types, wave.counts, wave.spawn_delay) for wave in list(waves)[:4]] == [
+        ([BloonType.RED], [10], 800),
+        ([BloonType.RED], [15], 600),
+        ([BloonType.RED, BloonType.BLUE], [10, 5], 500),
+        ([BloonType.RED, BloonType.BLUE, BloonType.GREEN], [5, 10, 3], 400),
+    ]
+
+
+def test_difficulties_change_length_and_density():
+    round_file = load_round_file(MAP1_ROUNDS)
+    assert [len(RoundSet(round_file, difficulty)) for difficulty in "EMHI"] == [10, 15, 20, 20]
+    medium, impossible = RoundSet(round_file, "M")[19 - 5], RoundSet(round_file, "I")[19 - 5]
+    assert impossible.spawn_delay == medium.spawn_delay * 0.75
+    assert impossible.total_bloons > medium.total_bloons
+
+    sim = GameSimulation(difficulty="E")
+    assert len(sim.waves) == 10
+
+
+def test_round_files_are_parsed_once():
+    assert load_round_file(MAP1_ROUNDS) is load_round_file(MAP1_ROUNDS)
+
+
+def test_rounds_are_built_only_when_reached():
+    waves = RoundSet(parse_round_file(make_round_file(100)))
+    rounds = iter(waves)
+    first = next(rounds)
+    assert len(waves) == 100 and first.counts == [5, 1]
+    assert waves[99].counts == [104, 100]
+    assert waves[0] is not first # Each round is a fresh, unstarted wave
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda data: data["rounds"][2]["bloons"].append({"type": "purple", "count": 1}), "round 3: unknown bloon type"),
+    (lambda data: data["rounds"][0]["bloons"][0].update(count=0), "round 1: bloon count"),
+    (lambda data: data["rounds"][1].pop("spawn_delay"), "round 2: spawn_delay"),
+    (lambda data: data.update(version=7), "unsupported round file version"),
+    (lambda data: data["difficulties"].update(X={}), "difficulty X: unknown difficulty"),
+    (lambda data: data["difficulties"].update(E={"last_round": 101}), "difficulty E: last_round"),
+])
+def test_invalid_round_files_are_rejected(change, message):
+    data = make_round_file()
+    change(data)
+    with pytest.raises(ValueError, match=message):
+        parse_round_file(data)
@@ -0,0 +1,107 @@
+"""
+Seeking projectile targeting tests
+"""
+import time
+import pytest
+from game.entities import BloonType, Projectile
+from game.sim.spatial_grid import BloonGrid
+from game.systems import Wave
+from helpers import make_simulation, game_state, make_crowd, place_bloons
+
+
+def seeker(position=(100, 100)):
+    """A slow seeking projectile heading right"""
+    return Projectile(position, (position[0] + 100, position[1]), speed=1, pierce=5, has_seeking=True)
+
+
+def test_seeker_keeps_its_target_while_it_is_in_range():
+    """A closer bloon turning up doesn't pull a seeking projectile off its target"""
+    store, grid = place_bloons([(100, 160)])
+    projectile = seeker()
+    projectile.advance((), grid)
+    assert projectile.target.slot == 0
+    assert projectile.velocity == [0.0, 1.0]
+
+    store.position[store.spawn(BloonType.RED)] = (110, 101)
+    grid.rebuild()
+    projectile.advance((), grid)
+    assert projectile.target.slot == 0
+
+
+def test_seeker_drops_targets_that_pop_or_leave_range():
+    """Losing the target - popped or out of SEEK_RANGE - makes the projectile look again"""
+    store, grid = place_bloons([(100, 160), (60, 100)])
+    projectile = seeker()
+    projectile.advance((), grid)
+    assert projectile.target.slot == 1
+
+    store.handle(1).take_damage(1)
+    projectile.advance((), grid)
+    assert projectile.target.slot == 0
+
+    store.position[0] = (100, 400)
+    grid.rebuild()
+    projectile.advance((), grid)
+    assert projectile.target is None
+    projectile.advance((), grid)
+    assert projectile.target is None # Nothing left in range
+
+
+def test_target_searches_are_throttled():
+    """Without a target, the projectile searches once every RETARGET_INTERVAL ticks"""
+    store, grid = place_bloons([(500, 500)])
+    projectile = seeker()
+    searches = []
+    find_nearest_target = projectile.find_nearest_target
+    projectile.find_nearest_target = lambda *args: searches.append(projectile.lifetime) or find_nearest_target(*args)
+
+    for _ in range(Projectile.RETARGET_INTERVAL * 3):
+        projectile.advance((), grid)
+    assert searches == [1, 1 + Projectile.RETARGET_INTERVAL, 1 + 2 * Projectile.RETARGET_INTERVAL]
+
+
+def test_hitting_the_target_frees_the_projectile_to_seek_another():
+    """A hit on the target clears it, and the next search skips bloons already hit"""
+    store, grid = place_bloons([(100, 110), (100, 150)])
+    projectile = seeker()
+    projectile.advance((), grid)
+    projectile.hit(projectile.target.uid)
+    assert projectile.target is None
+
+    projectile.advance((), grid)
+    assert projectile.target.slot == 1
+
+
+def test_seeking_towers_replay_from_a_snapshot():
+    """Held targets and search timings are part of snapshots"""
+    sim = make_simulation(waves=[Wave([BloonType.GREEN], [40], 150)], money=3000)
+    for x in (250, 350, 450):
+        sim.place_tower((x, 250), "dart_monkey").has_seeking = True
+    sim.start_wave()
+    while not any(projectile.target is not None for projectile in sim.projectiles):
+        sim.step()
+
+    saved = sim.snapshot()
+    sim.advance(300)
+    expected = game_state(sim)
+    sim.restore(saved)
+    sim.advance(300)
+    assert game_state(sim) == expected
+
+
+@pytest.mark.benchmark
+def test_many_seekers_over_a_crowd():
+    """Hundreds of seeking projectiles over thousands of bloons cost little per tick"""
+    store, rng = make_crowd(seed=4, count=4000, high=(800, 600))
+    grid = BloonGrid(store)
+    grid.rebuild()
+    projectiles = [seeker(tuple(position)) for position in rng.uniform((0, 0), (800, 600), size=(500, 2))]
+
+    start = time.perf_counter()
+    for _ in range(10):
+        for projectile in projectiles:
+            projectile.advance((), grid)
+    elapsed = (time.perf_counter() - start) / 10
+
+    assert all(projectile.target is not None for projectile in projectiles)
+    assert elapsed < 0.01
@@ -0,0 +1,108 @@
+"""
+Headless simulation engine tests
+Runs the game logic without a window, clock or mouse
+"""
+from game.sim import FixedTimestep
+from game.systems import Wave
+from game.entities import BloonType
+from helpers import make_simulation
+
+
+def test_simulation_needs_no_display():
+    """The engine can be created and stepped without initialising pygame"""
+    sim = make_simulation()
+    sim.start_wave()
+    for _ in range(40): # 40 steps is ~667 ms, one spawn interval
+        sim.step()
+    assert sim.time > 0
+    assert len(sim.bloons) == 1
+
+
+def test_unprotected_wave_costs_lives():
+    """Bloons that reach the end take lives and the wave still completes"""
+    sim = make_simulation()
+    sim.play_wave()
+
+    assert not sim.wave_active
+    assert sim.wave_number == 2
+    assert sim.lives == 20 - 5
+    assert sim.bloons == []
+
+
+def test_tower_defends_wave():
+    """A placed tower pops bloons and earns money"""
+    sim = make_simulation()
+    tower = sim.place_tower((300, 360), "dart_monkey")
+    assert tower is not None
+    money_after_placing = sim.money
+
+    sim.play_wave()
+
+    assert sim.lives == 20
+    assert sim.money == money_after_placing + 5
+
+
+def test_place_and_sell_tower():
+    """Placing charges the tower cost and selling refunds 70%"""
+    sim = make_simulation()
+    tower = sim.place_tower((300, 400), "dart_monkey")
+    assert sim.money == 800
+
+    assert sim.sell_tower(tower) == 140
+    assert sim.money == 940
+    assert sim.towers == []
+
+    # Cannot place on the path or without enough money
+    assert sim.place_tower((300, 300), "dart_monkey") is None
+    sim.money = 0
+    assert sim.place_tower((300, 400), "dart_monkey") is None
+
+
+def test_fixed_timestep_accumulates_frames():
+    """Variable frame times are turned into a whole number of fixed ticks"""
+    timestep = FixedTimestep(tick_ms=10, max_frame_ms=100)
+
+    assert timestep.advance(25) == 2
+    assert abs(timestep.alpha - 0.5) < 1e-9
+    assert timestep.advance(5) == 1
+    assert timestep.alpha == 0
+
+    # Very long frames are clamped instead of simulating forever
+    assert timestep.advance(5000) == 10
+
+
+def test_game_speed_is_independent_of_frame_rate():
+    """The same span of real time gives the same simulation, however it is split into frames"""
+    results = []
+    for frame_ms in (1000 / 30, 1000 / 60, 1000 / 144):
+        sim = make_simulation()
+        timestep = FixedTimestep()
+        sim.start_wave()
+        for _ in range(int(3000 / frame_ms)):
+            for _ in range(timestep.advance(frame_ms)):
+                sim.step()
+        # 3 seconds is 180 ticks, give or take one partially accumulated tick
+        assert 179 <= sim.tick <= 180
+        results.append(len(sim.bloons))
+
+    assert results[0] == results[1] == results[2]
+
+
+def test_fast_forward_matches_normal_speed():
+    """Fast-forward only runs more ticks per frame - the game plays out exactly as at 1x"""
+    results = []
+    for speed in (1, 2, 4, 8):
+        sim = make_simulation(waves=[Wave([BloonType.RED, BloonType.BLUE], [15, 15], 300)], money=10000)
+        sim.lives = 1000
+        sim.place_tower((300, 340), "dart_monkey")
+        sim.place_tower((150, 260), "tack_shooter")
+        timestep = FixedTimestep(speed=speed)
+        sim.start_wave()
+        frames = 0
+        while sim.tick < 1200:
+            sim.advance(min(timestep.advance(1000 / 60), 1200 - sim.tick))
+            frames += 1
+        assert frames == -(-1200 // speed)
+        results.append((sim.money, sim.lives, [bloon.position for bloon in sim.bloons]))
+
+    assert all(result == results[0] for result in results)
@@ -0,0 +1,108 @@
+"""
+Binary simulation snapshot tests
+"""
+import time
+import pytest
+from game.entities import BloonType, Tower
+from game.systems import Wave
+from helpers import make_simulation, game_state
+
+
+def make_waves():
+    return [Wave([BloonType.RED, BloonType.BLUE], [40, 40], 300)]
+
+
+def play_into_first_wave():
+    """A game partway through its first wave, with bloons and projectiles in flight"""
+    sim = make_simulation(waves=make_waves(), money=2000)
+    sim.place_tower((200, 340), "dart_monkey")
+    tack = sim.place_tower((400, 260), "tack_shooter")
+    sim.cycle_targeting_mode(tack)
+    sim.upgrade_tower(tack, "path1")
+    sim.start_wave()
+    sim.advance(600)
+    return sim
+
+
+def test_restored_simulation_plays_on_identically():
+    """Restoring mid-wave, with bloons and projectiles in flight, continues exactly as before"""
+    sim = play_into_first_wave()
+    assert sim.bloons and sim.projectiles and sim.current_wave.spawned < sim.current_wave.total_bloons
+
+    saved = sim.snapshot()
+    sim.advance(400)
+    expected = game_state(sim)
+
+    sim.restore(saved)
+    sim.advance(400)
+    assert game_state(sim) == expected
+
+    # A fresh simulation with the same map and waves picks the game up too
+    fresh = make_simulation(waves=make_waves(), money=2000)
+    fresh.restore(saved)
+    fresh.advance(400)
+    assert game_state(fresh) == expected
+
+
+def test_restore_keeps_towers_upgrades_and_targets():
+    sim = play_into_first_wave()
+    sim.restore(sim.snapshot())
+
+    tack = sim.find_tower(1)
+    assert tack.tower_type == "tack_shooter"
+    assert tack.upgrade_levels == {"path1": 1, "path2": 0, "path3": 0}
+    assert tack.targeting_mode == "last"
+    assert len(sim.fire_scheduler) == len(sim.towers)
+    assert all(tower.target is None or tower.target.alive for tower in sim.towers)
+
+
+def test_restore_rejects_other_data():
+    sim = make_simulation()
+    data = bytearray(sim.snapshot())
+    with pytest.raises(ValueError):
+        sim.restore(b"not a snapshot at all, but long enough to have a header")
+    data[4] = 99 # Version
+    with pytest.raises(ValueError):
+        sim.restore(bytes(data))
+
+
+def fill_with_2000_entities():
+    """A simulation holding 1800 bloons, 50 towers and 150 projectiles"""
+    sim = make_simulation(money=10 ** 6)
+    for i in range(1800):
+        sim.bloon_store.spawn(BloonType.RED, distance=i * 0.3)
+    for i in range(50):
+        tower = Tower((i * 12, 250), range_val=80)
+        tower.uid = i
+        sim.towers.append(tower)
+    for i in range(150):
+        projectile = sim.projectile_pool.acquire((i, 280), (i + 5, 300), speed=8, pierce=2)
+        projectile.hit_bloons.update((i, i + 1))
+        sim.projectiles.append(projectile)
+    return sim
+
+
+def test_snapshot_of_2000_entities_is_small():
+    sim = fill_with_2000_entities()
+    data = sim.snapshot()
+    assert len(data) < 2000 * 80
+
+    sim.restore(data)
+    assert sim.bloon_store.count == 1800 and len(sim.towers) == 50 and len(sim.projectiles) == 150
+
+
+@pytest.mark.benchmark
+def test_snapshot_of_2000_entities_is_fast():
+    sim = fill_with_2000_entities()
+    data = sim.snapshot()
+
+    def best_of(runs, function):
+        best = float('inf')
+        for _ in range(runs):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+    assert best_of(20, sim.snapshot) < 1.0
+    assert best_of(20, lambda: sim.restore(data)) < 1.0
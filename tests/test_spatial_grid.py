@@ -0,0 +1,67 @@
+"""
+Spatial hash grid tests
+"""
+import numpy as np
+from game.entities import BloonStore, BloonType, Tower
+from game.sim.spatial_grid import BloonGrid
+
+
+def make_scattered_store(count=500, seed=7):
+    """Store with bloons at random positions across the screen"""
+    store = BloonStore([(0, 0), (1280, 0)])
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        store.spawn(BloonType.RED)
+    store.position[:count] = rng.uniform((-40, -40), (1320, 760), size=(count, 2))
+    return store
+
+
+def test_radius_query_matches_brute_force():
+    """Range queries return exactly the bloons a full scan finds, in spawn order"""
+    store = make_scattered_store()
+    grid = BloonGrid(store, cell_size=50)
+    grid.rebuild()
+
+    rng = np.random.default_rng(3)
+    for x, y, radius in zip(rng.uniform(-50, 1330, 50), rng.uniform(-50, 770, 50), rng.uniform(0, 400, 50)):
+        offsets = store.position[:store.count] - (x, y)
+        expected = np.nonzero((offsets ** 2).sum(axis=1) <= radius * radius)[0]
+        assert grid.query_radius(x, y, radius).tolist() == expected.tolist()
+
+
+def test_grid_skips_popped_bloons():
+    """Only bloons that are alive at rebuild time are indexed"""
+    store = make_scattered_store(count=20)
+    store.handle(4).take_damage(1)
+    grid = BloonGrid(store)
+    grid.rebuild()
+
+    assert 4 not in grid.query_radius(640, 360, 2000).tolist()
+    assert len(grid.query_radius(640, 360, 2000)) == 19
+
+
+def test_tower_targeting_with_grid():
+    """Towers find the same target through the grid as through a full scan"""
+    store = make_scattered_store()
+    store.distance[:store.count] = np.arange(store.count)
+    grid = BloonGrid(store)
+    grid.rebuild()
+
+    for mode in ("first", "last", "close", "strong"):
+        tower = Tower((640, 360), range_val=150)
+        tower.targeting_mode = mode
+        assert tower.find_target((), grid) is tower.find_target(store.live_handles())
+
+
+def test_batched_queries_match_single_queries():
+    """query_many finds the same bloons as one query_radius per query, grouped by query"""
+    store = make_scattered_store()
+    grid = BloonGrid(store, cell_size=50)
+    grid.rebuild()
+
+    rng = np.random.default_rng(4)
+    centers = rng.uniform((-50, -50), (1330, 770), size=(60, 2))
+    radii = rng.uniform(0, 200, 60)
+    queries, slots = grid.query_many(centers, radii)
+    for query, ((x, y), radius) in enumerate(zip(centers, radii)):
+        assert slots[queries == query].tolist() == grid.query_radius(x, y, radius).tolist()
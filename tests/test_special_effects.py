@@ -0,0 +1,135 @@
+"""
+Chain lightning and ricochet tests
+"""
+import time
+import numpy as np
+import pytest
+from game.entities import BloonStore, BloonType, Projectile, Tower
+from game.sim.collision import chain_lightning, resolve_projectile_hits
+from game.sim.spatial_grid import BloonGrid
+from helpers import make_crowd, place_bloons
+
+
+def in_a_row(xs):
+    """Positions along y = 100"""
+    return [(x, 100) for x in xs]
+
+
+def test_nearest_matches_brute_force():
+    """nearest lists the live bloons in range, nearest first, ties in spawn order"""
+    rng = np.random.default_rng(2)
+    store = BloonStore([(0, 0), (800, 0)])
+    for _ in range(400):
+        store.spawn(BloonType.RED)
+    store.position[:400] = np.round(rng.uniform(0, 600, size=(400, 2)) / 10) * 10 # Plenty of equal distances
+    store.handle(7).take_damage(1)
+    grid = BloonGrid(store)
+    grid.rebuild()
+    store.handle(9).take_damage(1) # Popped after the rebuild
+
+    for x, y, radius in zip(rng.uniform(0, 600, 30), rng.uniform(0, 600, 30), rng.uniform(10, 150, 30)):
+        offsets = store.position[:400] - (x, y)
+        distances = (offsets ** 2).sum(axis=1)
+        expected = [slot for slot in np.lexsort((np.arange(400), distances)).tolist()
+                    if distances[slot] <= radius * radius and slot not in (7, 9)]
+        assert grid.nearest(x, y, radius).tolist() == expected
+        assert grid.nearest(x, y, radius, k=3).tolist() == expected[:3]
+
+
+def test_chain_jumps_to_the_nearest_unhit_bloon():
+    """Lightning jumps bloon to bloon in order of distance and stops at a gap wider than its range"""
+    store, grid = place_bloons(in_a_row([100, 150, 130, 200, 240, 400]))
+    projectile = Projectile((100, 100))
+    projectile.hit(int(store.uid[0]))
+
+    struck = chain_lightning(projectile, store, grid, 0)
+    assert struck == [2, 1, 3, 4] # 130, 150, 200, 240 - 400 is out of reach
+    assert store.live == 2 # Every bloon struck popped; the first was only hit, not damaged, here
+
+
+def test_chain_is_capped_and_does_not_use_pierce():
+    """A strike reaches at most CHAIN_TARGETS more bloons and leaves the projectile's pierce alone"""
+    store, grid = place_bloons(in_a_row(range(100, 700, 10)))
+    projectile = Projectile((100, 100), pierce=2)
+    projectile.chain_lightning = True
+
+    resolve_projectile_hits([projectile], store, grid)
+    assert store.live == 60 - 1 - Projectile.CHAIN_TARGETS
+    assert projectile.pierce_remaining == 1 and projectile.alive
+
+
+def test_chain_slows_frozen_bloons_it_cannot_pop():
+    """Bloons struck by the chain get its status effects even when the ice stops the damage"""
+    store, grid = place_bloons(in_a_row([100, 130, 160]))
+    store.freeze([1, 2], 100)
+    projectile = Projectile((100, 100))
+    projectile.slow_duration = 500
+    projectile.can_pop_frozen = False
+    projectile.hit(int(store.uid[0]))
+
+    assert chain_lightning(projectile, store, grid, 0) == [1, 2]
+    assert store.live == 3
+    assert store.slow_until[1:3].tolist() == [500, 500]
+
+
+def test_freezing_chain_pops_each_link_before_freezing_it():
+    """A chain's own freeze doesn't stop its damage, but ice from an earlier strike does"""
+    store, grid = place_bloons(in_a_row([100, 130, 160]), BloonType.BLUE)
+    projectile = Projectile((100, 100))
+    projectile.freeze_duration = 800
+    projectile.can_pop_frozen = False
+    projectile.hit(int(store.uid[0]))
+
+    assert chain_lightning(projectile, store, grid, 0) == [1, 2]
+    assert store.type[1:3].tolist() == [0, 0] # Both blues popped to red
+    assert store.freeze_until[1:3].tolist() == [800, 800]
+
+    again = Projectile((100, 100))
+    again.freeze_duration = 800
+    again.can_pop_frozen = False
+    again.hit(int(store.uid[0]))
+    assert chain_lightning(again, store, grid, 0) == [1, 2]
+    assert store.live == 3 # The reds were frozen by the first chain
+
+
+def test_ricochet_turns_towards_the_next_bloon():
+    """After a hit, a ricocheting projectile heads for the nearest bloon it hasn't hit"""
+    store, grid = place_bloons(in_a_row([100, 400]))
+    store.position[store.spawn(BloonType.RED)] = (100, 180)
+    grid.rebuild()
+    projectile = Projectile((100, 100), (200, 100), speed=8, pierce=3)
+    projectile.ricochet = True
+
+    resolve_projectile_hits([projectile], store, grid)
+    assert projectile.velocity == [0.0, 8.0]
+    assert projectile.target_pos == (100.0, 180.0)
+
+
+def test_towers_pass_special_effects_to_projectiles():
+    """Effects gathered from upgrades are carried by every projectile the tower fires"""
+    tower = Tower((0, 0))
+    tower.special_effects = ["ricochet", "chain_lightning"]
+    target = BloonStore([(0, 0), (100, 0)])
+    target.spawn(BloonType.RED)
+    projectile, = tower.fire_projectiles(target.handle(0), 0)
+    assert projectile.chain_lightning and projectile.ricochet
+
+
+@pytest.mark.benchmark
+def test_chains_over_a_crowd_stay_cheap():
+    """Hundreds of 20-bloon chains over thousands of bloons search nearby cells, not the whole store"""
+    store, rng = make_crowd(seed=6, count=4000, high=(800, 600), bloon_type=BloonType.YELLOW)
+    grid = BloonGrid(store)
+    grid.rebuild()
+    projectiles = []
+    for slot in rng.choice(4000, 100, replace=False).tolist():
+        projectile = Projectile(tuple(store.position[slot]))
+        projectile.chain_lightning = True
+        projectiles.append(projectile)
+
+    start = time.perf_counter()
+    resolve_projectile_hits(projectiles, store, grid)
+    elapsed = time.perf_counter() - start
+
+    assert sum(len(projectile.hit_bloons) for projectile in projectiles) > 100 * 15
+    assert elapsed < 0.2
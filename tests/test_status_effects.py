@@ -0,0 +1,198 @@
+"""
+Status effect (slow, freeze, stun) tests
+"""
+import time
+import numpy as np
+import pytest
+from game.entities import BloonStore, BloonType, Projectile
+from game.sim.collision import resolve_projectile_hits
+from game.systems import Wave
+from helpers import make_simulation, game_state
+
+
+PATH = [(0, 0), (10000, 0)]
+TICK_MS = 10.0
+
+
+def run(store, ticks, start_time=0.0):
+    """Update the store once per TICK_MS of simulated time"""
+    for tick in range(ticks):
+        store.update(current_time=start_time + tick * TICK_MS)
+    return start_time + ticks * TICK_MS
+
+
+def test_slow_scales_speed_until_it_expires():
+    """A slowed bloon moves at the slow factor of its speed, then recovers"""
+    store = BloonStore(PATH)
+    slowed = store.spawn(BloonType.RED)
+    normal = store.spawn(BloonType.RED)
+    store.slow(slowed, 100, 0.5)
+
+    now = run(store, 10)
+    assert store.distance[slowed] == 5.0
+    assert store.distance[normal] == 10.0
+
+    run(store, 10, now)
+    assert store.distance[slowed] == 15.0
+
+
+def test_strongest_slow_and_latest_expiry_win():
+    """Overlapping slows keep the smallest factor and the longest duration"""
+    store = BloonStore(PATH)
+    slot = store.spawn(BloonType.RED)
+    store.slow(slot, 200, 0.5)
+    store.slow(slot, 50, 0.25)
+    assert store.slow_factor[slot] == 0.25
+    assert store.slow_until[slot] == 200
+
+    # Once the slow has run out, a new, weaker one replaces it
+    store.update(current_time=300)
+    store.slow(slot, 50, 0.75)
+    assert store.slow_factor[slot] == 0.75
+
+
+def test_freeze_and_stun_hold_bloons_still():
+    """Frozen and stunned bloons don't move; only frozen ones are flagged"""
+    store = BloonStore(PATH)
+    frozen, stunned, free = store.spawn(BloonType.RED), store.spawn(BloonType.RED), store.spawn(BloonType.RED)
+    store.freeze(frozen, 50)
+    store.stun(stunned, 50)
+
+    now = run(store, 5)
+    assert store.distance[[frozen, stunned, free]].tolist() == [0.0, 0.0, 5.0]
+    assert store.handle(frozen).is_frozen and not store.handle(stunned).is_frozen
+
+    run(store, 5, now)
+    assert store.distance[[frozen, stunned]].tolist() == [5.0, 5.0]
+    assert not store.handle(frozen).is_frozen
+
+
+def test_frozen_bloons_block_projectiles_that_cant_pop_them():
+    """Sharp projectiles spend pierce on frozen bloons without damaging them"""
+    store = BloonStore(PATH)
+    for x in (100, 105):
+        store.position[store.spawn(BloonType.BLUE)] = (x, 0)
+    store.freeze(0, 1000)
+
+    sharp = Projectile((102, 0), pierce=2)
+    sharp.can_pop_frozen = False
+    resolve_projectile_hits([sharp], store)
+    assert store.type[:2].tolist() == [1, 0] # The frozen blue survives, the other pops to red
+    assert not sharp.alive
+
+    bomb = Projectile((102, 0), pierce=5, explosion_radius=20)
+    resolve_projectile_hits([bomb], store)
+    assert store.type[0] == 0
+
+
+def test_frozen_bloons_still_take_status_effects():
+    """Projectiles that can't pop frozen bloons still slow them and refresh their freeze"""
+    store = BloonStore(PATH)
+    for x in (100, 300, 310):
+        store.position[store.spawn(BloonType.BLUE)] = (x, 0)
+    store.freeze([0, 1, 2], 100)
+
+    glue = Projectile((100, 0))
+    glue.slow_duration = 500
+    glue.can_pop_frozen = False
+    ice = Projectile((305, 0), pierce=5, explosion_radius=20)
+    ice.freeze_duration = 800
+    ice.can_pop_frozen = False
+    resolve_projectile_hits([glue, ice], store)
+
+    assert store.type[:3].tolist() == [1, 1, 1] # Nothing damaged
+    assert store.slow_until[0] == 500
+    assert store.freeze_until[1:3].tolist() == [800, 800]
+
+
+def test_ice_damages_bloons_it_freezes_before_the_ice_blocks_the_next_shot():
+    """A projectile's own freeze doesn't shield the bloon it hits - only ice from earlier hits does"""
+    store = BloonStore(PATH)
+    for x in (100, 300, 310):
+        store.position[store.spawn(BloonType.BLUE)] = (x, 0)
+
+    def ice_shot():
+        shot = Projectile((100, 0))
+        shot.freeze_duration = 800
+        shot.can_pop_frozen = False
+        return shot
+
+    ice_bomb = Projectile((305, 0), pierce=5, explosion_radius=20)
+    ice_bomb.freeze_duration = 800
+    ice_bomb.can_pop_frozen = False
+    resolve_projectile_hits([ice_shot(), ice_bomb], store)
+    assert store.type[:3].tolist() == [0, 0, 0] # Every blue popped to red
+    assert all(store.handle(slot).is_frozen for slot in range(3))
+
+    second = ice_shot()
+    resolve_projectile_hits([second], store)
+    assert store.type[0] == 0 and store.handle(0).alive # Glanced off the ice
+    assert not second.alive
+
+
+def test_sequential_ice_damages_bloons_it_freezes():
+    """Projectile.collide and Projectile.explode check the ice before their own freeze too"""
+    store = BloonStore(PATH)
+    for x in (100, 300, 310):
+        store.position[store.spawn(BloonType.BLUE)] = (x, 0)
+    shot = Projectile((100, 0))
+    bomb = Projectile((305, 0), pierce=5, explosion_radius=20)
+    for projectile in (shot, bomb):
+        projectile.freeze_duration = 800
+        projectile.can_pop_frozen = False
+        projectile.collide(store.live_handles())
+    assert store.type[:3].tolist() == [0, 0, 0]
+    assert store.freeze_until[:3].tolist() == [800, 800, 800]
+
+
+def test_projectiles_apply_their_effects_to_every_bloon_hit():
+    """Status effects reach bloons hit directly and every bloon caught in a blast"""
+    store = BloonStore(PATH)
+    for x in (100, 120, 140):
+        store.position[store.spawn(BloonType.YELLOW)] = (x, 0)
+    glue = Projectile((100, 0))
+    glue.slow_duration = 500
+    ice = Projectile((120, 0), pierce=3, explosion_radius=40)
+    ice.freeze_duration = 300
+
+    resolve_projectile_hits([glue, ice], store)
+    assert store.slow_until[:3].tolist() == [500, 0, 0]
+    assert store.freeze_until[:3].tolist() == [300, 300, 300]
+
+
+def test_tower_slow_effect_in_a_game_survives_snapshots():
+    """A tower's slow_effect slows bloons in the simulation, and running effects are part of snapshots"""
+    sim = make_simulation(waves=[Wave([BloonType.YELLOW], [30], 300)], money=2000)
+    tower = sim.place_tower((300, 250), "dart_monkey")
+    tower.slow_effect = 2
+    sim.start_wave()
+    while not (sim.bloon_store.slow_until[:sim.bloon_store.count] > sim.time).any():
+        sim.step()
+
+    saved = sim.snapshot()
+    sim.advance(200)
+    expected = game_state(sim)
+    sim.restore(saved)
+    sim.advance(200)
+    assert game_state(sim) == expected
+
+
+@pytest.mark.benchmark
+def test_effects_cost_one_pass_over_the_bloons():
+    """Moving thousands of bloons under many effects stays a single vectorized step"""
+    store = BloonStore(PATH, capacity=5000)
+    for _ in range(5000):
+        store.spawn(BloonType.RED)
+    slots = np.arange(5000)
+    store.slow(slots[::2], 10 ** 6, 0.5)
+    store.freeze(slots[::3], 10 ** 6)
+    store.stun(slots[::5], 10 ** 6)
+
+    start = time.perf_counter()
+    run(store, 10)
+    elapsed = (time.perf_counter() - start) / 10
+
+    held = (slots % 3 == 0) | (slots % 5 == 0)
+    expected = np.where(held, 0.0, np.where(slots % 2 == 0, 5.0, 10.0))
+    assert store.distance[:5000].tolist() == expected.tolist()
+    assert elapsed < 0.005
@@ -0,0 +1,40 @@
+"""
+Batched all-towers targeting tests
+"""
+import numpy as np
+from game.entities import BloonStore, BloonType, Tower
+from game.sim.targeting import select_targets
+
+
+def test_batched_targets_match_per_tower_scan():
+    """The distance-matrix pass picks the same target as each tower's own find_target"""
+    store = BloonStore([(0, 0), (100, 0)])
+    rng = np.random.default_rng(4)
+    types = [BloonType.RED, BloonType.BLUE, BloonType.GREEN, BloonType.YELLOW]
+    for _ in range(300):
+        slot = store.spawn(types[rng.integers(len(types))])
+        bloon = store.handle(slot)
+        bloon.is_camo = rng.random() < 0.2
+        bloon.is_lead = rng.random() < 0.2
+    count = store.count
+    store.position[:count] = rng.uniform(0, 600, size=(count, 2)).round(-1) # Rounding makes ties
+    store.distance[:count] = rng.integers(0, 20, size=count) * 10.0
+    store.handle(0).take_damage(1) # Popped bloons are never targeted
+
+    towers = []
+    for x, y, range_val in zip(rng.uniform(0, 600, 80), rng.uniform(0, 600, 80), rng.uniform(10, 200, 80)):
+        tower = Tower((x, y), range_val=range_val)
+        tower.targeting_mode = rng.choice(Tower.TARGETING_MODES + ("unknown",))
+        tower.can_see_camo = rng.random() < 0.5
+        tower.can_pop_lead = rng.random() < 0.5
+        towers.append(tower)
+
+    expected = [tower.find_target(store.live_handles()) for tower in towers]
+    targets = select_targets(towers, store)
+    assert [store.handle(slot) if slot is not None else None for slot in targets] == expected
+    assert any(target is None for target in expected) and any(target is not None for target in expected)
+
+
+def test_no_bloons_means_no_targets():
+    store = BloonStore([(0, 0), (100, 0)])
+    assert select_targets([Tower((0, 0)), Tower((50, 0))], store) == [None, None]
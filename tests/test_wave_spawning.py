@@ -0,0 +1,47 @@
+"""
+Time-accurate wave spawning tests
+"""
+import pytest
+from game.constants import SIM_TICK_MS
+from game.entities import BloonStore, BloonType
+from game.entities.bloon_types import BLOON_PROPERTIES
+from game.systems import Wave
+from helpers import make_simulation
+
+
+def test_overdue_bloons_spawn_in_one_batch_with_their_head_start():
+    store = BloonStore([(0, 0), (2000, 0)])
+    wave = Wave([BloonType.RED], [10], 100)
+    wave.begin(0)
+
+    slots = wave.spawn_due_bloons(550, store)
+
+    speed = BLOON_PROPERTIES[BloonType.RED].speed
+    assert len(slots) == 5 # Due at 100, 200, 300, 400 and 500 ms
+    assert store.distance[slots].tolist() == pytest.approx([speed * late / SIM_TICK_MS for late in (450, 350, 250, 150, 50)])
+    assert wave.spawn_due_bloons(550, store) == []
+    assert len(wave.spawn_due_bloons(1000, store)) == 5
+    assert wave.is_complete()
+
+
+def test_spacing_is_exact_for_delays_between_ticks():
+    """A 110 ms delay is 6.6 ticks - bloons must still be exactly 110 ms of travel apart"""
+    sim = make_simulation(waves=[Wave([BloonType.RED], [20], 110)])
+    sim.start_wave()
+    sim.advance(140)
+
+    distances = sorted(sim.bloon_store.distance[:sim.bloon_store.count].tolist(), reverse=True)
+    gap = BLOON_PROPERTIES[BloonType.RED].speed * 110 / SIM_TICK_MS
+    assert len(distances) == 20
+    assert [a - b for a, b in zip(distances, distances[1:])] == pytest.approx([gap] * 19)
+
+
+def test_first_bloon_is_due_one_delay_after_the_wave_starts():
+    sim = make_simulation(waves=[Wave([BloonType.RED], [5], 500), Wave([BloonType.BLUE], [5], 500)])
+    sim.play_wave()
+    started = sim.tick
+    sim.start_wave()
+    sim.advance(29)
+    assert sim.bloons == [] # No catch-up for the time spent between waves
+    sim.advance(1)
+    assert len(sim.bloons) == 1 and sim.tick - started == 30